@@ -0,0 +1 @@
+"""Benchmarks of validating and serializing synthetic AsyncAPI documents."""
@@ -0,0 +1,59 @@
+"""Run the benchmarks and write the results as JSON.
+
+Usage::
+
+    python -m benchmarks --channels 1000 --messages 100 --depth 4 --output out.json
+    python -m benchmarks --compare previous.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from .runner import compare, run
+
+
+def main(argv: Any = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--refs", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", default="", help="only run matching cases")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="previous results to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="slowdown ratio reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(
+        channels=args.channels,
+        messages=args.messages,
+        depth=args.depth,
+        refs=args.refs,
+        repeat=args.repeat,
+        pattern=args.filter,
+    )
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    for case in results["cases"]:
+        sys.stdout.write(
+            f"{case['name']:<32} {case['seconds'] * 1000:>10.2f} ms "
+            f"{case['peak_memory'] / 2**20:>10.2f} MiB\n",
+        )
+    if args.compare is None:
+        return 0
+    regressions = compare(json.loads(args.compare.read_text()), results, args.threshold)
+    for name, ratio in regressions.items():
+        sys.stdout.write(f"REGRESSION {name}: {ratio:.2f}x slower\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Synthetic AsyncAPI documents of configurable size.
+
+Documents are deterministic for a given set of parameters, so results of different
+runs (and releases) are comparable.
+"""
+
+from typing import Any
+
+SCALARS = (
+    {"type": "string", "format": "uuid"},
+    {"type": "string", "format": "date-time"},
+    {"type": "integer", "minimum": 0, "maximum": 1000},
+    {"type": "number", "multipleOf": 0.01},
+    {"type": "string", "enum": ["EUR", "USD", "PLN"]},
+    {"type": "boolean"},
+)
+
+SAMPLES = (
+    "3f0c2f7e-8d1a-4a77-9a43-6d5f0e3c1b2a",
+    "2024-01-01T00:00:00Z",
+    42,
+    12.34,
+    "EUR",
+    True,
+)
+
+
+def schema(index: int, depth: int, refs: int, variant: int = 0) -> dict[str, Any]:
+    """Object schema nested ``depth`` levels deep.
+
+    Every level references up to ``refs`` previously defined component schemas.
+    """
+    properties: dict[str, Any] = {
+        f"field{i}": dict(SCALARS[(index + variant + i) % len(SCALARS)])
+        for i in range(len(SCALARS))
+    }
+    for i in range(min(refs, index)):
+        properties[f"ref{i}"] = {"$ref": f"#/components/schemas/Schema{index - i - 1}"}
+    if depth > 1:
+        properties["nested"] = schema(index, depth - 1, refs, variant)
+        properties["items"] = {
+            "type": "array",
+            "items": schema(index, depth - 1, refs, variant + 1),
+            "minItems": 1,
+        }
+    return {
+        "type": "object",
+        "description": f"Schema {index} at depth {depth}",
+        "required": ["field0", "field1"],
+        "properties": properties,
+    }
+
+
+def payload(index: int, depth: int) -> dict[str, Any]:
+    """Payload that is valid against ``schema(index, depth, refs)``."""
+    value: dict[str, Any] = {
+        f"field{i}": SAMPLES[(index + i) % len(SAMPLES)] for i in range(len(SCALARS))
+    }
+    if depth > 1:
+        value["nested"] = payload(index, depth - 1)
+        value["items"] = [payload(index + 1, depth - 1) for _ in range(3)]
+    return value
+
+
+def components(messages: int, depth: int, refs: int) -> dict[str, Any]:
+    return {
+        "schemas": {f"Schema{i}": schema(i, depth, refs) for i in range(messages)},
+        "messages": {
+            f"Message{i}": {
+                "name": f"Message{i}",
+                "contentType": "application/json",
+                "payload": {"$ref": f"#/components/schemas/Schema{i}"},
+            }
+            for i in range(messages)
+        },
+    }
+
+
+def info(channels: int) -> dict[str, Any]:
+    return {
+        "title": f"Synthetic catalog with {channels} channels",
+        "version": "1.0.0",
+        "description": "Generated benchmark document",
+    }
+
+
+def generate_v3(
+    channels: int = 100,
+    messages: int = 20,
+    depth: int = 3,
+    refs: int = 2,
+    version: str = "3.0.0",
+) -> dict[str, Any]:
+    """AsyncAPI 3 document with ``channels`` channels and as many operations."""
+    messages = max(messages, 1)
+    return {
+        "asyncapi": version,
+        "info": info(channels),
+        "servers": {
+            "production": {
+                "host": "broker.example.com",
+                "protocol": "kafka",
+                "bindings": {"kafka": {"schemaRegistryUrl": "https://registry"}},
+            },
+        },
+        "channels": {
+            f"channel{i}": {
+                "address": f"service{i % 10}/{{entityId}}/event{i}",
+                "parameters": {"entityId": {"description": "Entity identifier"}},
+                "messages": {
+                    f"Message{j}": {"$ref": f"#/components/messages/Message{j}"}
+                    for j in (i % messages, (i + 1) % messages)
+                },
+                "servers": [{"$ref": "#/servers/production"}],
+            }
+            for i in range(channels)
+        },
+        "operations": {
+            f"operation{i}": {
+                "action": "send" if i % 2 else "receive",
+                "channel": {"$ref": f"#/channels/channel{i}"},
+                "messages": [
+                    {"$ref": f"#/channels/channel{i}/messages/Message{i % messages}"},
+                ],
+            }
+            for i in range(channels)
+        },
+        "components": components(messages, depth, refs),
+    }
+
+
+def generate_v2(
+    channels: int = 100,
+    messages: int = 20,
+    depth: int = 3,
+    refs: int = 2,
+) -> dict[str, Any]:
+    """AsyncAPI 2.6 document with ``channels`` channels."""
+    messages = max(messages, 1)
+    return {
+        "asyncapi": "2.6.0",
+        "info": info(channels),
+        "channels": {
+            f"service{i % 10}/{{entityId}}/event{i}": {
+                "parameters": {
+                    "entityId": {
+                        "description": "Entity identifier",
+                        "schema": {"type": "string"},
+                    },
+                },
+                "publish" if i % 2 else "subscribe": {
+                    "operationId": f"operation{i}",
+                    "message": {"$ref": f"#/components/messages/Message{i % messages}"},
+                },
+            }
+            for i in range(channels)
+        },
+        "components": components(messages, depth, refs),
+    }
+
+
+def generate(version: str = "3.0.0", **kwargs: Any) -> dict[str, Any]:
+    if version.startswith("2."):
+        return generate_v2(**kwargs)
+    return generate_v3(version=version, **kwargs)
@@ -0,0 +1,123 @@
+"""Benchmark cases and the machinery timing them."""
+
+import json
+import platform
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+from importlib.metadata import version
+from typing import Any
+
+from pydantic_asyncapi import AsyncAPI
+from pydantic_asyncapi.payload import message_validator
+from pydantic_asyncapi.v2 import AsyncAPI as AsyncAPIV2
+from pydantic_asyncapi.v3 import AsyncAPI as AsyncAPIV3
+
+from .generator import generate, payload
+
+Case = Callable[[], Any]
+Setup = Callable[[dict[str, Any], dict[str, int]], dict[str, Case]]
+
+DUMP_OPTIONS: dict[str, Any] = {"by_alias": True, "exclude_unset": True}
+
+
+def model_cases(data: dict[str, Any], _params: dict[str, int]) -> dict[str, Case]:
+    raw = json.dumps(data)
+    cases: dict[str, Case] = {}
+    version = "v2" if data["asyncapi"].startswith("2.") else "v3"
+    cls = AsyncAPIV2 if version == "v2" else AsyncAPIV3
+    for name, model in ((version, cls), (f"root-{version}", AsyncAPI)):
+        validated = model.model_validate(data)
+        cases[f"{name}.model_validate"] = partial(model.model_validate, data)
+        cases[f"{name}.model_validate_json"] = partial(model.model_validate_json, raw)
+        cases[f"{name}.model_dump"] = partial(validated.model_dump, **DUMP_OPTIONS)
+    return cases
+
+
+def payload_cases(data: dict[str, Any], params: dict[str, int]) -> dict[str, Case]:
+    if data["asyncapi"].startswith("2."):
+        return {}
+    document = AsyncAPIV3.model_validate(data)
+    components = document.components
+    if components is None or components.messages is None:
+        msg = "The generated document has no messages"
+        raise ValueError(msg)
+    message = components.messages["Message0"]
+    validator = message_validator(message, document)
+    payloads = [payload(0, params["depth"]) for _ in range(1000)]
+    raw = [json.dumps(p).encode() for p in payloads]
+
+    def validate() -> None:
+        for p in payloads:
+            validator(p)
+
+    def validate_json() -> None:
+        for r in raw:
+            validator.validate_json(r)
+
+    return {
+        "payload.validate[1000]": validate,
+        "payload.validate_json[1000]": validate_json,
+    }
+
+
+SETUPS: list[Setup] = [model_cases, payload_cases]
+
+
+def measure(case: Case, repeat: int) -> dict[str, Any]:
+    case()  # warm up (lazily built validators, caches)
+    seconds = min(timeit.repeat(case, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_memory": peak}
+
+
+def run(
+    *,
+    channels: int = 500,
+    messages: int = 50,
+    depth: int = 3,
+    refs: int = 2,
+    repeat: int = 5,
+    pattern: str = "",
+) -> dict[str, Any]:
+    params = {"channels": channels, "messages": messages, "depth": depth, "refs": refs}
+    documents = [generate(version, **params) for version in ("2.6.0", "3.0.0")]
+    results: list[dict[str, Any]] = []
+    for data in documents:
+        for setup in SETUPS:
+            for name, case in setup(data, params).items():
+                if pattern in name:
+                    results.append({"name": name, **measure(case, repeat)})
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "versions": {
+            package: version(package)
+            for package in ("pydantic-asyncapi", "pydantic", "pydantic-core")
+        },
+        "parameters": {**params, "repeat": repeat},
+        "cases": results,
+    }
+
+
+def compare(
+    previous: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float,
+) -> dict[str, float]:
+    """Cases that got slower than ``threshold`` times their previous timing."""
+    before = {case["name"]: case["seconds"] for case in previous["cases"]}
+    regressions = {}
+    for case in current["cases"]:
+        old = before.get(case["name"])
+        if old and case["seconds"] / old > threshold:
+            regressions[case["name"]] = case["seconds"] / old
+    return regressions
@@ -1,16 +1,56 @@
-from importlib.metadata import version
-from typing import Annotated, Union
+from typing import TYPE_CHECKING, Annotated, Any, Union
 
 from pydantic import Field, RootModel
 
-from .v2 import AsyncAPI as AsyncAPIV2
-from .v3 import AsyncAPI as AsyncAPIV3
+from .base import LAZY
 
-__version__ = version(__name__)
+if TYPE_CHECKING or not LAZY:
+    from importlib.metadata import version
 
-AsyncAPIType = Annotated[Union[AsyncAPIV2, AsyncAPIV3], Field(discriminator="asyncapi")]
+    from .v2 import AsyncAPI as AsyncAPIV2
+    from .v3 import AsyncAPI as AsyncAPIV3
 
-AsyncAPI = RootModel[AsyncAPIType]
+    __version__ = version(__name__)
+
+    AsyncAPIType = Annotated[
+        Union[AsyncAPIV2, AsyncAPIV3],
+        Field(discriminator="asyncapi"),
+    ]
+
+    AsyncAPI = RootModel[AsyncAPIType]
+
+else:
+
+    def __getattr__(name: str) -> Any:
+        # the models of both versions (and importlib.metadata) are only imported
+        # when needed, so using a single version does not pay for building the
+        # other one
+        if name == "__version__":
+            from importlib.metadata import version
+
+            value: Any = version(__name__)
+        elif name in {"v2", "v3"}:
+            from importlib import import_module
+
+            value = import_module(f".{name}", __name__)
+        elif name in {"AsyncAPI", "AsyncAPIType"}:
+            from .v2 import AsyncAPI as AsyncAPIV2
+            from .v3 import AsyncAPI as AsyncAPIV3
+
+            asyncapi_type = Annotated[
+                Union[AsyncAPIV2, AsyncAPIV3],
+                Field(discriminator="asyncapi"),
+            ]
+            globals().update(
+                AsyncAPIType=asyncapi_type,
+                AsyncAPI=RootModel[asyncapi_type],
+            )
+            value = globals()[name]
+        else:
+            msg = f"module {__name__!r} has no attribute {name!r}"
+            raise AttributeError(msg)
+        globals()[name] = value
+        return value
 
 
 __all__ = ["AsyncAPI", "AsyncAPIType", "__version__"]
@@ -1,11 +1,27 @@
-from typing import Annotated, Any, Literal, Optional, TypeVar, Union
+import os
+from contextvars import ContextVar
+from typing import Annotated, Any, Callable, Literal, Optional, TypeVar, Union
 
 import annotated_types
-from pydantic import AnyUrl, ConfigDict, Field, NonNegativeInt, PositiveFloat
+from pydantic import (
+    AnyUrl,
+    ConfigDict,
+    Field,
+    NonNegativeInt,
+    PositiveFloat,
+    ValidatorFunctionWrapHandler,
+    model_validator,
+)
 from pydantic import BaseModel as PydanticBaseModel
 
+from .interning import intern
+
 T = TypeVar("T")
 
+# Opt-in mode for short-lived processes: core schemas are built when a model is
+# first used and binding models are imported when a document declares them.
+LAZY = os.environ.get("PYDANTIC_ASYNCAPI_LAZY", "").lower() in {"1", "true", "yes"}
+
 SimpleTypes = Literal[
     "array",
     "boolean",
@@ -20,6 +36,14 @@ NonEmptyList = Annotated[list[T], annotated_types.MinLen(1)]
 StrEnum = NonEmptyList[str]
 
 
+# Called around the validation of every model while set (e.g. by ``profiling``),
+# with the model class, its input data and the handler validating it.
+ValidationHook = Callable[[type["BaseModel"], Any, ValidatorFunctionWrapHandler], Any]
+validation_hook: ContextVar[Optional[ValidationHook]] = ContextVar(
+    "validation_hook", default=None
+)
+
+
 class BaseModel(PydanticBaseModel):
     """Base model for all AsyncAPI models."""
 
@@ -27,8 +51,15 @@ class BaseModel(PydanticBaseModel):
         populate_by_name=True,
         use_enum_values=True,
         from_attributes=True,
+        defer_build=LAZY,
     )
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _hook(cls, data: Any, handler: ValidatorFunctionWrapHandler) -> Any:
+        hook = validation_hook.get()
+        return handler(data) if hook is None else hook(cls, data, handler)
+
 
 class ExtendableBaseModel(BaseModel):
     """Base model for all AsyncAPI models that can be extended."""
@@ -94,8 +125,13 @@ class Schema(BaseModel):
     oneOf: Optional["SchemaList"] = None
     not_: Optional["Schema"] = Field(None, alias="not")
 
+    @model_validator(mode="after")
+    def _intern(self) -> "Schema":
+        return intern(self)
+
 
 SchemaList = NonEmptyList[Schema]
 
 
-Schema.model_rebuild()
+if not LAZY:
+    Schema.model_rebuild()
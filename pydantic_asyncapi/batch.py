@@ -0,0 +1,119 @@
+"""Validation of batches of raw messages against the payload schemas of a document.
+
+Items are grouped by channel and message, so the message lookup and the compiled
+payload validator are resolved once per group instead of once per item.
+"""
+
+import json
+from collections.abc import AsyncIterable, Iterable
+from typing import Any, NamedTuple, Optional, Union
+
+from pydantic import BaseModel
+
+from . import v2, v3
+from .payload import message_validator
+from .resolver import Resolver
+from .utils import reference_of, split_pointer
+
+Item = tuple[str, str, Union[bytes, str]]
+
+
+class Result(NamedTuple):
+    ok: bool
+    error: Optional[Exception] = None
+
+
+OK = Result(ok=True)
+
+
+def _messages_v2(
+    resolver: Resolver,
+    channel: v2.ChannelItem,
+) -> Iterable[tuple[set[str], Any]]:
+    for action in ("publish", "subscribe"):
+        operation = getattr(channel, action)
+        if operation is None:
+            continue
+        message = operation.message
+        resolved = resolver.deref(message, (v2.Message, v2.OneOf))
+        candidates = resolved.oneOf if isinstance(resolved, v2.OneOf) else [message]
+        for candidate in candidates:
+            ref = reference_of(candidate)
+            resolved = resolver.deref(candidate, v2.Message)
+            names = {
+                name for name in (resolved.messageId, resolved.name) if name is not None
+            }
+            if ref is not None:
+                names.add(split_pointer(ref)[-1])
+            if len(candidates) == 1:
+                names.add(action)
+            yield names, resolved
+
+
+def find_message(document: BaseModel, channel_id: str, message_id: str) -> Any:
+    """Return the message ``message_id`` of channel ``channel_id``.
+
+    For v3 documents ``message_id`` is the key in ``Channel.messages``. For v2
+    documents it is the ``messageId``, ``name`` or component key of a message of the
+    ``publish``/``subscribe`` operations, or the operation (``"publish"``) itself.
+    """
+    resolver = Resolver.for_document(document)
+    channels = getattr(document, "channels", None) or {}
+    if channel_id not in channels:
+        msg = f"Unknown channel: {channel_id!r}"
+        raise LookupError(msg)
+    channel = resolver.deref(channels[channel_id])
+    if isinstance(channel, v3.Channel):
+        messages = channel.messages or {}
+        if message_id in messages:
+            return resolver.deref(messages[message_id], v3.Message)
+    elif isinstance(channel, v2.ChannelItem):
+        for names, message in _messages_v2(resolver, channel):
+            if message_id in names:
+                return message
+    msg = f"Unknown message {message_id!r} in channel {channel_id!r}"
+    raise LookupError(msg)
+
+
+def validate_batch(document: BaseModel, items: Iterable[Item]) -> list[Result]:
+    """Validate ``(channel_id, message_id, payload)`` items.
+
+    Returns one ``Result`` per item, in input order, instead of raising. Payloads
+    are JSON encoded ``bytes`` or ``str``.
+    """
+    groups: dict[tuple[str, str], list[tuple[int, Union[bytes, str]]]] = {}
+    count = 0
+    for channel_id, message_id, payload in items:
+        groups.setdefault((channel_id, message_id), []).append((count, payload))
+        count += 1
+
+    results: list[Result] = [OK] * count
+    loads = json.loads
+    for (channel_id, message_id), group in groups.items():
+        try:
+            message = find_message(document, channel_id, message_id)
+            check = message_validator(message, document).error
+        except Exception as e:
+            failed = Result(ok=False, error=e)
+            for index, _ in group:
+                results[index] = failed
+            continue
+        for index, payload in group:
+            try:
+                error = check(loads(payload))
+            except Exception as e:  # e.g. invalid or too deeply nested JSON
+                results[index] = Result(ok=False, error=e)
+                continue
+            if error is not None:
+                results[index] = Result(ok=False, error=error)
+    return results
+
+
+async def avalidate_batch(
+    document: BaseModel,
+    items: Union[AsyncIterable[Item], Iterable[Item]],
+) -> list[Result]:
+    """Like ``validate_batch``, for items produced by an async iterable."""
+    if isinstance(items, AsyncIterable):
+        items = [item async for item in items]
+    return validate_batch(document, items)
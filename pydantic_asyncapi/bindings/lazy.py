@@ -0,0 +1,71 @@
+"""Binding types which import their module the first time they are validated.
+
+Used by ``pydantic_asyncapi.common`` instead of the binding models when the package
+is imported with ``PYDANTIC_ASYNCAPI_LAZY=1``, so a document only pays for the
+protocols it actually declares bindings for.
+"""
+
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Annotated, Any
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import CoreSchema, core_schema
+
+from pydantic_asyncapi.utils import REF_KEY, type_adapter
+
+MODULES = {
+    "AMQP": "amqp",
+    "AnypointMQ": "anypointmq",
+    "GooglePubSub": "googlepubsub",
+    "HTTP": "http",
+    "IBMMQ": "ibmmq",
+    "Kafka": "kafka",
+    "MQTT": "mqtt",
+    "Nats": "nats",
+    "Pulsar": "pulsar",
+    "SNS": "sns",
+    "Solace": "solace",
+    "SQS": "sqs",
+    "WebSockets": "websockets",
+}
+
+
+@dataclass(frozen=True)
+class LazyBinding:
+    module: str
+    name: str
+
+    def load(self) -> Any:
+        module = import_module(f"{__package__}.{self.module}")
+        return getattr(module, self.name)
+
+    def validate(self, value: Any) -> Any:
+        if isinstance(value, dict) and REF_KEY in value:
+            # leave references to the ``Reference`` member of the union
+            msg = "Binding is a reference"
+            raise ValueError(msg)
+        return type_adapter(self.load()).validate_python(value)
+
+    def __get_pydantic_core_schema__(
+        self,
+        source: Any,
+        handler: GetCoreSchemaHandler,
+    ) -> CoreSchema:
+        return core_schema.no_info_plain_validator_function(self.validate)
+
+    def __get_pydantic_json_schema__(
+        self,
+        schema: CoreSchema,
+        handler: GetJsonSchemaHandler,
+    ) -> JsonSchemaValue:
+        return handler(type_adapter(self.load()).core_schema)
+
+
+def __getattr__(name: str) -> Any:
+    for prefix, module in MODULES.items():
+        if name.startswith(prefix):
+            return Annotated[Any, LazyBinding(module, name)]
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
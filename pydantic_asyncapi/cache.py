@@ -0,0 +1,175 @@
+"""On-disk cache of validated documents keyed by the content of their source.
+
+Entries are pickled models: unpickling restores the model instances without running
+validation again. Only point the cache at a directory that is not writable by
+untrusted parties, since unpickling data from it can execute arbitrary code.
+"""
+
+import hashlib
+import os
+import pickle  # nosec B403
+import platform
+import sys
+import tempfile
+from collections.abc import Iterator
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import pydantic
+import pydantic_core
+from pydantic import BaseModel
+
+SUFFIX = ".pickle"
+
+Loader = Callable[[bytes], BaseModel]
+
+
+def fingerprint() -> str:
+    """Identify the library, pydantic and interpreter versions entries depend on."""
+    try:
+        library = version("pydantic-asyncapi")
+    except PackageNotFoundError:  # pragma: no cover
+        library = "unknown"
+    parts = (
+        library,
+        pydantic.VERSION,
+        pydantic_core.__version__,
+        platform.python_implementation(),
+        f"{sys.version_info[0]}.{sys.version_info[1]}",
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:12]
+
+
+def validate_json(source: bytes) -> BaseModel:
+    from .parse import parse
+
+    return parse(source)
+
+
+def loader_namespace(loader: Loader) -> str:
+    """Qualified name of ``loader``, which keys the documents it loads."""
+    name = f"{loader.__module__}.{loader.__qualname__}"
+    if "<lambda>" in name:
+        msg = f"Loader {name} has no unique name, pass a namespace to load it"
+        raise ValueError(msg)
+    return name
+
+
+DEFAULT_NAMESPACE = loader_namespace(validate_json)
+
+
+class DocumentCache:
+    """Validated documents stored in ``directory``, at most ``max_size`` bytes.
+
+    Entries of other library/pydantic versions are deleted when the cache is
+    opened, and the least recently used entries are evicted above ``max_size``.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike[str]],
+        max_size: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.prefix = fingerprint()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in self._entries():
+            if not path.name.startswith(self.prefix):
+                path.unlink(missing_ok=True)
+
+    def key(self, source: bytes, namespace: str = DEFAULT_NAMESPACE) -> str:
+        """Key of the document loaded from ``source`` in ``namespace``, which
+        tells apart the results of different loaders."""
+        digest = hashlib.sha256(namespace.encode())
+        digest.update(b"\0")
+        digest.update(source)
+        return f"{self.prefix}-{digest.hexdigest()}"
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> Optional[BaseModel]:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            document = pickle.loads(data)  # noqa: S301 # nosec B301
+        except Exception:
+            # truncated or written by an incompatible environment
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return document
+
+    def put(self, key: str, document: BaseModel) -> None:
+        data = pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+        # written to a temporary file first so that readers never see partial data
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            Path(temp).replace(self.path(key))
+        except BaseException:
+            Path(temp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def load(
+        self,
+        source: bytes,
+        loader: Loader = validate_json,
+        namespace: Optional[str] = None,
+    ) -> BaseModel:
+        """Return the cached document of ``source`` or validate it with ``loader``.
+
+        The default ``loader`` validates JSON; pass e.g.
+        ``lambda s: AsyncAPI.model_validate(yaml.safe_load(s)).root`` for YAML.
+        Documents are cached per ``namespace``, the qualified name of ``loader``
+        by default, which lambdas do not have: they need an explicit namespace.
+        """
+        if namespace is None:
+            namespace = loader_namespace(loader)
+        key = self.key(source, namespace)
+        document = self.get(key)
+        if document is None:
+            document = loader(source)
+            self.put(key, document)
+        return document
+
+    def load_path(
+        self,
+        path: Union[str, os.PathLike[str]],
+        loader: Loader = validate_json,
+        namespace: Optional[str] = None,
+    ) -> BaseModel:
+        return self.load(Path(path).read_bytes(), loader, namespace)
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until ``max_size`` is met."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+    def _entries(self) -> Iterator[Path]:
+        return self.directory.glob(f"*{SUFFIX}")
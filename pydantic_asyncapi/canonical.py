@@ -0,0 +1,91 @@
+"""Canonical JSON of models and stable fingerprints of their content.
+
+The canonical form is the data of ``model_dump(mode="json", by_alias=True,
+exclude_unset=True)`` written without whitespace, with keys sorted (by code point)
+and numbers normalized: integral floats are written as integers (``1.0`` as ``1``,
+``-0.0`` as ``0``) and other floats in their shortest round-tripping form. Equal
+content therefore has the same bytes however it was parsed, constructed or
+ordered, which makes them suitable for cache keys and ETags.
+
+``content_hash`` is memoized per instance, like the other per-document caches, so
+it assumes that models are not modified in place once hashed.
+"""
+
+import json
+import math
+from hashlib import sha256
+from typing import Any, Union
+
+from pydantic import BaseModel, RootModel
+from pydantic_core import to_jsonable_python
+
+from .utils import IdentityCache, model_keys
+
+# floats above this are not all integers that JSON parsers read back exactly
+MAX_SAFE_INTEGER = 2**53
+
+_hashes: IdentityCache[BaseModel, str] = IdentityCache()
+
+
+def _number(value: float) -> Union[int, float]:
+    if not math.isfinite(value):
+        msg = f"{value!r} has no JSON representation"
+        raise ValueError(msg)
+    if value.is_integer() and abs(value) <= MAX_SAFE_INTEGER:
+        return int(value)
+    return value
+
+
+def _model_data(model: BaseModel) -> Any:
+    if isinstance(model, RootModel):
+        return canonical_data(model.root)
+    fields_set = model.model_fields_set
+    values = model.__dict__
+    data = {
+        key: canonical_data(values[name])
+        for name, key in model_keys(type(model))
+        if name in fields_set
+    }
+    for key, item in (model.__pydantic_extra__ or {}).items():
+        data[key] = canonical_data(item)
+    return data
+
+
+def canonical_data(node: Any) -> Any:
+    """JSON-compatible data of ``node`` (a model, container or value) with the
+    numbers normalized."""
+    if isinstance(node, BaseModel):
+        return _model_data(node)
+    if isinstance(node, dict):
+        return {key: canonical_data(item) for key, item in node.items()}
+    if isinstance(node, (list, tuple)):
+        return [canonical_data(item) for item in node]
+    if node is None or type(node) in {str, int, bool}:
+        return node
+    if type(node) is float:
+        return _number(node)
+    return canonical_data(to_jsonable_python(node))
+
+
+def canonical_json(node: Any) -> bytes:
+    """Canonical JSON of ``node``, encoded in UTF-8.
+
+    Raises ``ValueError`` for values that JSON cannot represent (``NaN`` and
+    infinities).
+    """
+    return json.dumps(
+        canonical_data(node),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode()
+
+
+def content_hash(model: BaseModel) -> str:
+    """SHA-256 (in hex) of the canonical JSON of ``model``, computed once per
+    instance."""
+    digest = _hashes.get(model)
+    if digest is None:
+        digest = _hashes[model] = sha256(canonical_json(model)).hexdigest()
+    return digest
@@ -1,38 +1,87 @@
-from typing import Any, Literal, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Any, Literal, Optional, TypeVar, Union
 
 from pydantic import AnyUrl, Field
 
-from .base import ExtendableBaseModel, Reference, Schema, StrEnum, TypeOrRef, TypeRefMap
-from .bindings.amqp import AMQPChannelBinding, AMQPMessageBinding, AMQPOperationBinding
-from .bindings.anypointmq import AnypointMQChannelBinding, AnypointMQMessageBinding
-from .bindings.googlepubsub import (
-    GooglePubSubChannelBinding,
-    GooglePubSubMessageBinding,
+from .base import (
+    LAZY,
+    ExtendableBaseModel,
+    Reference,
+    Schema,
+    StrEnum,
+    TypeOrRef,
+    TypeRefMap,
 )
-from .bindings.http import (
-    HTTPMessageBinding,
-    HTTPOperationBinding,
-)
-from .bindings.ibmmq import (
-    IBMMQChannelBinding,
-    IBMMQOperationBinding,
-    IBMMQServerBinding,
-)
-from .bindings.kafka import (
-    KafkaChannelBinding,
-    KafkaOperationBinding,
-    KafkaServerBinding,
-)
-from .bindings.mqtt import MQTTMessageBinding, MQTTOperationBinding, MQTTServerBinding
-from .bindings.nats import NatsOperationBinding
-from .bindings.pulsar import (
-    PulsarChannelBinding,
-    PulsarServerBinding,
-)
-from .bindings.sns import SNSChannelBinding, SNSOperationBinding
-from .bindings.solace import SolaceOperationBinding, SolaceServerBinding
-from .bindings.sqs import SQSChannelBinding, SQSOperationBinding
-from .bindings.websockets import WebSocketsChannelBinding
+
+if TYPE_CHECKING or not LAZY:
+    from .bindings.amqp import (
+        AMQPChannelBinding,
+        AMQPMessageBinding,
+        AMQPOperationBinding,
+    )
+    from .bindings.anypointmq import AnypointMQChannelBinding, AnypointMQMessageBinding
+    from .bindings.googlepubsub import (
+        GooglePubSubChannelBinding,
+        GooglePubSubMessageBinding,
+    )
+    from .bindings.http import (
+        HTTPMessageBinding,
+        HTTPOperationBinding,
+    )
+    from .bindings.ibmmq import (
+        IBMMQChannelBinding,
+        IBMMQOperationBinding,
+        IBMMQServerBinding,
+    )
+    from .bindings.kafka import (
+        KafkaChannelBinding,
+        KafkaOperationBinding,
+        KafkaServerBinding,
+    )
+    from .bindings.mqtt import (
+        MQTTMessageBinding,
+        MQTTOperationBinding,
+        MQTTServerBinding,
+    )
+    from .bindings.nats import NatsOperationBinding
+    from .bindings.pulsar import (
+        PulsarChannelBinding,
+        PulsarServerBinding,
+    )
+    from .bindings.sns import SNSChannelBinding, SNSOperationBinding
+    from .bindings.solace import SolaceOperationBinding, SolaceServerBinding
+    from .bindings.sqs import SQSChannelBinding, SQSOperationBinding
+    from .bindings.websockets import WebSocketsChannelBinding
+else:
+    from .bindings.lazy import (
+        AMQPChannelBinding,
+        AMQPMessageBinding,
+        AMQPOperationBinding,
+        AnypointMQChannelBinding,
+        AnypointMQMessageBinding,
+        GooglePubSubChannelBinding,
+        GooglePubSubMessageBinding,
+        HTTPMessageBinding,
+        HTTPOperationBinding,
+        IBMMQChannelBinding,
+        IBMMQOperationBinding,
+        IBMMQServerBinding,
+        KafkaChannelBinding,
+        KafkaOperationBinding,
+        KafkaServerBinding,
+        MQTTMessageBinding,
+        MQTTOperationBinding,
+        MQTTServerBinding,
+        NatsOperationBinding,
+        PulsarChannelBinding,
+        PulsarServerBinding,
+        SNSChannelBinding,
+        SNSOperationBinding,
+        SolaceOperationBinding,
+        SolaceServerBinding,
+        SQSChannelBinding,
+        SQSOperationBinding,
+        WebSocketsChannelBinding,
+    )
 
 T = TypeVar("T")
 
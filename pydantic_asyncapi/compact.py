@@ -0,0 +1,153 @@
+"""Compact, read-only representation of the nodes of a validated document.
+
+Every validated ``Schema`` owns three empty dicts (``definitions``, ``properties``
+and ``patternProperties``) and, like every ``Reference``, its own set of set fields.
+``compact`` turns ``Schema`` and ``Reference`` nodes into read-only variants that
+share these with other nodes and intern their string values. Dumping (with or
+without ``exclude_unset=True``) is unaffected.
+"""
+
+import sys
+from copy import deepcopy
+from typing import Any, NoReturn, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from .base import Reference, Schema
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class FrozenDict(dict[Any, Any]):
+    """Empty dict shared by compact nodes in place of their default ``{}``."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:
+        msg = "Containers of compact nodes are read-only"
+        raise TypeError(msg)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+EMPTY = FrozenDict()
+
+# shared by all compact nodes with the same set fields, never modified in place
+_fields_sets: dict[frozenset[str], set[str]] = {}
+
+
+class Compact:
+    """Mixin of the compact node classes.
+
+    ``model_copy()`` (and ``copy.deepcopy``) return a regular, mutable node.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        msg = f"{type(self).__name__} is read-only, use model_copy() to modify it"
+        raise TypeError(msg)
+
+    __delattr__ = __setattr__  # type: ignore[assignment]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return thaw(self) == thaw(other)  # type: ignore[type-var]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __copy__(self) -> Any:
+        return thaw(self)  # type: ignore[type-var]
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> Any:
+        return deepcopy(thaw(self), memo)  # type: ignore[type-var]
+
+
+class CompactSchema(Compact, Schema):
+    pass
+
+
+class CompactReference(Compact, Reference):
+    pass
+
+
+COMPACT: dict[type[BaseModel], type[BaseModel]] = {
+    Schema: CompactSchema,
+    Reference: CompactReference,
+}
+REGULAR = {compact: cls for cls, compact in COMPACT.items()}
+
+
+def _dict_defaults(cls: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(
+        name for name, field in cls.model_fields.items() if field.default == {}
+    )
+
+
+DICT_DEFAULTS = {cls: _dict_defaults(cls) for cls in COMPACT}
+
+
+def compact_node(node: M) -> M:
+    """Turn ``node`` into its compact variant in place."""
+    cls = COMPACT.get(type(node))
+    if cls is None:
+        return node
+    values = node.__dict__
+    # unset fields hold their defaults, so only the set ones have strings to intern
+    fields_set = frozenset(node.model_fields_set)
+    for name in fields_set:
+        value = values[name]
+        if type(value) is str:
+            values[name] = sys.intern(value)
+    for name in DICT_DEFAULTS[type(node)]:
+        if values[name] == {}:
+            values[name] = EMPTY
+    object.__setattr__(node, "__class__", cls)
+    object.__setattr__(
+        node,
+        "__pydantic_fields_set__",
+        _fields_sets.setdefault(fields_set, set(fields_set)),
+    )
+    return node
+
+
+def compact(document: M) -> M:
+    """Compact every ``Schema`` and ``Reference`` of ``document`` in place.
+
+    The compacted nodes are read-only, so this is meant for documents that are
+    kept around for lookups, e.g. in a registry of specs.
+    """
+    seen: set[int] = set()
+    stack: list[Any] = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BaseModel):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            values = node.__dict__
+            stack.extend(values[name] for name in node.model_fields_set)
+            if node.__pydantic_extra__:
+                stack.extend(node.__pydantic_extra__.values())
+            compact_node(node)
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return document
+
+
+def thaw(node: M) -> M:
+    """Return a regular copy of a compact ``node`` (or ``node`` itself)."""
+    cls = REGULAR.get(type(node))
+    if cls is None:
+        return node
+    values = {
+        name: {} if value is EMPTY else value for name, value in node.__dict__.items()
+    }
+    return cls.model_construct(  # type: ignore[return-value]
+        _fields_set=set(node.model_fields_set),
+        **values,
+    )
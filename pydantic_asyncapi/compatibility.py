@@ -0,0 +1,568 @@
+"""Compatibility of payload schemas, in the style of schema registries.
+
+A new schema is *backward* compatible with an old one when every payload valid
+against the old schema is valid against the new one (consumers can upgrade first),
+*forward* compatible when every payload valid against the new schema is valid
+against the old one (producers can upgrade first), and *fully* compatible when both
+hold. Both directions reduce to whether a schema accepts a subset of the payloads
+of another, which ``CompatibilityChecker`` decides conservatively: when inclusion
+cannot be proven (e.g. for differing ``pattern``s), it is reported as an
+incompatibility.
+
+Results are memoized on pairs of subtrees, so the schemas shared by many messages
+(or by many versions of a message) are compared once. Recursive schemas are
+compared coinductively: a pair that is being compared is assumed to be included.
+"""
+
+import math
+import re
+from collections.abc import Callable
+from typing import Any, Optional, Union
+
+from pydantic import BaseModel
+
+from .base import Schema
+from .payload import Error, SchemaCompiler, is_multiple
+from .resolver import Resolver
+
+BACKWARD = "backward"
+FORWARD = "forward"
+FULL = "full"
+
+# resolvers of the references of the first and the second schema of a comparison
+Sides = tuple[Optional[Resolver], Optional[Resolver]]
+# constraints of the values of a property: schemas, or whether any value is allowed
+Constraints = Union[list[Schema], bool]
+Compare = Callable[[Schema, Schema, Sides], Optional[Error]]
+
+TYPES = frozenset(("array", "boolean", "integer", "null", "number", "object", "string"))
+NUMBERS = frozenset(("integer", "number"))
+
+# keywords that do not constrain the values a schema accepts
+ANNOTATIONS = frozenset(
+    (
+        "field_id",
+        "field_schema",
+        "field_comment",
+        "title",
+        "description",
+        "default",
+        "examples",
+        "readOnly",
+        "writeOnly",
+        "definitions",
+        "contentMediaType",
+        "contentEncoding",
+    )
+)
+
+
+def _error(message: str, *path: Union[str, int]) -> Error:
+    return path, message
+
+
+def _nested(error: Optional[Error], *path: Union[str, int]) -> Optional[Error]:
+    return None if error is None else ((*path, *error[0]), error[1])
+
+
+def _is_set(schema: Schema, name: str) -> bool:
+    value = getattr(schema, name)
+    if value is None or value == {}:
+        return False
+    if name == "additionalProperties":
+        return value is not True
+    return name != "uniqueItems" or value
+
+
+def accepts_anything(schema: Schema) -> bool:
+    """Whether ``schema`` has no keyword constraining the values it accepts."""
+    return all(
+        name in ANNOTATIONS or not _is_set(schema, name)
+        for name in schema.model_fields_set
+    )
+
+
+def _types(schema: Schema) -> frozenset[str]:
+    if schema.type is None:
+        return TYPES
+    return frozenset([schema.type] if isinstance(schema.type, str) else schema.type)
+
+
+def _type_accepted(name: str, types: frozenset[str]) -> bool:
+    return name in types or (name == "integer" and "number" in types)
+
+
+def _values(schema: Schema) -> Optional[list[Any]]:
+    """The values ``schema`` is restricted to by ``enum`` or ``const``, if any."""
+    if schema.enum is not None:
+        return list(schema.enum)
+    if "const" in schema.model_fields_set:
+        return [schema.const]
+    return None
+
+
+def _bound(
+    schema: Schema, inclusive: str, exclusive: str
+) -> Optional[tuple[float, bool]]:
+    """Tightest of the inclusive and exclusive bound: its value and exclusiveness."""
+    bounds = [
+        (value, is_exclusive)
+        for value, is_exclusive in (
+            (getattr(schema, inclusive), False),
+            (getattr(schema, exclusive), True),
+        )
+        if value is not None
+    ]
+    if not bounds:
+        return None
+    tighter = max if inclusive == "minimum" else min
+    value = tighter(b[0] for b in bounds)
+    return value, any(b == (value, True) for b in bounds)
+
+
+def _within(
+    a: Optional[tuple[float, bool]], b: Optional[tuple[float, bool]], sign: int
+) -> bool:
+    """Whether the bound ``a`` is at least as tight as ``b`` (``sign`` is 1 for
+    lower bounds, -1 for upper bounds)."""
+    if b is None:
+        return True
+    if a is None:
+        return False
+    if a[0] != b[0]:
+        return (a[0] - b[0]) * sign > 0
+    return a[1] or not b[1]
+
+
+def _at_least(a: Optional[int], b: Optional[int]) -> bool:
+    return not b or (a is not None and a >= b)
+
+
+def _at_most(a: Optional[int], b: Optional[int]) -> bool:
+    return b is None or (a is not None and a <= b)
+
+
+def _is_multiple(a: Optional[float], b: Optional[float]) -> bool:
+    if b is None:
+        return True
+    if a is None:
+        return False
+    return is_multiple(a, b)
+
+
+def _numbers(a: Schema, b: Schema, _: Sides) -> Optional[Error]:
+    if not _within(
+        _bound(a, "minimum", "exclusiveMinimum"),
+        _bound(b, "minimum", "exclusiveMinimum"),
+        1,
+    ):
+        return _error("minimum is lower", "minimum")
+    if not _within(
+        _bound(a, "maximum", "exclusiveMaximum"),
+        _bound(b, "maximum", "exclusiveMaximum"),
+        -1,
+    ):
+        return _error("maximum is higher", "maximum")
+    if not _is_multiple(a.multipleOf, b.multipleOf):
+        return _error(f"values must be multiples of {b.multipleOf}", "multipleOf")
+    return None
+
+
+def _strings(a: Schema, b: Schema, _: Sides) -> Optional[Error]:
+    if not _at_least(a.minLength, b.minLength):
+        return _error(f"must be at least {b.minLength} characters long", "minLength")
+    if not _at_most(a.maxLength, b.maxLength):
+        return _error(f"must be at most {b.maxLength} characters long", "maxLength")
+    if b.pattern is not None and a.pattern != b.pattern:
+        return _error(f"must match {b.pattern!r}", "pattern")
+    if b.format is not None and a.format != b.format:
+        return _error(f"must have format {b.format!r}", "format")
+    return None
+
+
+def _patterns(schema: Schema, name: str) -> list[Schema]:
+    return [
+        s for p, s in (schema.patternProperties or {}).items() if re.search(p, name)
+    ]
+
+
+def _constraints(schema: Schema, name: str) -> Constraints:
+    """Schemas that the value of property ``name`` must match in ``schema``."""
+    properties = schema.properties or {}
+    if name in properties:
+        return [properties[name], *_patterns(schema, name)]
+    patterns = _patterns(schema, name)
+    if patterns:
+        return patterns
+    return _additional(schema)
+
+
+def _additional(schema: Schema) -> Constraints:
+    additional = schema.additionalProperties
+    if additional is None or isinstance(additional, bool):
+        return additional is not False
+    return [additional]
+
+
+class CompatibilityChecker:
+    """Compares schemas, memoizing the result for every pair of subtrees.
+
+    References (``$ref``) are resolved with the resolvers of the documents the
+    schemas belong to. A checker can be reused for many comparisons, e.g. every
+    version of every message of a catalog.
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[tuple[int, ...], Optional[Error]] = {}
+        # compared schemas and resolvers, so that their ids are not reused
+        self._keep: list[Any] = []
+        self._pending: dict[tuple[int, ...], int] = {}
+        # lowest depth of the pending comparisons assumed by the current one
+        self._low = math.inf
+        self._compilers: dict[int, SchemaCompiler] = {}
+
+    def __len__(self) -> int:
+        """Number of memoized comparisons."""
+        return len(self._results)
+
+    def check(
+        self,
+        old: Schema,
+        new: Schema,
+        mode: str = BACKWARD,
+        old_document: Optional[BaseModel] = None,
+        new_document: Optional[BaseModel] = None,
+    ) -> Optional[Error]:
+        """Why ``new`` is not compatible with ``old`` in ``mode``, ``None`` if it is.
+
+        The documents are needed to resolve references.
+        """
+        if mode not in {BACKWARD, FORWARD, FULL}:
+            msg = f"Invalid compatibility mode: {mode!r}"
+            raise ValueError(msg)
+        old_resolver = (
+            None if old_document is None else Resolver.for_document(old_document)
+        )
+        new_resolver = (
+            None if new_document is None else Resolver.for_document(new_document)
+        )
+        if mode != FORWARD:
+            error = self.subschema(old, new, (old_resolver, new_resolver))
+            if error is not None:
+                return error
+        if mode != BACKWARD:
+            return self.subschema(new, old, (new_resolver, old_resolver))
+        return None
+
+    def is_compatible(
+        self,
+        old: Schema,
+        new: Schema,
+        mode: str = BACKWARD,
+        old_document: Optional[BaseModel] = None,
+        new_document: Optional[BaseModel] = None,
+    ) -> bool:
+        return self.check(old, new, mode, old_document, new_document) is None
+
+    def subschema(
+        self, a: Schema, b: Schema, sides: Sides = (None, None)
+    ) -> Optional[Error]:
+        """Why a value valid against ``a`` may be invalid against ``b``, ``None`` if
+        every one is valid. The path of the error is a path of keywords of ``b``."""
+        a = self._deref(a, sides[0])
+        b = self._deref(b, sides[1])
+        if a is b and sides[0] is sides[1]:
+            return None
+        key = (id(a), id(b), id(sides[0]), id(sides[1]))
+        if key in self._results:
+            return self._results[key]
+        depth = self._pending.get(key)
+        if depth is not None:
+            self._low = min(self._low, depth)
+            return None
+        depth = self._pending[key] = len(self._pending)
+        outer, self._low = self._low, math.inf
+        try:
+            error = self._compare(a, b, sides)
+        finally:
+            del self._pending[key]
+        # an inclusion assuming an enclosing pending comparison is not final yet
+        if error is not None or self._low >= depth:
+            self._results[key] = error
+            self._keep.append((a, b, sides))
+        self._low = min(outer, self._low) if self._low < depth else outer
+        return error
+
+    def _deref(self, schema: Schema, resolver: Optional[Resolver]) -> Schema:
+        if schema.field_ref is None:
+            return schema
+        if resolver is None:
+            msg = f"Cannot compare {schema.field_ref!r} without its document"
+            raise ValueError(msg)
+        resolved: Schema = resolver.resolve(schema, Schema)
+        return resolved
+
+    def _compiler(self, resolver: Optional[Resolver]) -> SchemaCompiler:
+        compiler = self._compilers.get(id(resolver))
+        if compiler is None:
+            compiler = self._compilers[id(resolver)] = SchemaCompiler(resolver)
+            self._keep.append(resolver)
+        return compiler
+
+    def _compare(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        if accepts_anything(b):
+            return None
+        values = _values(a)
+        if values is not None:
+            return self._accepted(values, b, sides)
+        error = self._against(a, b, sides)
+        if error is None or self._any_branch(a, b, sides):
+            return None
+        return error
+
+    def _accepted(self, values: list[Any], b: Schema, sides: Sides) -> Optional[Error]:
+        """Check each of a finite set of values against ``b``."""
+        check = self._compiler(sides[1]).check(b)
+        for value in values:
+            error = check(value)
+            if error is not None:
+                return _error(f"{value!r} is not accepted: {error[1]}", *error[0])
+        return None
+
+    def _any_branch(self, a: Schema, b: Schema, sides: Sides) -> bool:
+        """Whether the combinators of ``a`` prove it included in ``b``: its values
+        match all of ``a.allOf`` and one of ``a.anyOf`` (or ``a.oneOf``)."""
+        for branches in (a.anyOf, a.oneOf):
+            if branches and all(self.subschema(x, b, sides) is None for x in branches):
+                return True
+        return any(self.subschema(x, b, sides) is None for x in a.allOf or ())
+
+    def _against(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        """Compare ``a`` with every keyword of ``b``."""
+        if _values(b) is not None:
+            return _error("values are restricted", "enum" if b.enum else "const")
+        types = _types(a)
+        for name in sorted(types):
+            if not _type_accepted(name, _types(b)):
+                return _error(f"{name} is not accepted", "type")
+        checks: list[Compare] = [self._combinators, self._conditions]
+        if types & NUMBERS:
+            checks.append(_numbers)
+        if "string" in types:
+            checks.append(_strings)
+        if "array" in types:
+            checks.append(self._arrays)
+        if "object" in types:
+            checks.extend((self._objects, self._properties, self._names))
+        for check in checks:
+            error = check(a, b, sides)
+            if error is not None:
+                return error
+        return None
+
+    def _combinators(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        for i, member in enumerate(b.allOf or ()):
+            error = self.subschema(a, member, sides)
+            if error is not None:
+                return _nested(error, "allOf", i)
+        if b.anyOf and all(self.subschema(a, x, sides) for x in b.anyOf):
+            return _error("does not match any of the anyOf schemas", "anyOf")
+        if b.oneOf and not self._one_of(a, b.oneOf, sides):
+            return _error("does not match exactly one of the oneOf schemas", "oneOf")
+        # the values excluded by ``b`` must be excluded by ``a`` as well
+        if b.not_ is not None and (
+            a.not_ is None or self.subschema(b.not_, a.not_, (sides[1], sides[0]))
+        ):
+            return _error("values excluded by not are accepted", "not")
+        return None
+
+    def _one_of(self, a: Schema, branches: list[Schema], sides: Sides) -> bool:
+        for i, branch in enumerate(branches):
+            if self.subschema(a, branch, sides) is None:
+                branch = self._deref(branch, sides[1])
+                return all(
+                    self._disjoint(branch, self._deref(other, sides[1]), sides[1])
+                    for j, other in enumerate(branches)
+                    if j != i
+                )
+        return False
+
+    def _disjoint(
+        self, a: Schema, b: Schema, resolver: Optional[Resolver], depth: int = 0
+    ) -> bool:
+        """Whether no value is valid against both ``a`` and ``b`` (conservatively)."""
+        if not any(_type_accepted(t, _types(b)) for t in _types(a)) and not any(
+            _type_accepted(t, _types(a)) for t in _types(b)
+        ):
+            return True
+        a_values, b_values = _values(a), _values(b)
+        if a_values is not None and b_values is not None:
+            return not any(value in b_values for value in a_values)
+        if depth > 1:
+            return False
+        # e.g. objects discriminated by a required property with distinct values
+        a_properties, b_properties = a.properties or {}, b.properties or {}
+        required = set(a.required or ()) & set(b.required or ())
+        return any(
+            self._disjoint(
+                self._deref(a_properties[name], resolver),
+                self._deref(b_properties[name], resolver),
+                resolver,
+                depth + 1,
+            )
+            for name in required
+            if name in a_properties and name in b_properties
+        )
+
+    def _conditions(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        # whichever branch applies, the values of ``a`` must match it
+        for name, branch in (("then", b.then), ("else", b.else_)):
+            if b.if_ is not None and branch is not None:
+                error = self.subschema(a, branch, sides)
+                if error is not None:
+                    return _nested(error, name)
+        for name, dependency in (b.dependencies or {}).items():
+            if isinstance(dependency, list):
+                own = (a.dependencies or {}).get(name)
+                implied = set(own) if isinstance(own, list) else set()
+                if not set(dependency) <= implied | set(a.required or ()):
+                    return _error("dependencies are missing", "dependencies", name)
+            else:
+                error = self.subschema(a, dependency, sides)
+                if error is not None:
+                    return _nested(error, "dependencies", name)
+        return None
+
+    def _arrays(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        if not _at_least(a.minItems, b.minItems):
+            return _error(f"must have at least {b.minItems} items", "minItems")
+        if not _at_most(a.maxItems, b.maxItems):
+            return _error(f"must have at most {b.maxItems} items", "maxItems")
+        if b.uniqueItems and not a.uniqueItems:
+            return _error("items must be unique", "uniqueItems")
+        if b.contains is not None:
+            if a.contains is None:
+                return _error("must contain a matching item", "contains")
+            return _nested(self.subschema(a.contains, b.contains, sides), "contains")
+        return self._items(a, b, sides)
+
+    def _items(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        if b.items is None:
+            return None
+        if isinstance(b.items, list):
+            return self._tuples(a, b, b.items, sides)
+        # a tuple of ``a`` is followed by its additional items
+        items = (
+            [*a.items, a.additionalItems] if isinstance(a.items, list) else [a.items]
+        )
+        for item in items:
+            if item is None:
+                if not accepts_anything(self._deref(b.items, sides[1])):
+                    return _error("items of any type are not accepted", "items")
+                continue
+            error = self.subschema(item, b.items, sides)
+            if error is not None:
+                return _nested(error, "items")
+        return None
+
+    def _tuples(
+        self, a: Schema, b: Schema, items: list[Schema], sides: Sides
+    ) -> Optional[Error]:
+        # tuples are only compared with tuples of the same length
+        if not isinstance(a.items, list) or len(a.items) != len(items):
+            return _error("items differ", "items")
+        pairs = list(zip(a.items, items))
+        if b.additionalItems is not None:
+            if a.additionalItems is None:
+                return _error("additional items are not accepted", "additionalItems")
+            pairs.append((a.additionalItems, b.additionalItems))
+        for i, (x, y) in enumerate(pairs):
+            error = self.subschema(x, y, sides)
+            if error is not None:
+                return _nested(error, "items", i)
+        return None
+
+    def _objects(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        missing = set(b.required or ()) - set(a.required or ())
+        if missing:
+            return _error(f"{min(missing)!r} is required", "required")
+        if not _at_least(a.minProperties, b.minProperties):
+            return _error(
+                f"must have at least {b.minProperties} properties", "minProperties"
+            )
+        if not _at_most(a.maxProperties, b.maxProperties):
+            return _error(
+                f"must have at most {b.maxProperties} properties", "maxProperties"
+            )
+        return None
+
+    def _properties(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        names = dict.fromkeys([*(a.properties or {}), *(b.properties or {})])
+        for name in names:
+            error = self._values_of(_constraints(a, name), _constraints(b, name), sides)
+            if error is not None:
+                return _nested(error, "properties", name)
+        # properties that neither declares, and that match no pattern of ``b``:
+        # unless ``a`` only has patterns of ``b``, they may match one of ``a``
+        own_patterns = set(a.patternProperties or {})
+        mirrored = own_patterns <= set(b.patternProperties or {})
+        error = self._values_of(
+            _additional(a) if mirrored else True, _additional(b), sides
+        )
+        if error is not None:
+            return _nested(error, "additionalProperties")
+        for pattern, schema in (b.patternProperties or {}).items():
+            own = (a.patternProperties or {}).get(pattern)
+            # names matching the pattern in ``b`` match it in ``a`` too, and may
+            # match any other pattern of ``a``
+            constraints: Constraints = _additional(a) if not own_patterns else True
+            if own is not None:
+                constraints = [own]
+            error = self._values_of(constraints, [schema], sides)
+            if error is not None:
+                return _nested(error, "patternProperties", pattern)
+        return None
+
+    def _values_of(
+        self, a: Constraints, b: Constraints, sides: Sides
+    ) -> Optional[Error]:
+        """Compare the constraints of the values of a property."""
+        if a is False:
+            return None
+        if isinstance(b, bool):
+            return None if b else _error("the property is not allowed")
+        for schema in b:
+            if isinstance(a, bool):
+                if not accepts_anything(self._deref(schema, sides[1])):
+                    return _error("values of any type are not accepted")
+                continue
+            # the values of ``a`` match all its schemas, one of which must suffice
+            errors = [self.subschema(x, schema, sides) for x in a]
+            if all(errors):
+                return errors[0]
+        return None
+
+    def _names(self, a: Schema, b: Schema, sides: Sides) -> Optional[Error]:
+        if b.propertyNames is None:
+            return None
+        if a.propertyNames is not None:
+            error = self.subschema(a.propertyNames, b.propertyNames, sides)
+            if error is None:
+                return None
+        closed = a.additionalProperties is False and not a.patternProperties
+        if closed:
+            check = self._compiler(sides[1]).check(b.propertyNames)
+            if all(check(name) is None for name in a.properties or {}):
+                return None
+        return _error("property names are not accepted", "propertyNames")
+
+
+def check_compatibility(
+    old: Schema,
+    new: Schema,
+    mode: str = BACKWARD,
+    old_document: Optional[BaseModel] = None,
+    new_document: Optional[BaseModel] = None,
+) -> Optional[Error]:
+    """Why ``new`` is not compatible with ``old`` in ``mode``, ``None`` if it is."""
+    return CompatibilityChecker().check(old, new, mode, old_document, new_document)
@@ -0,0 +1,285 @@
+"""Trusted construction of documents from data that is known to be valid.
+
+``construct`` builds the same object graph as ``model_validate`` (following the
+aliases, unions and discriminators of the models) without validating any value,
+like a recursive ``model_construct``. Only use it for data that was validated
+before, e.g. the output of ``model_dump(by_alias=True)`` of a cache or registry.
+"""
+
+from functools import cache
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Optional,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from pydantic import AnyUrl, BaseModel
+from pydantic.fields import FieldInfo
+
+from . import v2, v3
+from .bindings.lazy import LazyBinding
+
+M = TypeVar("M", bound=BaseModel)
+
+Convert = Optional[Callable[[Any], Any]]
+
+_setattr = object.__setattr__
+
+# placeholder keeping required fields in declaration order in ``__dict__``
+_MISSING = object()
+
+
+class Plan:
+    """Keys, defaults and value converters of a model, compiled on first use."""
+
+    __slots__ = ("defaults", "extra", "keys", "mutable", "required")
+
+    def __init__(self, cls: type[BaseModel]) -> None:
+        hints = get_type_hints(cls, include_extras=True)
+        self.keys: dict[str, tuple[str, Convert]] = {}
+        self.defaults: dict[str, Any] = {}
+        self.mutable: dict[str, Callable[[], Any]] = {}
+        self.required: dict[str, frozenset[str]] = {}
+        for name, field in cls.model_fields.items():
+            convert = converter(hints.get(name, field.annotation))
+            alias = field.validation_alias
+            keys = {name, alias if isinstance(alias, str) else field.alias or name}
+            for key in keys:
+                self.keys[key] = (name, convert)
+            if field.is_required():
+                self.required[name] = frozenset(keys)
+                self.defaults[name] = _MISSING
+            elif field.default_factory is not None:
+                self.defaults[name] = None
+                self.mutable[name] = field.default_factory  # type: ignore[assignment]
+            else:
+                self.defaults[name] = field.default
+                if isinstance(field.default, (dict, list)):
+                    self.mutable[name] = field.default.copy
+        self.extra = cls.model_config.get("extra") == "allow"
+
+    def score(self, data: dict[str, Any]) -> int:
+        """Number of fields ``data`` sets, or -1 if it lacks a required one."""
+        if any(keys.isdisjoint(data) for keys in self.required.values()):
+            return -1
+        return sum(1 for key in data if key in self.keys)
+
+
+class ModelBuilder:
+    __slots__ = ("_plan", "cls")
+
+    def __init__(self, cls: type[BaseModel]) -> None:
+        self.cls = cls
+        self._plan: Optional[Plan] = None
+
+    @property
+    def plan(self) -> Plan:
+        # compiled lazily, so that recursive models can refer to their own builder
+        if self._plan is None:
+            self._plan = Plan(self.cls)
+        return self._plan
+
+    def score(self, data: dict[str, Any]) -> int:
+        return self.plan.score(data)
+
+    def __call__(self, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        plan = self.plan
+        values = plan.defaults.copy()
+        fields_set = set()
+        extra: Optional[dict[str, Any]] = {} if plan.extra else None
+        keys = plan.keys
+        for key, value in data.items():
+            entry = keys.get(key)
+            if entry is None:
+                if extra is not None:
+                    extra[key] = value
+                continue
+            name, convert = entry
+            values[name] = value if convert is None or value is None else convert(value)
+            fields_set.add(name)
+        for name, factory in plan.mutable.items():
+            if name not in fields_set:
+                values[name] = factory()
+        for name in plan.required:
+            if values[name] is _MISSING:
+                del values[name]
+        node = self.cls.__new__(self.cls)
+        _setattr(node, "__dict__", values)
+        _setattr(node, "__pydantic_fields_set__", fields_set)
+        _setattr(node, "__pydantic_extra__", extra)
+        _setattr(node, "__pydantic_private__", None)
+        return node
+
+
+class UnionBuilder:
+    """Build the member of a union that sets most fields (leftmost on ties).
+
+    This mirrors the "smart" union mode pydantic validates unions in.
+    """
+
+    __slots__ = ("items", "members")
+
+    def __init__(self, members: list["Builder"], items: Convert) -> None:
+        self.members = members
+        self.items = items
+
+    def __call__(self, data: Any) -> Any:
+        if isinstance(data, dict) and self.members:
+            best, best_score = None, -1
+            for member in self.members:
+                score = member.score(data)
+                if score > best_score:
+                    best, best_score = member, score
+            if best is not None:
+                return best(data)
+        if isinstance(data, list) and self.items is not None:
+            return self.items(data)
+        return data
+
+
+class DiscriminatedBuilder:
+    __slots__ = ("key", "members")
+
+    def __init__(self, key: str, members: dict[Any, ModelBuilder]) -> None:
+        self.key = key
+        self.members = members
+
+    def score(self, data: dict[str, Any]) -> int:
+        member = self.members.get(data.get(self.key))
+        return -1 if member is None else member.score(data)
+
+    def __call__(self, data: Any) -> Any:
+        if isinstance(data, dict):
+            member = self.members.get(data.get(self.key))
+            if member is not None:
+                return member(data)
+        return data
+
+
+Builder = Union[ModelBuilder, DiscriminatedBuilder]
+
+
+@cache
+def model_builder(cls: type[BaseModel]) -> ModelBuilder:
+    return ModelBuilder(cls)
+
+
+def _url(value: Any) -> Any:
+    return AnyUrl(value) if isinstance(value, str) else value
+
+
+def _mapping(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def build(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        return {k: None if v is None else convert(v) for k, v in value.items()}
+
+    return build
+
+
+def _sequence(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def build(value: Any) -> Any:
+        if not isinstance(value, list):
+            return value
+        return [None if v is None else convert(v) for v in value]
+
+    return build
+
+
+def _discriminated(members: tuple[Any, ...], discriminator: str) -> Convert:
+    builders: dict[Any, ModelBuilder] = {}
+    key = discriminator
+    for member in members:
+        field = member.model_fields[discriminator]
+        key = field.alias or discriminator
+        for value in get_args(field.annotation):
+            builders[value] = model_builder(member)
+    return DiscriminatedBuilder(key, builders)
+
+
+def _union(members: tuple[Any, ...], discriminator: Optional[str]) -> Convert:
+    members = tuple(m for m in members if m is not type(None))
+    if discriminator is not None:
+        return _discriminated(members, discriminator)
+    if len(members) == 1:
+        return converter(members[0])
+    models: list[Builder] = []
+    items = None
+    for member in members:
+        convert = converter(member)
+        if isinstance(convert, (ModelBuilder, DiscriminatedBuilder)):
+            models.append(convert)
+        elif get_origin(_unwrap(member)) is list and items is None:
+            items = convert
+    if not models and items is None:
+        return None
+    return UnionBuilder(models, items)
+
+
+def _unwrap(annotation: Any) -> Any:
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    return annotation
+
+
+def _annotated(annotation: Any, discriminator: Optional[str]) -> Convert:
+    inner, *metadata = get_args(annotation)
+    for meta in metadata:
+        if isinstance(meta, LazyBinding):
+            return converter(meta.load())
+        if isinstance(meta, FieldInfo) and isinstance(meta.discriminator, str):
+            discriminator = meta.discriminator
+    return converter(inner, discriminator)
+
+
+def _class(annotation: type) -> Convert:
+    if issubclass(annotation, BaseModel):
+        return model_builder(annotation)
+    if issubclass(annotation, AnyUrl):
+        return _url
+    return None
+
+
+def _container(origin: Any, args: tuple[Any, ...]) -> Convert:
+    # the last argument is the type of the values of a dict or items of a list
+    convert = converter(args[-1])
+    if convert is None:
+        return None
+    return _mapping(convert) if origin is dict else _sequence(convert)
+
+
+def converter(annotation: Any, discriminator: Optional[str] = None) -> Convert:
+    """Function building values of ``annotation`` from data, ``None`` if as-is."""
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _annotated(annotation, discriminator)
+    if isinstance(annotation, type):
+        return _class(annotation)
+    if origin is Union:
+        return _union(get_args(annotation), discriminator)
+    if origin in {dict, list}:
+        return _container(origin, get_args(annotation))
+    # Any, Literal and other scalar annotations are stored as they are
+    return None
+
+
+def construct(data: dict[str, Any], model: Optional[type[M]] = None) -> M:
+    """Build ``model`` (by default v2 or v3 ``AsyncAPI``) from trusted ``data``."""
+    if model is None:
+        version = data.get("asyncapi")
+        for cls in (v2.AsyncAPI, v3.AsyncAPI):
+            if version in get_args(cls.model_fields["asyncapi"].annotation):
+                model = cls  # type: ignore[assignment]
+                break
+        else:
+            msg = f"Unsupported AsyncAPI version: {version!r}"
+            raise ValueError(msg)
+    return model_builder(model)(data)
@@ -0,0 +1,150 @@
+"""Extraction of correlation IDs from messages at runtime.
+
+``CorrelationId.location`` is a runtime expression like
+``$message.header#/correlationId`` or ``$message.payload#/meta/id``.
+``compile_location`` parses it once (unescaping ``~1`` and ``~0``) into an
+``Extractor``, a callable that takes the headers and the decoded payload of a
+message and returns the value at the location.
+"""
+
+import re
+from collections.abc import Iterable, Mapping, Sequence
+from functools import cache
+from typing import Any, Callable, Optional, Union
+
+from pydantic import BaseModel
+
+from . import v2, v3
+from .common import CorrelationId
+from .resolver import Resolver
+from .utils import reference_of, unescape
+
+# key and list index (for tokens that are array indexes) of each pointer token
+Step = tuple[str, Optional[int]]
+Get = Callable[[Any, Any], Any]
+Message = tuple[Any, Any]
+
+LOCATION = re.compile(r"\$message\.(header|payload)#((?:/(?:[^/~]|~[01])*)*)")
+INDEX = re.compile(r"0|[1-9]\d*")
+
+MISSING: Any = object()
+
+
+def _step(node: Any, key: str, index: Optional[int]) -> Any:
+    if isinstance(node, Mapping):
+        return node.get(key, MISSING)
+    if (
+        index is not None
+        and isinstance(node, Sequence)
+        and not isinstance(node, (str, bytes))
+        and index < len(node)
+    ):
+        return node[index]
+    return MISSING
+
+
+def _header(headers: Any, key: str) -> Any:
+    if type(headers) is dict or isinstance(headers, Mapping):
+        return headers.get(key, MISSING)
+    # e.g. Kafka headers, a sequence of (key, value) pairs
+    if isinstance(headers, (list, tuple)):
+        for name, value in headers:
+            if name == key:
+                return value
+    return MISSING
+
+
+def _getter(source: str, steps: tuple[Step, ...]) -> Get:
+    if source == "header" and steps:
+        (key, _), *rest = steps
+        if not rest:
+            # the common ``$message.header#/name``
+            def get_header(headers: Any, default: Any) -> Any:
+                value = _header(headers, key)
+                return default if value is MISSING else value
+
+            return get_header
+
+        nested = _getter("payload", tuple(rest))
+        return lambda headers, default: nested(_header(headers, key), default)
+
+    def get(node: Any, default: Any) -> Any:
+        for key, index in steps:
+            # plain dicts (decoded JSON) skip the slower abstract type checks
+            node = (
+                node.get(key, MISSING)
+                if type(node) is dict
+                else _step(node, key, index)
+            )
+            if node is MISSING:
+                return default
+        return node
+
+    return get
+
+
+class Extractor:
+    """Accessor of the value at a compiled correlation ID ``location``."""
+
+    __slots__ = ("_get", "location", "path", "source")
+
+    def __init__(self, location: str, source: str, path: tuple[str, ...]) -> None:
+        self.location = location
+        self.source = source
+        self.path = path
+        steps = tuple((key, int(key) if INDEX.fullmatch(key) else None) for key in path)
+        self._get = _getter(source, steps)
+
+    def __call__(self, headers: Any, payload: Any, default: Any = None) -> Any:
+        """The value at the location in a message, ``default`` if it is absent."""
+        return self._get(headers if self.source == "header" else payload, default)
+
+    def many(self, messages: Iterable[Message], default: Any = None) -> list[Any]:
+        """The values at the location in ``(headers, payload)`` pairs."""
+        get = self._get
+        if self.source == "header":
+            return [get(headers, default) for headers, _ in messages]
+        return [get(payload, default) for _, payload in messages]
+
+    def __repr__(self) -> str:
+        return f"Extractor({self.location!r})"
+
+
+@cache
+def compile_location(location: str) -> Extractor:
+    """Compile the runtime expression ``location``, once per distinct string."""
+    match = LOCATION.fullmatch(location)
+    if match is None:
+        msg = f"Invalid correlation ID location: {location!r}"
+        raise ValueError(msg)
+    source, pointer = match.groups()
+    path = tuple(unescape(token) for token in pointer.split("/")[1:])
+    return Extractor(location, source, path)
+
+
+def correlation_extractor(
+    message: BaseModel,
+    document: Optional[BaseModel] = None,
+) -> Optional[Extractor]:
+    """Extractor of the correlation ID of a v2 or v3 ``message``, if it has one.
+
+    ``document`` is needed when the message (like the entries of
+    ``Channel.messages`` in v3) or its correlation ID is a reference.
+    """
+    resolver = Resolver.for_document(document) if document is not None else None
+    if reference_of(message) is not None:
+        if resolver is None:
+            msg = "Resolving the message requires a document"
+            raise ValueError(msg)
+        message = resolver.resolve(message, (v2.Message, v3.Message))
+    correlation: Union[CorrelationId, BaseModel, None] = getattr(
+        message, "correlationId", None
+    )
+    if correlation is None:
+        return None
+    if reference_of(correlation) is not None:
+        if resolver is None:
+            msg = "Resolving the correlation ID requires a document"
+            raise ValueError(msg)
+        correlation = resolver.resolve(correlation, CorrelationId)
+    return compile_location(correlation.location)  # type: ignore[union-attr]
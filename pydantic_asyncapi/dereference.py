@@ -0,0 +1,247 @@
+"""Dereferenced view of a document, in which references are replaced by their targets.
+
+Inlining a dumped document copies every shared schema once per use, which grows
+exponentially with nested shared types and cannot represent recursive schemas.
+``dereference`` instead returns models in which each target is dereferenced once
+and shared, by identity, by every reference to it: the view is a DAG the size of
+the document. A reference back to a node that is still being dereferenced (a
+cycle) is kept as it is, in a ``Cycle`` variant of its class.
+
+Only ``materialize`` copies the shared nodes once per use, into JSON-compatible
+data; ``expanded_size`` tells how large that would be without doing it. (The view
+does not dump with ``model_dump``, as targets sit in fields declared as
+``Reference``.)
+"""
+
+import types
+from functools import cache
+from typing import Any, Optional, TypeVar, Union
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from .limits import LimitExceededError
+from .resolver import Resolver
+from .utils import model_keys, reference_of
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class Cycle:
+    """Mixin of the references back to a node containing them, which are kept
+    instead of being expanded."""
+
+    __slots__ = ()
+
+
+class CycleDict(Cycle, dict[str, Any]):
+    """A reference back to a node containing it, in raw data."""
+
+    __slots__ = ()
+
+
+@cache
+def cycle_type(cls: type[M]) -> type[M]:
+    """The ``Cycle`` variant of the model ``cls``, created on first use."""
+    return types.new_class(
+        f"{cls.__name__}Cycle",
+        (Cycle, cls),
+        exec_body=lambda namespace: namespace.update(__module__=__name__),
+    )
+
+
+def _cycle(node: Any) -> Any:
+    """Copy of the reference ``node`` (a model or raw data) marked as a ``Cycle``."""
+    if isinstance(node, dict):
+        return CycleDict(node)
+    model: BaseModel = node
+    cls = cycle_type(type(model))
+    return cls.model_construct(
+        _fields_set=set(model.model_fields_set),
+        **model.__dict__,
+        **(model.__pydantic_extra__ or {}),
+    )
+
+
+CONTAINERS = (BaseModel, dict, list)
+
+
+class _Dereferencer:
+    def __init__(self, document: BaseModel) -> None:
+        self.resolver = Resolver.for_document(document)
+        # dereferenced node by the id of the original, which ``nodes`` keeps alive
+        self.done: dict[int, Any] = {}
+        self.nodes: list[Any] = []
+        # nodes whose children are being dereferenced: the ancestors of the top of
+        # the stack
+        self.pending: set[int] = set()
+
+    def node(self, root: Any) -> Any:
+        if not isinstance(root, CONTAINERS):
+            return root
+        done, pending = self.done, self.pending
+        stack = [root]
+        while stack:
+            value = stack[-1]
+            key = id(value)
+            if key in done:
+                stack.pop()
+                continue
+            ref = reference_of(value)
+            if ref is not None and ref.startswith("#"):
+                target = self.resolver.resolve(value)
+                if id(target) in pending:
+                    result: Any = _cycle(value)
+                elif id(target) in done or not isinstance(target, CONTAINERS):
+                    result = done.get(id(target), target)
+                else:
+                    # back to the reference once its target is done
+                    stack.append(target)
+                    continue
+            elif key not in pending:
+                pending.add(key)
+                stack.extend(
+                    child
+                    for child in _children(value)
+                    if isinstance(child, CONTAINERS) and id(child) not in done
+                )
+                continue
+            else:
+                pending.discard(key)
+                result = self.children(value)
+            stack.pop()
+            done[key] = result
+            self.nodes.append(value)
+        return done[id(root)]
+
+    def result(self, value: Any) -> Any:
+        return self.done[id(value)] if isinstance(value, CONTAINERS) else value
+
+    def children(self, value: Any) -> Any:
+        """Copy of ``value`` with its dereferenced children, once they are done."""
+        result = self.result
+        if isinstance(value, list):
+            items = [result(item) for item in value]
+            changed = any(new is not old for new, old in zip(items, value))
+            return items if changed else value
+        if isinstance(value, dict):
+            entries = {key: result(item) for key, item in value.items()}
+            changed = any(entries[key] is not item for key, item in value.items())
+            return entries if changed else value
+        update = {}
+        for name, item in value.__dict__.items():
+            new = result(item)
+            if new is not item:
+                update[name] = new
+        for name, item in (value.__pydantic_extra__ or {}).items():
+            new = result(item)
+            if new is not item:
+                update[name] = new
+        if not update:
+            return value
+        fields_set = set(value.model_fields_set)
+        copy = value.model_copy(update=update)
+        copy.__pydantic_fields_set__ = fields_set
+        return copy
+
+
+def dereference(document: M) -> M:
+    """A view of ``document`` with its local references replaced by their targets.
+
+    Nodes without references are shared with ``document``, and every target is
+    shared by the references to it. References to other documents are kept.
+    """
+    return _Dereferencer(document).node(document)
+
+
+def _children(value: Any) -> list[Any]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return list(value.values())
+    children = list(value.__dict__.values())
+    children.extend((value.__pydantic_extra__ or {}).values())
+    return children
+
+
+def _dumped(value: Union[BaseModel, dict[str, Any]]) -> list[tuple[str, Any]]:
+    """``(key, child)`` pairs of a model or dict, as they are dumped."""
+    if isinstance(value, dict):
+        return list(value.items())
+    fields_set = value.model_fields_set
+    values = value.__dict__
+    entries = [
+        (key, values[name])
+        for name, key in model_keys(type(value))
+        if name in fields_set
+    ]
+    entries.extend((value.__pydantic_extra__ or {}).items())
+    return entries
+
+
+def expanded_size(node: Any) -> int:
+    """Number of nodes (models, containers and values) of ``node`` once dumped,
+    counting shared nodes once per use, in time linear in the size of the view."""
+    if not isinstance(node, CONTAINERS):
+        return 1
+    sizes: dict[int, int] = {}
+    keep: list[Any] = []
+    # children are sized before their parent, without recursion
+    stack: list[tuple[Any, bool]] = [(node, False)]
+    while stack:
+        value, ready = stack.pop()
+        if id(value) in sizes:
+            continue
+        items = value if isinstance(value, list) else [c for _, c in _dumped(value)]
+        if not ready:
+            stack.append((value, True))
+            stack.extend(
+                (item, False)
+                for item in items
+                if isinstance(item, CONTAINERS) and id(item) not in sizes
+            )
+            continue
+        sizes[id(value)] = 1 + sum(
+            sizes[id(item)] if isinstance(item, CONTAINERS) else 1 for item in items
+        )
+        keep.append(value)
+    return sizes[id(node)]
+
+
+def _scalar(value: Any) -> Any:
+    if value is None or type(value) in {str, int, float, bool}:
+        return value
+    return to_jsonable_python(value)
+
+
+def _dump(node: Any) -> Any:
+    # containers are created before their children, which are filled in place
+    root: list[Any] = [None]
+    stack: list[tuple[Any, Any, Any]] = [(node, root, 0)]
+    while stack:
+        value, parent, key = stack.pop()
+        if isinstance(value, list):
+            out: Any = [None] * len(value)
+            entries: Any = enumerate(value)
+        elif isinstance(value, (BaseModel, dict)):
+            entries = _dumped(value)
+            # keys keep the order of the data, whatever the order they are filled
+            out = dict.fromkeys(k for k, _ in entries)
+        else:
+            parent[key] = _scalar(value)
+            continue
+        parent[key] = out
+        stack.extend((item, out, k) for k, item in entries)
+    return root[0]
+
+
+def materialize(node: Any, max_nodes: Optional[int] = None) -> Any:
+    """JSON-compatible data of the view ``node``, copying shared nodes once per use,
+    like ``model_dump(mode="json", by_alias=True, exclude_unset=True)``.
+
+    Raises ``LimitExceededError`` (without dumping) if the result would have more
+    than ``max_nodes`` nodes.
+    """
+    if max_nodes is not None and expanded_size(node) > max_nodes:
+        raise LimitExceededError("max_expanded_nodes", max_nodes, "#")
+    return _dump(node)
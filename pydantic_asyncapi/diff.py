@@ -0,0 +1,160 @@
+"""Structural diff of two documents, pruned with Merkle hashes of their subtrees.
+
+The hash of a node is derived from the hashes of its children (and the keys they
+are stored under), so two subtrees with the same hash are equal and are skipped
+without being compared. Hashes follow the dumped form of the models (set fields
+and extensions, by alias) and ignore the order of keys. They are memoized per
+document, so diffing several documents against the same one hashes it once.
+"""
+
+from hashlib import blake2b
+from typing import Any, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from .utils import IdentityCache, escape, model_keys
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+CONTAINERS = (BaseModel, dict, list)
+
+_trees: IdentityCache[BaseModel, "MerkleTree"] = IdentityCache()
+
+
+class Change(NamedTuple):
+    """A value ``added``, ``removed`` or ``changed`` at ``pointer``."""
+
+    kind: str
+    pointer: str
+    old: Any = None
+    new: Any = None
+
+
+def _digest(data: bytes) -> bytes:
+    return blake2b(data, digest_size=16).digest()
+
+
+def _entries(node: Any) -> Optional[dict[str, Any]]:
+    """Children of a model or dict by their key, ``None`` for other values."""
+    if isinstance(node, BaseModel):
+        fields_set = node.model_fields_set
+        values = node.__dict__
+        entries = {
+            key: values[name]
+            for name, key in model_keys(type(node))
+            if name in fields_set
+        }
+        if node.__pydantic_extra__:
+            entries.update(node.__pydantic_extra__)
+        return entries
+    if isinstance(node, dict):
+        return node
+    return None
+
+
+def _containers(node: Any) -> list[Any]:
+    """Models and containers among the children of ``node``."""
+    children = node if isinstance(node, list) else (_entries(node) or {}).values()
+    return [child for child in children if isinstance(child, CONTAINERS)]
+
+
+class MerkleTree:
+    """Memoized hashes of the subtrees of a document."""
+
+    def __init__(self, document: Optional[BaseModel] = None) -> None:
+        self._hashes: dict[int, bytes] = {}
+        # hashed nodes, so that their ids are not reused; the document itself is
+        # not kept, as the cache of trees only holds a tree while it is alive
+        self._nodes: list[Any] = []
+        self._document = None if document is None else id(document)
+
+    @classmethod
+    def for_document(cls, document: BaseModel) -> "MerkleTree":
+        tree = _trees.get(document)
+        if tree is None:
+            tree = _trees[document] = cls(document)
+        return tree
+
+    def hash(self, node: Any) -> bytes:
+        """Hash of the subtree of ``node``, a model or container."""
+        hashes = self._hashes
+        digest = hashes.get(id(node))
+        if digest is not None:
+            return digest
+        # children are hashed before their parent, without recursion
+        stack: list[tuple[Any, bool]] = [(node, False)]
+        while stack:
+            current, ready = stack.pop()
+            if id(current) in hashes:
+                continue
+            if not ready:
+                stack.append((current, True))
+                stack.extend(
+                    (child, False)
+                    for child in _containers(current)
+                    if id(child) not in hashes
+                )
+                continue
+            hashes[id(current)] = _digest(self._data(current))
+            if id(current) != self._document:
+                self._nodes.append(current)
+        return hashes[id(node)]
+
+    def value(self, value: Any) -> bytes:
+        """Hash of a model or container, the data of a scalar."""
+        if isinstance(value, CONTAINERS):
+            return b"#" + self.hash(value)
+        # scalars are part of the data of their parent, as (unambiguous) reprs
+        return repr(value).encode()
+
+    def _data(self, node: Any) -> bytes:
+        if isinstance(node, list):
+            return b"[" + b",".join(map(self.value, node))
+        entries = _entries(node)
+        if entries is None:
+            return repr(node).encode()
+        parts = sorted(
+            repr(key).encode() + b":" + self.value(value)
+            for key, value in entries.items()
+        )
+        return b"{" + b",".join(parts)
+
+
+def diff(old: BaseModel, new: BaseModel) -> list[Change]:
+    """Changes from the document ``old`` to ``new``, with their JSON pointers.
+
+    Added and removed subtrees are reported at their root, changed values where
+    they differ: a changed scalar, or values of different kinds (e.g. a schema
+    replaced by a reference).
+    """
+    old_tree = MerkleTree.for_document(old)
+    new_tree = MerkleTree.for_document(new)
+    changes = []
+    stack: list[tuple[str, Any, Any]] = [("#", old, new)]
+    while stack:
+        pointer, a, b = stack.pop()
+        if a is b or old_tree.value(a) == new_tree.value(b):
+            continue
+        a_entries, b_entries = _entries(a), _entries(b)
+        if isinstance(a, list) and isinstance(b, list):
+            a_entries = {str(i): item for i, item in enumerate(a)}
+            b_entries = {str(i): item for i, item in enumerate(b)}
+        if a_entries is None or b_entries is None or type(a) is not type(b):
+            changes.append(Change(CHANGED, pointer, a, b))
+            continue
+        children = []
+        for key, value in a_entries.items():
+            child = f"{pointer}/{escape(str(key))}"
+            if key in b_entries:
+                children.append((child, value, b_entries[key]))
+            else:
+                changes.append(Change(REMOVED, child, old=value))
+        changes.extend(
+            Change(ADDED, f"{pointer}/{escape(str(key))}", new=value)
+            for key, value in b_entries.items()
+            if key not in a_entries
+        )
+        stack.extend(reversed(children))
+    return changes
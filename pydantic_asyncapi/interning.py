@@ -0,0 +1,70 @@
+"""Opt-in deduplication of structurally identical nodes during validation.
+
+Within an ``interning()`` block every validated ``Schema`` is looked up in a pool
+keyed by its contents, and an identical one that was validated earlier is returned
+instead. Validation is bottom-up, so the children of a node are already interned
+when it is validated and can be keyed by identity. Repeated subtrees (timestamps,
+ids, money objects, ...) are then a single shared instance, which must be treated
+as read-only.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+Pool = dict[Any, BaseModel]
+
+_pool: ContextVar[Optional[Pool]] = ContextVar("pool", default=None)
+
+
+def _key(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return id(value)
+    if isinstance(value, dict):
+        return (dict, tuple((k, _key(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(_key(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return (object, id(value))
+    # the type is part of the key so that e.g. 1, 1.0 and True are kept apart
+    return (type(value), value)
+
+
+def node_key(node: BaseModel) -> Any:
+    """Hashable key of ``node``, identifying child models by identity.
+
+    Only set fields are keyed: the others hold defaults on a freshly validated node.
+    """
+    values = node.__dict__
+    return type(node), frozenset(
+        (name, _key(values[name])) for name in node.model_fields_set
+    )
+
+
+def intern(node: M) -> M:
+    """Return the pooled node identical to ``node`` when interning is enabled."""
+    pool = _pool.get()
+    if pool is None:
+        return node
+    return pool.setdefault(node_key(node), node)  # type: ignore[return-value]
+
+
+@contextmanager
+def interning(pool: Optional[Pool] = None) -> Iterator[Pool]:
+    """Deduplicate schemas validated within the block.
+
+    Passing the same ``pool`` to several blocks shares nodes across documents.
+    """
+    pool = {} if pool is None else pool
+    token = _pool.set(pool)
+    try:
+        yield pool
+    finally:
+        _pool.reset(token)
@@ -0,0 +1,154 @@
+"""Deferred validation of large documents.
+
+Only the small top-level parts of a document are validated up front; entries of
+``channels``, ``operations`` and the ``components`` maps are validated (and cached)
+the first time they are accessed.
+"""
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Generic, Optional, TypeVar, Union, get_args
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from . import v2, v3
+from .utils import (
+    mapping_value_type,
+    model_keys,
+    model_type,
+    relocate,
+    type_adapter,
+)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+LAZY_FIELDS = ("channels", "operations", "components")
+
+
+class LazyMapping(Mapping[str, T]):
+    """Read-only mapping that validates each entry the first time it is accessed."""
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        adapter: TypeAdapter[T],
+        loc: tuple[Union[str, int], ...] = (),
+    ) -> None:
+        self._data: dict[str, Any] = dict(data)
+        self._adapter = adapter
+        self._loc = loc
+        self._validated: set[str] = set()
+
+    def __getitem__(self, key: str) -> T:
+        value = self._data[key]
+        if key in self._validated:
+            return value
+        try:
+            value = self._adapter.validate_python(value)
+        except ValidationError as e:
+            raise relocate(e, (*self._loc, key)) from None
+        self._data[key] = value
+        self._validated.add(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self._validated)}/{len(self)} validated)"
+
+    def is_validated(self, key: str) -> bool:
+        return key in self._validated
+
+    def materialize(self) -> dict[str, T]:
+        """Validate all remaining entries and return them as a plain dict."""
+        return {key: self[key] for key in self._data}
+
+
+class LazyModel(Generic[M]):
+    """Model whose selected fields are validated on first access.
+
+    Fields holding a ``dict`` become ``LazyMapping`` instances, fields holding a model
+    become nested ``LazyModel`` instances with all of their ``dict`` fields deferred.
+    Every other attribute is read from the eagerly validated ``shell`` model.
+    """
+
+    def __init__(
+        self,
+        cls: type[M],
+        data: dict[str, Any],
+        fields: Optional[tuple[str, ...]] = None,
+        loc: tuple[Union[str, int], ...] = (),
+    ) -> None:
+        keys = dict(model_keys(cls))
+        if fields is None:
+            fields = tuple(
+                name
+                for name, field in cls.model_fields.items()
+                if mapping_value_type(field.annotation) is not None
+            )
+        fields = tuple(name for name in fields if name in keys)
+        deferred = {keys[name] for name in fields}
+        shell = {key: value for key, value in data.items() if key not in deferred}
+        self._lazy: dict[str, Union[LazyMapping[Any], LazyModel[Any]]] = {}
+        for name in fields:
+            key = keys[name]
+            value = data.get(key)
+            if not isinstance(value, dict):
+                if key in data:
+                    shell[key] = value
+                continue
+            field = cls.model_fields[name]
+            if field.is_required():
+                shell[key] = {}
+            value_type = mapping_value_type(field.annotation)
+            if value_type is not None:
+                self._lazy[name] = LazyMapping(
+                    value,
+                    type_adapter(value_type),
+                    (*loc, key),
+                )
+            else:
+                self._lazy[name] = LazyModel(
+                    model_type(field.annotation),
+                    value,
+                    loc=(*loc, key),
+                )
+        try:
+            self.shell: M = cls.model_validate(shell)
+        except ValidationError as e:
+            raise relocate(e, loc) from None
+
+    def __getattr__(self, name: str) -> Any:
+        lazy = self.__dict__.get("_lazy", {})
+        if name in lazy:
+            return lazy[name]
+        return getattr(self.shell, name)
+
+    def __repr__(self) -> str:
+        return f"Lazy{type(self.shell).__name__}({', '.join(self._lazy)})"
+
+    def materialize(self) -> M:
+        """Validate every deferred entry and return the complete model."""
+        return self.shell.model_copy(
+            update={name: lazy.materialize() for name, lazy in self._lazy.items()},
+        )
+
+
+def lazy_validate(
+    data: dict[str, Any],
+) -> Union[LazyModel[v2.AsyncAPI], LazyModel[v3.AsyncAPI]]:
+    """Validate ``data`` as v2 or v3 document (based on ``asyncapi``) lazily."""
+    version = data.get("asyncapi")
+    for cls in (v2.AsyncAPI, v3.AsyncAPI):
+        if version in get_args(cls.model_fields["asyncapi"].annotation):
+            return LazyModel(cls, data, LAZY_FIELDS)  # type: ignore[return-value]
+    from . import AsyncAPI
+
+    # unknown versions are reported the way the discriminated root model does
+    AsyncAPI.model_validate(data)
+    msg = f"Unsupported AsyncAPI version: {version!r}"
+    raise ValueError(msg)  # no cov
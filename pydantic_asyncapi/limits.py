@@ -0,0 +1,183 @@
+"""Limits on the size and shape of untrusted documents, checked before validation.
+
+``Schema`` is deeply self-recursive, so the cost of validating a document grows with
+its depth and number of nodes rather than with its byte size: YAML aliases can
+repeat a subtree many times, and a few kilobytes of ``$ref`` can expand into
+millions of nodes for tools that dereference them. ``check_limits`` walks the
+loaded data without recursion and aborts at the first limit exceeded.
+"""
+
+import math
+from collections.abc import Iterable
+from typing import Any, NamedTuple, Optional
+
+from .utils import escape, normalize_pointer, split_pointer
+
+
+class Limits(NamedTuple):
+    """Maximums a document may reach, ``None`` to disable one."""
+
+    #: nesting of mappings and sequences
+    max_depth: Optional[int] = 64
+    #: mappings, sequences and scalars (repeated YAML aliases count every time)
+    max_nodes: Optional[int] = 1_000_000
+    #: characters of a string or mapping key
+    max_string_length: Optional[int] = 1_000_000
+    #: entries of a single mapping or sequence
+    max_collection_size: Optional[int] = 100_000
+    #: nodes of the document with every local ``$ref`` replaced by its target, for
+    #: consumers that dereference documents (validation keeps references as they are)
+    max_expanded_nodes: Optional[int] = None
+
+
+DEFAULT_LIMITS = Limits()
+
+
+class LimitExceededError(ValueError):
+    """Raised when a document exceeds one of its ``Limits``."""
+
+    def __init__(self, limit: str, maximum: int, pointer: str) -> None:
+        self.limit = limit
+        self.maximum = maximum
+        self.pointer = pointer
+        super().__init__(f"{pointer}: {limit} of {maximum} exceeded")
+
+
+# (parent link, key) of a node, only turned into a pointer when a limit is exceeded
+Link = Optional[tuple[Any, Any]]
+
+
+def _pointer(link: Link) -> str:
+    keys = []
+    while link is not None:
+        link, key = link
+        keys.append(escape(str(key)))
+    return "#" + "".join(f"/{key}" for key in reversed(keys))
+
+
+def _maximum(limits: Limits, name: str) -> float:
+    maximum = getattr(limits, name)
+    return math.inf if maximum is None else maximum
+
+
+def _exceeded(limits: Limits, name: str, link: Link) -> LimitExceededError:
+    return LimitExceededError(name, getattr(limits, name), _pointer(link))
+
+
+def _items(value: Any, refs: list[str]) -> Optional[Iterable[tuple[Any, Any]]]:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#"):
+            refs.append(normalize_pointer(ref))
+        return value.items()
+    if isinstance(value, list):
+        return enumerate(value)
+    return None
+
+
+def _scan(data: Any, limits: Limits) -> tuple[int, list[str]]:
+    """Check the structural limits, returning the nodes and local references."""
+    max_nodes = _maximum(limits, "max_nodes")
+    max_depth = _maximum(limits, "max_depth")
+    max_string_length = _maximum(limits, "max_string_length")
+    max_collection_size = _maximum(limits, "max_collection_size")
+    refs: list[str] = []
+    nodes = 0
+    stack: list[tuple[Any, int, Link]] = [(data, 0, None)]
+    while stack:
+        value, depth, link = stack.pop()
+        nodes += 1
+        if nodes > max_nodes:
+            raise _exceeded(limits, "max_nodes", link)
+        if isinstance(value, str):
+            if len(value) > max_string_length:
+                raise _exceeded(limits, "max_string_length", link)
+            continue
+        items = _items(value, refs)
+        if items is None:
+            continue
+        depth += 1
+        if depth > max_depth:
+            raise _exceeded(limits, "max_depth", link)
+        if len(value) > max_collection_size:
+            raise _exceeded(limits, "max_collection_size", link)
+        for key, child in items:
+            if isinstance(key, str) and len(key) > max_string_length:
+                raise _exceeded(limits, "max_string_length", (link, key))
+            stack.append((child, depth, (link, key)))
+    return nodes, refs
+
+
+def _target(data: Any, ref: str) -> Any:
+    node = data
+    for key in split_pointer(ref):
+        if isinstance(node, dict) and key in node:
+            node = node[key]
+        elif isinstance(node, list) and key.isdigit() and int(key) < len(node):
+            node = node[int(key)]
+        else:
+            return None
+    return node
+
+
+def _local(node: Any) -> tuple[int, list[str]]:
+    """Nodes of the subtree of ``node`` and the local references within it."""
+    nodes = 0
+    refs = []
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        nodes += 1
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#"):
+                refs.append(normalize_pointer(ref))
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return nodes, refs
+
+
+def _check_expansion(data: Any, nodes: int, refs: list[str], limits: Limits) -> None:
+    maximum = limits.max_expanded_nodes
+    if maximum is None or not refs:
+        return
+    # expanded size of each target: its own nodes plus those of the targets it refers
+    # to, computed depth-first; a reference back to a target in progress (a cycle)
+    # stays a single node, as tools dereferencing documents keep such references
+    sizes: dict[str, int] = {}
+    local: dict[str, tuple[int, list[str]]] = {}
+    for ref in dict.fromkeys(refs):
+        stack = [ref]
+        while stack:
+            current = stack[-1]
+            if current not in local:
+                target = _target(data, current)
+                local[current] = (0, []) if target is None else _local(target)
+            pending = [r for r in local[current][1] if r not in local]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            own, inner = local[current]
+            size = own + sum(sizes.get(r, 1) for r in inner)
+            sizes[current] = size
+            if size > maximum:
+                raise LimitExceededError("max_expanded_nodes", maximum, current)
+    total = nodes + sum(sizes[ref] for ref in refs)
+    if total > maximum:
+        raise LimitExceededError("max_expanded_nodes", maximum, "#")
+
+
+def check_limits(data: Any, limits: Limits = DEFAULT_LIMITS) -> None:
+    """Raise ``LimitExceededError`` if the loaded document ``data`` exceeds ``limits``."""
+    nodes, refs = _scan(data, limits)
+    _check_expansion(data, nodes, refs, limits)
+
+
+def validate(data: Any, limits: Limits = DEFAULT_LIMITS) -> Any:
+    """Check ``limits`` on the v2 or v3 document ``data``, then validate it."""
+    from . import AsyncAPI
+
+    check_limits(data, limits)
+    return AsyncAPI.model_validate(data).root
@@ -0,0 +1,166 @@
+"""Validation of large documents on a pool of workers.
+
+The entries of ``channels``, ``operations``, ``servers`` and the ``components``
+maps are independent of each other, so ``parallel_validate`` splits these maps into
+chunks that are validated by an executor while the rest of the document is
+validated in the calling thread. The validated entries are then assembled into the
+model of the document.
+
+Unpickling models costs about as much as validating them, so worker processes
+send back the dumped data of the validated entries instead, which is turned into
+models again with the trusted ``construct`` (about 2.5 times faster than
+validation). Thread pools, the default on free-threaded builds of Python, return
+the validated models as they are.
+"""
+
+import sys
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from .construct import converter
+from .parse import exact_model
+from .utils import mapping_value_type, model_keys, model_type, relocate, type_adapter
+
+CHUNK_SIZE = 500
+
+Path = tuple[str, ...]
+
+
+def _value_type(cls: type[BaseModel], path: Path) -> Any:
+    *parents, name = path
+    for parent in parents:
+        cls = model_type(cls.model_fields[parent].annotation)
+    return mapping_value_type(cls.model_fields[name].annotation)
+
+
+def _maps(
+    cls: type[BaseModel], data: dict[str, Any], path: Path = ()
+) -> Iterator[tuple[Path, str, dict[str, Any]]]:
+    """Path, key and entries of every map of ``data`` that is validated in chunks."""
+    for name, alias in model_keys(cls):
+        value = data.get(alias)
+        if not isinstance(value, dict):
+            continue
+        annotation = cls.model_fields[name].annotation
+        if mapping_value_type(annotation) is not None:
+            yield (*path, name), alias, value
+        elif name == "components" and not path:
+            yield from _maps(model_type(annotation), value, (name,))
+
+
+def validate_entries(
+    version: str, path: Path, loc: Path, entries: dict[str, Any], dump: bool = False
+) -> dict[str, Any]:
+    """Validate ``entries`` of the map at ``path`` of a document of ``version``.
+
+    With ``dump`` the validated entries are returned as trusted data for
+    ``construct``, which is much cheaper to pickle than models.
+    """
+    cls = exact_model(version)
+    if cls is None:
+        msg = f"Unsupported AsyncAPI version: {version!r}"
+        raise ValueError(msg)
+    adapter = type_adapter(_value_type(cls, path))
+    validated = {}
+    key = ""
+    try:
+        for key, entry in entries.items():
+            validated[key] = adapter.validate_python(entry)
+    except ValidationError as e:
+        raise relocate(e, (*loc, key)) from None
+    if dump:
+        return {
+            key: adapter.dump_python(entry, by_alias=True, exclude_unset=True)
+            for key, entry in validated.items()
+        }
+    return validated
+
+
+def _construct(
+    cls: type[BaseModel], path: Path, entries: dict[str, Any]
+) -> dict[str, Any]:
+    convert = converter(_value_type(cls, path))
+    if convert is None:
+        return entries
+    return {
+        key: None if entry is None else convert(entry) for key, entry in entries.items()
+    }
+
+
+def _chunks(entries: dict[str, Any], size: int) -> Iterator[dict[str, Any]]:
+    items = list(entries.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start : start + size])
+
+
+def default_executor(max_workers: Optional[int] = None) -> Executor:
+    """A thread pool on free-threaded Python, a process pool otherwise."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    if is_gil_enabled():
+        return ProcessPoolExecutor(max_workers)
+    return ThreadPoolExecutor(max_workers)  # pragma: no cover
+
+
+def parallel_validate(
+    data: dict[str, Any],
+    executor: Optional[Executor] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Any:
+    """Validate the v2 or v3 document ``data``, validating its maps on ``executor``.
+
+    ``executor`` defaults to a pool created (and shut down) for this call; pass a
+    long-lived one to validate several documents. The same documents as with
+    ``AsyncAPI.model_validate`` are valid: documents of other versions than those
+    of the models, including newer minor versions, are rejected.
+    """
+    version = str(data.get("asyncapi"))
+    cls = exact_model(version)
+    if cls is None:
+        from . import AsyncAPI
+
+        return AsyncAPI.model_validate(data).root
+
+    shell = dict(data)
+    if isinstance(shell.get("components"), dict):
+        shell["components"] = dict(shell["components"])
+    maps = list(_maps(cls, data))
+    pool = default_executor() if executor is None else executor
+    dump = not isinstance(pool, ThreadPoolExecutor)
+    futures: list[tuple[Path, Future[dict[str, Any]]]] = []
+    with pool if executor is None else nullcontext():
+        try:
+            for path, key, entries in maps:
+                loc = (*path[:-1], key)
+                for chunk in _chunks(entries, chunk_size):
+                    future = pool.submit(
+                        validate_entries, version, path, loc, chunk, dump
+                    )
+                    futures.append((path, future))
+                # the shell keeps an empty map, so that the field stays set
+                parent = shell["components"] if len(path) > 1 else shell
+                parent[key] = {}
+            document = cls.model_validate(shell)
+            validated: dict[Path, dict[str, Any]] = {path: {} for path, _, _ in maps}
+            for path, future in futures:
+                entries = future.result()
+                if dump:
+                    entries = _construct(cls, path, entries)
+                validated[path].update(entries)
+        except BaseException:
+            for _, future in futures:
+                future.cancel()
+            raise
+
+    components = {
+        path[-1]: entries for path, entries in validated.items() if len(path) > 1
+    }
+    update = {path[0]: entries for path, entries in validated.items() if len(path) == 1}
+    if components:
+        update["components"] = document.components.model_copy(  # type: ignore[attr-defined]
+            update=components
+        )
+    return document.model_copy(update=update)
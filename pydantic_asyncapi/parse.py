@@ -0,0 +1,115 @@
+"""Validation of JSON documents without building Python data first.
+
+``parse`` reads the ``asyncapi`` version with a regular expression and validates
+the source with ``model_validate_json`` of the model of that version, so the JSON
+is parsed by pydantic-core directly into models. Minor and patch versions that are
+newer than the models (e.g. ``3.2.0``) are validated with the model of the same
+major version.
+
+The expression finds the first ``"asyncapi"`` key, which may belong to a nested
+object (e.g. an extension). When the model of that version rejects the document,
+the version of the top-level key is read with a model of that key alone, and the
+document is validated again if it differs.
+"""
+
+import os
+import re
+from functools import cache
+from pathlib import Path
+from typing import Any, Optional, Union, get_args
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+from . import v2, v3
+
+Source = Union[bytes, bytearray, str, os.PathLike[str]]
+
+MODELS: dict[str, type[BaseModel]] = {"2": v2.AsyncAPI, "3": v3.AsyncAPI}
+VERSIONS: dict[str, type[BaseModel]] = {
+    version: cls
+    for cls in MODELS.values()
+    for version in get_args(cls.model_fields["asyncapi"].annotation)
+}
+
+_VERSION = re.compile(rb'"asyncapi"\s*:\s*"([^"\\]*)"')
+_MAJOR = re.compile(r"(\d+)\.\d+\.\d+")
+
+
+class _Version(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    asyncapi: Any = None
+
+
+def sniff_version(data: Union[bytes, bytearray, str]) -> Optional[str]:
+    """Value of the first ``"asyncapi"`` key of the JSON ``data``, if any."""
+    if isinstance(data, str):
+        data = data.encode()
+    match = _VERSION.search(data)
+    return None if match is None else match.group(1).decode()
+
+
+@cache
+def _newer_model(major: str) -> type[BaseModel]:
+    """The model of ``major``, accepting any of its (newer) versions."""
+    cls = MODELS[major]
+    pattern = rf"^{major}\.\d+\.\d+$"
+    return create_model(
+        cls.__name__,
+        __base__=cls,
+        __module__=cls.__module__,
+        asyncapi=(str, Field(pattern=pattern)),
+    )
+
+
+def _top_version(data: Union[bytes, bytearray, str]) -> Any:
+    """Value of the top-level ``"asyncapi"`` key, ``None`` for invalid JSON."""
+    try:
+        return _Version.model_validate_json(data).asyncapi
+    except ValidationError:
+        return None
+
+
+def exact_model(version: str) -> Optional[type[BaseModel]]:
+    """Model of ``version`` if it is one of the versions of the models, as checked
+    by the root ``AsyncAPI`` model, ``None`` otherwise."""
+    return VERSIONS.get(version)
+
+
+def model_for_version(version: str) -> Optional[type[BaseModel]]:
+    """Model validating documents of ``version``, ``None`` if unsupported."""
+    cls = exact_model(version)
+    if cls is not None:
+        return cls
+    match = _MAJOR.fullmatch(version)
+    major = None if match is None else match.group(1)
+    if major not in MODELS:
+        return None
+    # a newer minor version: one model per major version, whatever the versions
+    # of the documents it sees
+    return _newer_model(major)
+
+
+def parse(source: Source) -> Any:
+    """Validate the JSON document ``source`` (bytes, a JSON string or a path).
+
+    Documents of unsupported (or undetected) versions are validated with the root
+    ``AsyncAPI`` model, which reports the error.
+    """
+    data = Path(source).read_bytes() if isinstance(source, os.PathLike) else source
+    version = sniff_version(data)
+    cls = None if version is None else model_for_version(version)
+    if cls is not None:
+        try:
+            return cls.model_validate_json(data)
+        except ValidationError:
+            top = _top_version(data)
+            if top == version:
+                raise
+            version = top
+        cls = model_for_version(version) if isinstance(version, str) else None
+        if cls is not None:
+            return cls.model_validate_json(data)
+    from . import AsyncAPI
+
+    return AsyncAPI.model_validate_json(data).root
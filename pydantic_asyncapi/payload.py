@@ -0,0 +1,597 @@
+"""Validation of message payloads against the JSON Schema declared in a document.
+
+A ``Schema`` is compiled once into a tree of closures, each one checking a single
+keyword, so validating a payload does not interpret the schema model again.
+"""
+
+import json
+import math
+import re
+from collections.abc import Callable
+from fractions import Fraction
+from typing import Any, Optional, Union
+
+from pydantic import BaseModel
+
+from . import v2, v3
+from .base import Reference, Schema
+from .resolver import Resolver
+from .utils import IdentityCache, escape, reference_of
+
+Path = tuple[Union[str, int], ...]
+Error = tuple[Path, str]
+Check = Callable[[Any], Optional[Error]]
+
+JSON_SCHEMA_FORMATS = (
+    "application/vnd.aai.asyncapi",
+    "application/schema+json",
+    "application/schema+yaml",
+)
+
+
+class PayloadValidationError(ValueError):
+    """Raised when a payload does not match the schema of its message."""
+
+    def __init__(self, path: Path, message: str) -> None:
+        self.path = path
+        self.message = message
+        pointer = "".join(f"/{escape(str(p))}" for p in path)
+        super().__init__(f"{pointer or '/'}: {message}")
+
+
+class PayloadValidator:
+    """Compiled validator of a single schema."""
+
+    __slots__ = ("_check", "schema")
+
+    def __init__(self, schema: Schema, check: Check) -> None:
+        self.schema = schema
+        self._check = check
+
+    def __call__(self, value: Any) -> Any:
+        """Return ``value`` if it is valid, raise ``PayloadValidationError`` if not."""
+        error = self._check(value)
+        if error is not None:
+            raise PayloadValidationError(*error)
+        return value
+
+    def validate_json(self, data: Union[str, bytes]) -> Any:
+        return self(json.loads(data))
+
+    def error(self, value: Any) -> Optional[PayloadValidationError]:
+        error = self._check(value)
+        return None if error is None else PayloadValidationError(*error)
+
+    def is_valid(self, value: Any) -> bool:
+        return self._check(value) is None
+
+
+def _valid(_: Any) -> None:
+    return None
+
+
+def _reject(_: Any) -> Optional[Error]:
+    return (), "additional properties are not allowed"
+
+
+def _all(checks: list[Check]) -> Check:
+    if not checks:
+        return _valid
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value: Any) -> Optional[Error]:
+        for check in checks:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return check_all
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "array": lambda v: isinstance(v, list),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": _is_integer,
+    "null": lambda v: v is None,
+    "number": _is_number,
+    "object": lambda v: isinstance(v, dict),
+    "string": lambda v: isinstance(v, str),
+}
+
+# keyword, comparison and message of the size and numeric bounds
+NUMERIC_BOUNDS: list[tuple[str, Callable[[Any, Any], bool], str]] = [
+    ("minimum", lambda v, b: v >= b, "must be >= {}"),
+    ("maximum", lambda v, b: v <= b, "must be <= {}"),
+    ("exclusiveMinimum", lambda v, b: v > b, "must be > {}"),
+    ("exclusiveMaximum", lambda v, b: v < b, "must be < {}"),
+]
+STRING_BOUNDS: list[tuple[str, Callable[[Any, Any], bool], str]] = [
+    ("minLength", lambda v, b: len(v) >= b, "must be at least {} characters long"),
+    ("maxLength", lambda v, b: len(v) <= b, "must be at most {} characters long"),
+]
+ARRAY_BOUNDS: list[tuple[str, Callable[[Any, Any], bool], str]] = [
+    ("minItems", lambda v, b: len(v) >= b, "must have at least {} items"),
+    ("maxItems", lambda v, b: len(v) <= b, "must have at most {} items"),
+]
+OBJECT_BOUNDS: list[tuple[str, Callable[[Any, Any], bool], str]] = [
+    ("minProperties", lambda v, b: len(v) >= b, "must have at least {} properties"),
+    ("maxProperties", lambda v, b: len(v) <= b, "must have at most {} properties"),
+]
+
+
+def _bounds(
+    schema: Schema,
+    bounds: list[tuple[str, Callable[[Any, Any], bool], str]],
+) -> list[Check]:
+    checks = []
+    for keyword, compare, message in bounds:
+        bound = getattr(schema, keyword)
+        if bound is not None:
+            checks.append(_bound(bound, compare, message.format(bound)))
+    return checks
+
+
+def _bound(bound: Any, compare: Callable[[Any, Any], bool], message: str) -> Check:
+    def check_bound(value: Any) -> Optional[Error]:
+        return None if compare(value, bound) else ((), message)
+
+    return check_bound
+
+
+def _when(is_type: Callable[[Any], bool], check: Check) -> Check:
+    def check_when(value: Any) -> Optional[Error]:
+        return check(value) if is_type(value) else None
+
+    return check_when
+
+
+def _nested(key: Union[str, int], error: Error) -> Error:
+    return (key, *error[0]), error[1]
+
+
+class SchemaCompiler:
+    """Compiles ``Schema`` trees, sharing the result for schemas used many times.
+
+    References (``$ref``) are resolved with ``resolver``; recursive schemas are
+    supported.
+    """
+
+    def __init__(self, resolver: Optional[Resolver] = None) -> None:
+        self.resolver = resolver
+        self._compiled: dict[int, Check] = {}
+
+    def compile(self, schema: Schema) -> PayloadValidator:
+        return PayloadValidator(schema, self.check(schema))
+
+    def check(self, schema: Schema) -> Check:
+        key = id(schema)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        # placeholder for recursive schemas, replaced once compiled
+        cell: list[Check] = []
+
+        def forward(value: Any) -> Optional[Error]:
+            return cell[0](value)
+
+        self._compiled[key] = forward
+        compiled = self._build(schema)
+        cell.append(compiled)
+        self._compiled[key] = compiled
+        return compiled
+
+    def _build(self, schema: Schema) -> Check:
+        if schema.field_ref is not None:
+            if self.resolver is None:
+                msg = f"Cannot compile {schema.field_ref!r} without a resolver"
+                raise ValueError(msg)
+            return self.check(self.resolver.resolve(schema, Schema))
+        checks = [
+            check
+            for build in (
+                _type,
+                _enum,
+                _const,
+                self._all_of,
+                self._any_of,
+                self._one_of,
+                self._not,
+                self._condition,
+            )
+            if (check := build(schema)) is not None
+        ]
+        for typed, is_type in (
+            (_bounds(schema, NUMERIC_BOUNDS) + _multiple_of(schema), _is_number),
+            (_bounds(schema, STRING_BOUNDS) + _pattern(schema), TYPE_CHECKS["string"]),
+            (self._array(schema), TYPE_CHECKS["array"]),
+            (self._object(schema), TYPE_CHECKS["object"]),
+        ):
+            if typed:
+                checks.append(_when(is_type, _all(typed)))
+        return _all(checks)
+
+    def _all_of(self, schema: Schema) -> Optional[Check]:
+        if schema.allOf is None:
+            return None
+        return _all([self.check(s) for s in schema.allOf])
+
+    def _any_of(self, schema: Schema) -> Optional[Check]:
+        if schema.anyOf is None:
+            return None
+        any_of = [self.check(s) for s in schema.anyOf]
+
+        def check_any_of(value: Any) -> Optional[Error]:
+            for check in any_of:
+                if check(value) is None:
+                    return None
+            return (), "does not match any of the anyOf schemas"
+
+        return check_any_of
+
+    def _one_of(self, schema: Schema) -> Optional[Check]:
+        if schema.oneOf is None:
+            return None
+        one_of = [self.check(s) for s in schema.oneOf]
+
+        def check_one_of(value: Any) -> Optional[Error]:
+            matches = sum(1 for check in one_of if check(value) is None)
+            if matches == 1:
+                return None
+            return (), f"matches {matches} of the oneOf schemas, expected 1"
+
+        return check_one_of
+
+    def _not(self, schema: Schema) -> Optional[Check]:
+        if schema.not_ is None:
+            return None
+        not_ = self.check(schema.not_)
+
+        def check_not(value: Any) -> Optional[Error]:
+            if not_(value) is None:
+                return (), "must not match the 'not' schema"
+            return None
+
+        return check_not
+
+    def _condition(self, schema: Schema) -> Optional[Check]:
+        if schema.if_ is None or (schema.then is None and schema.else_ is None):
+            return None
+        if_ = self.check(schema.if_)
+        then = _valid if schema.then is None else self.check(schema.then)
+        else_ = _valid if schema.else_ is None else self.check(schema.else_)
+
+        def check_condition(value: Any) -> Optional[Error]:
+            return then(value) if if_(value) is None else else_(value)
+
+        return check_condition
+
+    def _array(self, schema: Schema) -> list[Check]:
+        checks = _bounds(schema, ARRAY_BOUNDS)
+        if isinstance(schema.items, Schema):
+            checks.append(_each(self.check(schema.items)))
+        elif schema.items is not None:
+            additional = None
+            if schema.additionalItems is not None:
+                additional = self.check(schema.additionalItems)
+            checks.append(
+                _positional([self.check(s) for s in schema.items], additional),
+            )
+        if schema.uniqueItems:
+            checks.append(_unique)
+        if schema.contains is not None:
+            checks.append(_contains(self.check(schema.contains)))
+        return checks
+
+    def _object(self, schema: Schema) -> list[Check]:
+        checks = _bounds(schema, OBJECT_BOUNDS)
+        if schema.required:
+            checks.append(_required(tuple(schema.required)))
+        properties = {
+            name: self.check(s) for name, s in (schema.properties or {}).items()
+        }
+        patterns = [
+            (re.compile(pattern), self.check(s))
+            for pattern, s in (schema.patternProperties or {}).items()
+        ]
+        additional: Optional[Check] = None
+        if isinstance(schema.additionalProperties, Schema):
+            additional = self.check(schema.additionalProperties)
+        elif schema.additionalProperties is False:
+            additional = _reject
+        if patterns or additional is not None:
+            checks.append(_properties(properties, patterns, additional))
+        elif properties:
+            checks.append(_declared_properties(properties))
+        if schema.propertyNames is not None:
+            checks.append(_property_names(self.check(schema.propertyNames)))
+        if schema.dependencies:
+            checks.append(
+                _dependencies(
+                    {
+                        name: dep if isinstance(dep, list) else self.check(dep)
+                        for name, dep in schema.dependencies.items()
+                    },
+                ),
+            )
+        return checks
+
+
+def _type(schema: Schema) -> Optional[Check]:
+    if schema.type is None:
+        return None
+    names = [schema.type] if isinstance(schema.type, str) else schema.type
+    type_checks = tuple(TYPE_CHECKS[name] for name in names)
+    message = f"expected {' or '.join(names)}"
+
+    def check_type(value: Any) -> Optional[Error]:
+        for is_type in type_checks:
+            if is_type(value):
+                return None
+        return (), message
+
+    return check_type
+
+
+def _enum(schema: Schema) -> Optional[Check]:
+    if schema.enum is None:
+        return None
+    allowed = frozenset(map(_unique_key, schema.enum))
+    message = f"is not one of {sorted(schema.enum)}"
+
+    def check_enum(value: Any) -> Optional[Error]:
+        if _unique_key(value) in allowed:
+            return None
+        return (), f"{value!r} {message}"
+
+    return check_enum
+
+
+def _const(schema: Schema) -> Optional[Check]:
+    if "const" not in schema.model_fields_set:
+        return None
+    const = schema.const
+    key = _unique_key(const)
+
+    def check_const(value: Any) -> Optional[Error]:
+        if _unique_key(value) == key:
+            return None
+        return (), f"expected {const!r}"
+
+    return check_const
+
+
+def _multiple_of(schema: Schema) -> list[Check]:
+    if schema.multipleOf is None:
+        return []
+    multiple = schema.multipleOf
+
+    def check_multiple_of(value: Any) -> Optional[Error]:
+        if is_multiple(value, multiple):
+            return None
+        return (), f"must be a multiple of {multiple}"
+
+    return [check_multiple_of]
+
+
+def is_multiple(value: float, multiple: float) -> bool:
+    """Whether ``value`` is an integer multiple of ``multiple``.
+
+    Integers are compared directly and other numbers through the exact fractions
+    of their decimal representations, so no tolerance accepts near multiples.
+    """
+    if isinstance(value, int) and isinstance(multiple, int):
+        return value % multiple == 0
+    if any(isinstance(n, float) and not math.isfinite(n) for n in (value, multiple)):
+        return False
+    return (Fraction(str(value)) / Fraction(str(multiple))).denominator == 1
+
+
+def _pattern(schema: Schema) -> list[Check]:
+    if schema.pattern is None:
+        return []
+    search = re.compile(schema.pattern).search
+    message = f"does not match {schema.pattern!r}"
+
+    def check_pattern(value: str) -> Optional[Error]:
+        return ((), message) if search(value) is None else None
+
+    return [check_pattern]
+
+
+def _unique_key(value: Any) -> Any:
+    """Hashable key of a JSON value, equal for values that JSON Schema considers
+    equal (like ``1`` and ``1.0``, unlike ``1`` and ``true``)."""
+    if isinstance(value, dict):
+        return "object", frozenset((k, _unique_key(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return "array", tuple(map(_unique_key, value))
+    if isinstance(value, bool):
+        return "boolean", value
+    return value
+
+
+def _unique(value: list[Any]) -> Optional[Error]:
+    seen = set(map(_unique_key, value))
+    return None if len(seen) == len(value) else ((), "items must be unique")
+
+
+def _contains(contains: Check) -> Check:
+    def check_contains(value: list[Any]) -> Optional[Error]:
+        for item in value:
+            if contains(item) is None:
+                return None
+        return (), "no item matches the 'contains' schema"
+
+    return check_contains
+
+
+def _each(item: Check) -> Check:
+    def check_items(value: list[Any]) -> Optional[Error]:
+        for i, v in enumerate(value):
+            error = item(v)
+            if error is not None:
+                return _nested(i, error)
+        return None
+
+    return check_items
+
+
+def _positional(items: list[Check], additional: Optional[Check]) -> Check:
+    def check_items(value: list[Any]) -> Optional[Error]:
+        for i, v in enumerate(value):
+            if i < len(items):
+                error = items[i](v)
+            elif additional is not None:
+                error = additional(v)
+            else:
+                break
+            if error is not None:
+                return _nested(i, error)
+        return None
+
+    return check_items
+
+
+def _required(required: tuple[str, ...]) -> Check:
+    def check_required(value: dict[str, Any]) -> Optional[Error]:
+        for name in required:
+            if name not in value:
+                return (), f"missing required property {name!r}"
+        return None
+
+    return check_required
+
+
+def _declared_properties(properties: dict[str, Check]) -> Check:
+    def check_declared_properties(value: dict[str, Any]) -> Optional[Error]:
+        for name, check in properties.items():
+            if name in value:
+                error = check(value[name])
+                if error is not None:
+                    return _nested(name, error)
+        return None
+
+    return check_declared_properties
+
+
+def _properties(
+    properties: dict[str, Check],
+    patterns: list[tuple[re.Pattern[str], Check]],
+    additional: Optional[Check],
+) -> Check:
+    def check_properties(value: dict[str, Any]) -> Optional[Error]:
+        for name, v in value.items():
+            checks = [properties[name]] if name in properties else []
+            checks.extend(check for p, check in patterns if p.search(name))
+            if not checks and additional is not None:
+                checks.append(additional)
+            for check in checks:
+                error = check(v)
+                if error is not None:
+                    return _nested(name, error)
+        return None
+
+    return check_properties
+
+
+def _property_names(names: Check) -> Check:
+    def check_property_names(value: dict[str, Any]) -> Optional[Error]:
+        for name in value:
+            error = names(name)
+            if error is not None:
+                return (name,), f"invalid property name: {error[1]}"
+        return None
+
+    return check_property_names
+
+
+def _dependencies(dependencies: dict[str, Union[Check, list[str]]]) -> Check:
+    def check_dependencies(value: dict[str, Any]) -> Optional[Error]:
+        for name, dependency in dependencies.items():
+            if name not in value:
+                continue
+            if isinstance(dependency, list):
+                for other in dependency:
+                    if other not in value:
+                        return (), f"{name!r} requires property {other!r}"
+            else:
+                error = dependency(value)
+                if error is not None:
+                    return error
+        return None
+
+    return check_dependencies
+
+
+def compile_schema(
+    schema: Schema,
+    resolver: Optional[Resolver] = None,
+) -> PayloadValidator:
+    """Compile ``schema`` into a reusable validator."""
+    return SchemaCompiler(resolver).compile(schema)
+
+
+def _message(message: BaseModel, resolver: Optional[Resolver]) -> BaseModel:
+    """``message``, resolved if it is a reference (like the entries of
+    ``Channel.messages`` in v3)."""
+    if reference_of(message) is None:
+        return message
+    if resolver is None:
+        msg = "Resolving the message requires its document"
+        raise ValueError(msg)
+    return resolver.resolve(message, (v2.Message, v3.Message))
+
+
+def payload_schema(message: BaseModel, resolver: Optional[Resolver] = None) -> Schema:
+    """Return the JSON Schema of the payload of a v2 or v3 ``message`` (or a
+    reference to one)."""
+    payload = getattr(_message(message, resolver), "payload", None)
+    if isinstance(payload, (Reference, dict)) and reference_of(payload) is not None:
+        if resolver is None:
+            msg = "Resolving the payload requires a resolver"
+            raise ValueError(msg)
+        payload = resolver.resolve(payload, Schema)
+    if isinstance(payload, Schema):
+        return payload
+    schema_format = getattr(payload, "schemaFormat", None)
+    if schema_format is not None:
+        if not schema_format.startswith(JSON_SCHEMA_FORMATS):
+            msg = f"Unsupported schema format: {schema_format}"
+            raise ValueError(msg)
+        payload = payload.schema_  # type: ignore[union-attr]
+    if isinstance(payload, Schema):
+        return payload
+    return Schema.model_validate(payload or {})
+
+
+_validators: IdentityCache[BaseModel, PayloadValidator] = IdentityCache()
+
+
+def message_validator(
+    message: BaseModel,
+    document: Optional[BaseModel] = None,
+) -> PayloadValidator:
+    """Return the payload validator of ``message``, compiling it on first use.
+
+    ``document`` is needed when ``message`` is a reference or its payload schema
+    contains references.
+    """
+    resolver = Resolver.for_document(document) if document is not None else None
+    message = _message(message, resolver)
+    validator = _validators.get(message)
+    if validator is None:
+        validator = compile_schema(payload_schema(message, resolver), resolver)
+        _validators[message] = validator
+    return validator
@@ -0,0 +1,230 @@
+"""Time (and memory) spent validating the parts of a document.
+
+Validation runs in pydantic-core, which cannot report where its time goes, so
+every model calls ``base.validation_hook`` around its validation. Within
+``profiling()``, the hook records the time each model took, including its
+children, for the JSON pointer of its data (looked up in an index of the data of
+the outermost model, which is Python data even when validating JSON). The time of
+a model without the time of its children is attributed to the class of the model
+and to its stack of pointer segments, which ``Profile.folded`` writes in the
+folded format read by flame graph tools (``flamegraph.pl``, speedscope, ...).
+
+Each model is validated once, as it would be without profiling, but the hook
+adds some overhead to every model; the proportions are what matter. The cyclic
+garbage collector is paused meanwhile, so that its pauses are not attributed to
+whichever model happens to trigger them.
+"""
+
+import gc
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel, ValidatorFunctionWrapHandler
+
+from .base import validation_hook
+from .utils import escape
+
+Frames = tuple[str, ...]
+Cost = tuple[float, int]
+
+NO_COST: Cost = (0.0, 0)
+
+
+class Stats:
+    """Number of validations, their time in seconds and the bytes they retained."""
+
+    __slots__ = ("allocated", "count", "time")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time = 0.0
+        self.allocated = 0
+
+    def add(self, seconds: float, allocated: int) -> None:
+        self.count += 1
+        self.time += seconds
+        self.allocated += allocated
+
+    def __repr__(self) -> str:
+        return (
+            f"Stats(count={self.count}, time={self.time:.6f}, "
+            f"allocated={self.allocated})"
+        )
+
+
+class Profile:
+    """Validation statistics of a document.
+
+    ``pointers`` holds the cost of each subtree (including its children), while
+    ``models`` and ``stacks`` hold the cost of the models without their children.
+    """
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self.document: Any = None
+        self.pointers: dict[str, Stats] = {}
+        self.models: dict[str, Stats] = {}
+        self.stacks: dict[Frames, Stats] = {}
+
+    def top(self, n: int = 20, key: str = "time") -> list[tuple[str, Stats]]:
+        """The ``n`` pointers with the most ``time`` (or ``allocated`` bytes)."""
+        items = self.pointers.items()
+        return sorted(items, key=lambda item: getattr(item[1], key), reverse=True)[:n]
+
+    def report(self, n: int = 20, key: str = "time") -> str:
+        """Flat report of the most expensive model classes and pointers."""
+        header = f"{'count':>8} {'time (ms)':>10} {'allocated':>10}"
+        models = sorted(
+            self.models.items(), key=lambda item: getattr(item[1], key), reverse=True
+        )
+        lines = [f"{header}  model"]
+        lines.extend(_line(name, stats) for name, stats in models[:n])
+        lines.append(f"{header}  pointer")
+        lines.extend(_line(pointer, stats) for pointer, stats in self.top(n, key))
+        return "\n".join(lines)
+
+    def folded(self, key: str = "time") -> Iterator[str]:
+        """Lines of folded stacks weighted by microseconds (or allocated bytes)."""
+        for frames, stats in self.stacks.items():
+            weight = stats.time * 1e6 if key == "time" else stats.allocated
+            if weight >= 1:
+                yield f"{';'.join(frames)} {round(weight)}\n"
+
+
+def _line(name: str, stats: Stats) -> str:
+    return f"{stats.count:>8} {stats.time * 1e3:>10.3f} {stats.allocated:>10}  {name}"
+
+
+def _paths(data: Any) -> dict[int, tuple[str, ...]]:
+    """Keys leading to every container of the Python ``data``, by its id."""
+    paths: dict[int, tuple[str, ...]] = {}
+    stack: list[tuple[tuple[str, ...], Any]] = [((), data)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            items: Any = value.items()
+        elif isinstance(value, list):
+            items = enumerate(value)
+        else:
+            continue
+        paths.setdefault(id(value), path)
+        stack.extend(((*path, str(key)), child) for key, child in items)
+    return paths
+
+
+class _Frame:
+    """A model being validated: its path, stack and the cost of its children."""
+
+    __slots__ = ("children", "frames", "path")
+
+    def __init__(self, path: Optional[tuple[str, ...]], frames: Frames) -> None:
+        self.path = path
+        self.frames = frames
+        self.children = NO_COST
+
+
+class Profiler:
+    """``ValidationHook`` recording the cost of every model into ``profile``."""
+
+    def __init__(self, profile: Profile) -> None:
+        self.profile = profile
+        self.traced: Callable[[], int] = (
+            (lambda: tracemalloc.get_traced_memory()[0]) if profile.memory else int
+        )
+        self.paths: dict[int, tuple[str, ...]] = {}
+        self.stack: list[_Frame] = []
+
+    def frame(self, cls: type[BaseModel], data: Any) -> _Frame:
+        name = cls.__name__
+        if not self.stack:
+            # the outermost model: index its data
+            self.paths = _paths(data)
+            return _Frame((), (name,))
+        parent = self.stack[-1]
+        path = self.paths.get(id(data))
+        if (
+            path is None
+            or parent.path is None
+            or path[: len(parent.path)] != parent.path
+        ):
+            return _Frame(path, (*parent.frames, name))
+        segments = path[len(parent.path) :]
+        if not segments:
+            return _Frame(path, (*parent.frames, name))
+        return _Frame(
+            path, (*parent.frames, *segments[:-1], f"{segments[-1]} ({name})")
+        )
+
+    def __call__(
+        self, cls: type[BaseModel], data: Any, handler: ValidatorFunctionWrapHandler
+    ) -> Any:
+        frame = self.frame(cls, data)
+        stack = self.stack
+        stack.append(frame)
+        traced = self.traced()
+        start = time.perf_counter()
+        try:
+            value = handler(data)
+        finally:
+            stack.pop()
+        # failed attempts (e.g. members of unions) count towards their parent
+        cost = (time.perf_counter() - start, self.traced() - traced)
+        children = frame.children
+        own = (max(cost[0] - children[0], 0.0), cost[1] - children[1])
+        profile = self.profile
+        if frame.path is not None:
+            pointer = "#" + "".join(f"/{escape(key)}" for key in frame.path)
+            profile.pointers.setdefault(pointer, Stats()).add(*cost)
+        profile.models.setdefault(cls.__name__, Stats()).add(*own)
+        profile.stacks.setdefault(frame.frames, Stats()).add(*own)
+        if stack:
+            parent = stack[-1]
+            parent.children = (
+                parent.children[0] + cost[0],
+                parent.children[1] + cost[1],
+            )
+        else:
+            profile.document = value
+        return value
+
+
+@contextmanager
+def profiling(memory: bool = False) -> Iterator[Profile]:
+    """Record the validation of every model within the block into a ``Profile``.
+
+    With ``memory`` the bytes retained by each model are recorded as well, using
+    ``tracemalloc`` (which slows validation down considerably). ``Profile.document``
+    is the last model validated outside of any other.
+    """
+    result = Profile(memory)
+    trace = memory and not tracemalloc.is_tracing()
+    collect = gc.isenabled()
+    if trace:
+        tracemalloc.start()
+    gc.disable()
+    token = validation_hook.set(Profiler(result))
+    try:
+        yield result
+    finally:
+        validation_hook.reset(token)
+        if collect:
+            gc.enable()
+        if trace:
+            tracemalloc.stop()
+
+
+def profile(data: dict[str, Any], memory: bool = False) -> Profile:
+    """Validate the v2 or v3 document ``data`` like ``AsyncAPI.model_validate``,
+    recording where the time goes.
+
+    The validated document is available as ``Profile.document``. With ``memory``
+    the bytes retained by each subtree are recorded as well.
+    """
+    from . import AsyncAPI
+
+    with profiling(memory) as result:
+        AsyncAPI.model_validate(data)
+    return result
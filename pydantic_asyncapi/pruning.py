@@ -0,0 +1,130 @@
+"""Removal of the components that nothing in a document refers to.
+
+Everything outside ``components`` (``channels``, ``operations``, ``servers``, ...) is
+used. A component entry is used when a ``$ref`` of a used node points into it,
+including the ``$ref`` of schemas and of raw (dict) payloads, so the analysis
+follows references transitively from the used parts of the document.
+"""
+
+from collections.abc import Iterable
+from functools import cache
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from .utils import (
+    escape,
+    mapping_value_type,
+    model_keys,
+    reference_of,
+    split_pointer,
+)
+
+M = TypeVar("M", bound=BaseModel)
+
+CONTAINERS = (BaseModel, dict, list)
+
+
+@cache
+def _component_maps(cls: type[BaseModel]) -> dict[str, str]:
+    """Field name of each map of components of ``cls``, by its serialized key."""
+    return {
+        key: name
+        for name, key in model_keys(cls)
+        if mapping_value_type(cls.model_fields[name].annotation) is not None
+    }
+
+
+def _targets(components: BaseModel, ref: str) -> list[tuple[str, str]]:
+    """``(field, key)`` of the component entries ``ref`` points into."""
+    tokens = split_pointer(ref)
+    if not tokens or tokens[0] != "components":
+        return []
+    maps = _component_maps(type(components))
+    if len(tokens) == 1:
+        names = list(maps.values())
+    elif tokens[1] in maps:
+        names = [maps[tokens[1]]]
+    else:
+        return []
+    if len(tokens) > 2:
+        return [(name, tokens[2]) for name in names]
+    return [(name, key) for name in names for key in getattr(components, name) or ()]
+
+
+def _children(node: Any) -> Iterable[Any]:
+    """Values of ``node``; unlike ``iter_children`` without building their keys."""
+    if isinstance(node, BaseModel):
+        extra = node.__pydantic_extra__
+        values = node.__dict__.values()
+        return [*values, *extra.values()] if extra else values
+    if isinstance(node, dict):
+        return node.values()
+    return node
+
+
+def _used(document: BaseModel, components: BaseModel) -> set[tuple[str, str]]:
+    used: set[tuple[str, str]] = set()
+    stack: list[Any] = [document]
+    while stack:
+        node = stack.pop()
+        ref = reference_of(node)
+        if ref is not None and ref.startswith("#"):
+            for target in _targets(components, ref):
+                if target in used:
+                    continue
+                used.add(target)
+                entry = (getattr(components, target[0]) or {}).get(target[1])
+                if entry is not None:
+                    stack.append(entry)
+        stack.extend(
+            child
+            for child in _children(node)
+            # empty containers (like the default maps of every schema) are skipped
+            if child and isinstance(child, CONTAINERS) and child is not components
+        )
+    return used
+
+
+def _components(document: BaseModel) -> Optional[BaseModel]:
+    components = getattr(document, "components", None)
+    return components if isinstance(components, BaseModel) else None
+
+
+def reachable(document: BaseModel) -> set[str]:
+    """JSON pointers of the component entries used by ``document``."""
+    components = _components(document)
+    if components is None:
+        return set()
+    keys = {name: key for key, name in _component_maps(type(components)).items()}
+    return {
+        f"#/components/{escape(keys[name])}/{escape(key)}"
+        for name, key in _used(document, components)
+    }
+
+
+def prune(document: M) -> M:
+    """A copy of ``document`` without the component entries it does not use.
+
+    Everything that is kept is shared with ``document``; maps of components left
+    empty are unset. ``document`` itself is returned if nothing is unused.
+    """
+    components = _components(document)
+    if components is None:
+        return document
+    used = _used(document, components)
+    update = {}
+    for name in _component_maps(type(components)).values():
+        entries = getattr(components, name)
+        if not entries:
+            continue
+        kept = {key: entry for key, entry in entries.items() if (name, key) in used}
+        if len(kept) != len(entries):
+            update[name] = kept or None
+    if not update:
+        return document
+    pruned = components.model_copy(update=update)
+    pruned.model_fields_set.difference_update(
+        name for name, kept in update.items() if kept is None
+    )
+    return document.model_copy(update={"components": pruned})
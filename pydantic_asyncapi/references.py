@@ -0,0 +1,159 @@
+"""Reverse index of the references of a document, for impact analysis.
+
+``ReferenceIndex`` maps every pointer that is referred to onto the pointers of the
+references (the *sites*) pointing at it, so that the users of a component are
+found without walking the document. A site uses a pointer when it refers to it,
+to a node within it or to a node containing it; the node containing a site uses
+what the site refers to, which makes the users of a pointer transitive.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from .utils import escape, normalize_pointer, reference_of, walk
+
+# maps whose entries are reported by ``ReferenceIndex.users``
+USERS = ("channels", "operations")
+
+
+def ancestors(pointer: str) -> Iterator[str]:
+    """Pointers of the nodes containing ``pointer``, excluding the root."""
+    while True:
+        pointer = pointer.rpartition("/")[0]
+        if pointer in {"", "#"}:
+            return
+        yield pointer
+
+
+def component_pointer(kind: str, name: str) -> str:
+    """Pointer of the component ``name`` of ``kind`` (e.g. ``"schemas"``)."""
+    return f"#/components/{escape(kind)}/{escape(name)}"
+
+
+def _target(ref: str) -> Optional[str]:
+    try:
+        return normalize_pointer(ref)
+    except ValueError:
+        # references to other documents are not indexed
+        return None
+
+
+class ReferenceIndex:
+    """Sites of the local references of a document, by the pointer they refer to.
+
+    The index is built in one walk of the document and can be kept up to date with
+    ``add``, ``remove`` and ``replace`` as components change. Transitive queries
+    are memoized until the next update.
+    """
+
+    def __init__(self, document: BaseModel) -> None:
+        # target of every site
+        self._sites: dict[str, str] = {}
+        # sites by their exact target, and by every node containing their target
+        self._exact: dict[str, set[str]] = {}
+        self._below: dict[str, set[str]] = {}
+        # sites by every node containing them (and by themselves)
+        self._within: dict[str, set[str]] = {}
+        self._dependents: dict[str, frozenset[str]] = {}
+        for pointer, node, _, _ in walk(document):
+            self._index(pointer, node)
+
+    def _index(self, site: str, node: Any) -> None:
+        ref = reference_of(node)
+        target = None if ref is None else _target(ref)
+        if target is None:
+            return
+        self._sites[site] = target
+        self._exact.setdefault(target, set()).add(site)
+        for ancestor in ancestors(target):
+            self._below.setdefault(ancestor, set()).add(site)
+        for container in (site, *ancestors(site)):
+            self._within.setdefault(container, set()).add(site)
+
+    def _unindex(self, site: str) -> None:
+        target = self._sites.pop(site)
+        self._exact[target].discard(site)
+        for ancestor in ancestors(target):
+            self._below[ancestor].discard(site)
+        for container in (site, *ancestors(site)):
+            within = self._within[container]
+            within.discard(site)
+            if not within:
+                del self._within[container]
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def __contains__(self, site: str) -> bool:
+        return site in self._sites
+
+    def target(self, site: str) -> str:
+        """The pointer the reference at ``site`` refers to."""
+        return self._sites[site]
+
+    def add(self, pointer: str, node: Any) -> None:
+        """Index the references of ``node``, added to the document at ``pointer``."""
+        self._dependents.clear()
+        for site, child, _, _ in walk(node, normalize_pointer(pointer)):
+            self._index(site, child)
+
+    def remove(self, pointer: str) -> None:
+        """Forget the references of the node at ``pointer``, removed from the document."""
+        self._dependents.clear()
+        pointer = normalize_pointer(pointer)
+        sites = self._sites if pointer == "#" else self._within.get(pointer, ())
+        for site in list(sites):
+            self._unindex(site)
+
+    def replace(self, pointer: str, node: Any) -> None:
+        """Re-index the node at ``pointer``, replaced by ``node``."""
+        self.remove(pointer)
+        self.add(pointer, node)
+
+    def referrers(self, pointer: str) -> set[str]:
+        """Sites referring directly to ``pointer`` or to a node within it."""
+        pointer = normalize_pointer(pointer)
+        return self._exact.get(pointer, set()) | self._below.get(pointer, set())
+
+    def dependents(self, pointer: str) -> frozenset[str]:
+        """Sites using ``pointer``, directly or through the nodes containing them."""
+        pointer = normalize_pointer(pointer)
+        dependents = self._dependents.get(pointer)
+        if dependents is None:
+            dependents = self._dependents[pointer] = frozenset(self._closure(pointer))
+        return dependents
+
+    def _closure(self, pointer: str) -> set[str]:
+        exact = self._exact
+        found = self.referrers(pointer)
+        # nodes whose referrers were collected; every node containing one of them
+        # was visited as well
+        visited = {pointer}
+        for ancestor in ancestors(pointer):
+            visited.add(ancestor)
+            found.update(exact.get(ancestor, ()))
+        stack = list(found)
+        while stack:
+            # references to the site itself (like the messages of v3 operations,
+            # referring to those of their channel) or to a node containing it
+            node = stack.pop()
+            while node not in visited and node != "#":
+                visited.add(node)
+                new = exact.get(node, set()) - found
+                found |= new
+                stack.extend(new)
+                node = node.rpartition("/")[0]
+        return found
+
+    def users(self, pointer: str, maps: Iterable[str] = USERS) -> set[str]:
+        """Pointers of the entries of ``maps`` (the channels and operations by
+        default) that use ``pointer``."""
+        roots = {f"#/{escape(name)}" for name in maps}
+        found = set()
+        for site in self.dependents(pointer):
+            root, _, rest = site[2:].partition("/")
+            if f"#/{root}" in roots and rest:
+                found.add(f"#/{root}/{rest.partition('/')[0]}")
+        return found
@@ -0,0 +1,160 @@
+"""Resolution of local ``$ref`` pointers within a single document."""
+
+import weakref
+from typing import Any, Union
+
+from pydantic import BaseModel
+
+from .utils import (
+    IdentityCache,
+    field_targets,
+    normalize_pointer,
+    reference_of,
+    type_adapter,
+    walk,
+)
+
+Targets = tuple[type[BaseModel], ...]
+Target = Union[type[BaseModel], Targets, None]
+
+
+class ResolutionError(LookupError):
+    """Raised when a reference cannot be resolved."""
+
+
+class CircularReferenceError(ResolutionError):
+    """Raised when following a chain of references leads back to its start."""
+
+    def __init__(self, chain: list[str]) -> None:
+        self.chain = chain
+        super().__init__("Circular reference: " + " -> ".join(chain))
+
+
+_resolvers: IdentityCache[BaseModel, "Resolver"] = IdentityCache()
+
+
+class Resolver:
+    """Index of every node of a document keyed by its JSON pointer.
+
+    The document is walked once on construction, so looking up a pointer is a dict
+    hit. Resolved references are memoized per target type. The expected type of
+    each reference is taken from the field it was declared in, e.g. references in
+    ``Channel.messages`` resolve to ``Message``. Targets that are raw data (such as
+    the ``Any`` payload of a v2 message) are validated against that type once.
+    """
+
+    def __init__(self, document: BaseModel) -> None:
+        # the root is held weakly so that cached resolvers do not keep it alive
+        self._document = weakref.ref(document)
+        self._nodes: dict[str, Any] = {}
+        self._targets: dict[int, Targets] = {}
+        self._resolved: dict[tuple[str, Targets], Any] = {}
+        nodes = walk(document)
+        next(nodes)
+        for pointer, node, owner, field in nodes:
+            self._nodes[pointer] = node
+            if owner is not None and field is not None and reference_of(node):
+                self._targets[id(node)] = field_targets(owner, field)
+
+    @classmethod
+    def for_document(cls, document: BaseModel) -> "Resolver":
+        """Return the resolver of ``document``, building its index on first use."""
+        resolver = _resolvers.get(document)
+        if resolver is None:
+            resolver = _resolvers[document] = cls(document)
+        return resolver
+
+    @property
+    def document(self) -> BaseModel:
+        document = self._document()
+        if document is None:
+            msg = "The resolved document no longer exists"
+            raise ResolutionError(msg)
+        return document
+
+    def __contains__(self, pointer: str) -> bool:
+        pointer = self._pointer(pointer)
+        return pointer == "#" or pointer in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes) + 1
+
+    def get(self, pointer: str) -> Any:
+        """Return the node at ``pointer`` without following references."""
+        pointer = self._pointer(pointer)
+        if pointer == "#":
+            return self.document
+        try:
+            return self._nodes[pointer]
+        except KeyError:
+            msg = f"Unresolvable reference: {pointer!r}"
+            raise ResolutionError(msg) from None
+
+    def targets(self, reference: Any) -> Targets:
+        """Types a reference is expected to resolve to, based on where it sits."""
+        return self._targets.get(id(reference), ())
+
+    def resolve(self, reference: Any, target: Target = None) -> Any:
+        """Resolve ``reference`` to the node it points at.
+
+        ``reference`` is a ``$ref`` string, a ``Reference`` or any node carrying a
+        ``$ref``. Chains of references are followed. ``target`` overrides the
+        expected type(s) of the result.
+        """
+        ref = reference if isinstance(reference, str) else reference_of(reference)
+        if ref is None:
+            msg = f"{type(reference).__name__} is not a reference"
+            raise TypeError(msg)
+        if target is None:
+            targets = self.targets(reference)
+        elif isinstance(target, tuple):
+            targets = target
+        else:
+            targets = (target,)
+
+        pointer = self._pointer(ref)
+        key = (pointer, targets)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        chain = [pointer]
+        node = self.get(pointer)
+        while (next_ref := reference_of(node)) is not None:
+            pointer = self._pointer(next_ref)
+            if pointer in chain:
+                raise CircularReferenceError([*chain, pointer])
+            chain.append(pointer)
+            node = self.get(pointer)
+
+        if targets and not isinstance(node, targets):
+            if not isinstance(node, (dict, list)):
+                expected = " | ".join(t.__name__ for t in targets)
+                msg = f"{ref!r} resolves to {type(node).__name__}, expected {expected}"
+                raise ResolutionError(msg)
+            node = type_adapter(Union[targets]).validate_python(node)
+        self._resolved[key] = node
+        return node
+
+    def deref(self, value: Any, target: Target = None) -> Any:
+        """Resolve ``value`` if it is a reference, otherwise return it unchanged."""
+        if reference_of(value) is None:
+            return value
+        return self.resolve(value, target)
+
+    @staticmethod
+    def _pointer(ref: str) -> str:
+        try:
+            return normalize_pointer(ref)
+        except ValueError as e:
+            raise ResolutionError(str(e)) from None
+
+
+def resolve(document: BaseModel, reference: Any, target: Target = None) -> Any:
+    """Resolve ``reference`` within ``document`` using its cached ``Resolver``."""
+    return Resolver.for_document(document).resolve(reference, target)
+
+
+def deref(document: BaseModel, value: Any, target: Target = None) -> Any:
+    return Resolver.for_document(document).deref(value, target)
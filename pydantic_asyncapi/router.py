@@ -0,0 +1,222 @@
+"""Dispatch of concrete topics to the channels of a document.
+
+Channel addresses (v3 ``Channel.address``, v2 ``channels`` keys) are compiled into a
+trie of segments, so matching a topic costs a walk over its segments instead of a
+regex per channel. ``{param}`` segments capture parameter values, and wildcards are
+honoured where the protocol defines them: MQTT ``+``/``#`` for channels served over
+MQTT and AMQP ``*``/``#`` (with ``.`` separated words) for topic exchanges.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from . import v2, v3
+from .bindings.amqp import ExchangeBinding
+from .resolver import Resolver
+from .utils import IdentityCache
+
+PARAMETER = re.compile(r"{([^{}]+)}")
+
+Values = tuple[tuple[str, str], ...]
+Template = tuple[tuple[str, ...], Optional[re.Pattern[str]], "Node"]
+
+
+class Match(NamedTuple):
+    channel_id: str
+    channel: Any
+    parameters: dict[str, str]
+
+
+class Route(NamedTuple):
+    channel_id: str
+    channel: Any
+    enums: dict[str, frozenset[str]]
+
+    def accepts(self, values: Values) -> bool:
+        parameters = dict(values)
+        return all(parameters.get(name) in enum for name, enum in self.enums.items())
+
+
+class Syntax(NamedTuple):
+    separator: str
+    single: Optional[str] = None
+    multi: Optional[str] = None
+
+
+DEFAULT = Syntax("/")
+MQTT = Syntax("/", "+", "#")
+AMQP_TOPIC = Syntax(".", "*", "#")
+
+
+class Node:
+    __slots__ = ("literals", "multi", "routes", "single", "templates")
+
+    def __init__(self) -> None:
+        self.literals: dict[str, Node] = {}
+        self.templates: dict[str, Template] = {}
+        self.single: Optional[Node] = None
+        self.multi: Optional[Node] = None
+        self.routes: list[Route] = []
+
+    def child(self, segment: str, syntax: Syntax) -> "Node":
+        if segment == syntax.single:
+            self.single = self.single or Node()
+            return self.single
+        if segment == syntax.multi:
+            self.multi = self.multi or Node()
+            return self.multi
+        names = tuple(PARAMETER.findall(segment))
+        if not names:
+            return self.literals.setdefault(segment, Node())
+        if segment not in self.templates:
+            pattern = None
+            if segment != f"{{{names[0]}}}":
+                parts = PARAMETER.split(segment)
+                pattern = re.compile(
+                    "".join(
+                        "(.+?)" if i % 2 else re.escape(part)
+                        for i, part in enumerate(parts)
+                    ),
+                )
+            self.templates[segment] = (names, pattern, Node())
+        return self.templates[segment][2]
+
+    def candidates(self, segment: str) -> Iterator[tuple[Values, "Node"]]:
+        """Children matching ``segment``, most specific first."""
+        if segment in self.literals:
+            yield (), self.literals[segment]
+        yield from _captures(segment, self.templates.values())
+        if self.single is not None:
+            yield (), self.single
+
+
+def _captures(
+    segment: str,
+    templates: Iterable[Template],
+) -> Iterator[tuple[Values, Node]]:
+    for names, pattern, node in templates:
+        if pattern is None:
+            if segment:
+                yield ((names[0], segment),), node
+        elif (match := pattern.fullmatch(segment)) is not None:
+            yield tuple(zip(names, match.groups())), node
+
+
+def _search(
+    node: Node,
+    segments: list[str],
+    index: int,
+    values: Values,
+) -> Optional[tuple[Route, Values]]:
+    if index == len(segments):
+        for route in node.routes:
+            if route.accepts(values):
+                return route, values
+        if node.multi is None:
+            return None
+        return _search(node.multi, segments, index, values)
+    for captured, child in node.candidates(segments[index]):
+        found = _search(child, segments, index + 1, values + captured)
+        if found is not None:
+            return found
+    if node.multi is not None:
+        for rest in range(index, len(segments) + 1):
+            found = _search(node.multi, segments, rest, values)
+            if found is not None:
+                return found
+    return None
+
+
+def _enums_v3(resolver: Resolver, channel: v3.Channel) -> dict[str, frozenset[str]]:
+    enums = {}
+    for name, parameter in (channel.parameters or {}).items():
+        enum = resolver.deref(parameter, v3.Parameter).enum
+        if enum is not None:
+            enums[name] = frozenset(enum)
+    return enums
+
+
+def _enums_v2(resolver: Resolver, channel: v2.ChannelItem) -> dict[str, frozenset[str]]:
+    enums = {}
+    for name, parameter in (channel.parameters or {}).items():
+        schema = resolver.deref(parameter, v2.Parameter).schema_
+        enum = None if schema is None else resolver.deref(schema).enum
+        if enum is not None:
+            enums[name] = frozenset(str(value) for value in enum)
+    return enums
+
+
+def _protocols(resolver: Resolver, document: Any, channel: Any) -> set[str]:
+    servers = document.servers or {}
+    if isinstance(channel, v3.Channel) and channel.servers:
+        selected = [resolver.resolve(server) for server in channel.servers]
+    elif isinstance(channel, v2.ChannelItem) and channel.servers:
+        selected = [servers[name] for name in channel.servers if name in servers]
+    else:
+        selected = list(servers.values())
+    return {resolver.deref(server).protocol.lower() for server in selected}
+
+
+def _syntax(resolver: Resolver, document: Any, channel: Any) -> Syntax:
+    bindings = channel.bindings
+    amqp = None if bindings is None else resolver.deref(bindings.amqp)
+    if isinstance(amqp, ExchangeBinding) and amqp.exchange.type == "topic":
+        return AMQP_TOPIC
+    if any("mqtt" in protocol for protocol in _protocols(resolver, document, channel)):
+        return MQTT
+    return DEFAULT
+
+
+_routers: IdentityCache[BaseModel, "Router"] = IdentityCache()
+
+
+class Router:
+    """Match concrete topics to the channels of a v2 or v3 document.
+
+    When several channels match a topic, literal segments win over parameters,
+    which win over wildcards. Channels are otherwise tried in document order.
+    """
+
+    def __init__(self, document: BaseModel) -> None:
+        self._roots: dict[Syntax, Node] = {}
+        resolver = Resolver.for_document(document)
+        for channel_id, value in (getattr(document, "channels", None) or {}).items():
+            channel = resolver.deref(value)
+            if isinstance(channel, v3.Channel):
+                if channel.address is None:
+                    continue
+                address, enums = channel.address, _enums_v3(resolver, channel)
+            else:
+                address, enums = channel_id, _enums_v2(resolver, channel)
+            syntax = _syntax(resolver, document, channel)
+            self.add(address, Route(channel_id, channel, enums), syntax)
+
+    @classmethod
+    def for_document(cls, document: BaseModel) -> "Router":
+        router = _routers.get(document)
+        if router is None:
+            router = _routers[document] = cls(document)
+        return router
+
+    def add(self, address: str, route: Route, syntax: Syntax = DEFAULT) -> None:
+        node = self._roots.setdefault(syntax, Node())
+        for segment in address.split(syntax.separator):
+            node = node.child(segment, syntax)
+        node.routes.append(route)
+
+    def match(self, topic: str) -> Optional[Match]:
+        """Return the channel ``topic`` is published to, or ``None``."""
+        for syntax, root in self._roots.items():
+            found = _search(root, topic.split(syntax.separator), 0, ())
+            if found is not None:
+                route, values = found
+                return Match(route.channel_id, route.channel, dict(values))
+        return None
+
+
+def route(document: BaseModel, topic: str) -> Optional[Match]:
+    """Match ``topic`` using the cached ``Router`` of ``document``."""
+    return Router.for_document(document).match(topic)
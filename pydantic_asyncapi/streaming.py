@@ -0,0 +1,385 @@
+"""Incremental loading and dumping of large JSON and YAML documents.
+
+The source is parsed one map entry at a time: every entry of ``channels``,
+``operations``, ``servers`` and the ``components`` maps is validated as soon as it
+has been read, so the intermediate Python data of a single entry is alive at a time
+instead of that of the whole document. Entries are streamed once the ``asyncapi``
+version is known, which is usually the first key of a document; maps that precede
+it are read as a whole.
+
+Dumping works the other way around: the entries of these maps are serialized (and
+written) one by one instead of building the output of the whole document first.
+"""
+
+import codecs
+import json
+import os
+import textwrap
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Optional, Protocol, Union, get_args
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
+
+from . import v2, v3
+from .utils import (
+    mapping_value_type,
+    model_keys,
+    model_type,
+    relocate,
+    type_adapter,
+)
+
+Source = Union[str, os.PathLike[str], IO[str], IO[bytes]]
+Target = Union[str, os.PathLike[str], IO[Any]]
+Loc = tuple[Union[str, int], ...]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Reader(Protocol):
+    def mapping(self) -> Iterator[str]:
+        """Iterate over the keys of the next mapping.
+
+        The value of each key must be consumed before advancing the iterator.
+        """
+
+    def is_mapping(self) -> bool:
+        """Whether the next value is a mapping."""
+
+    def value(self) -> Any:
+        """Parse the next value as a whole."""
+
+
+class JSONReader:
+    """Reads JSON text from a file in chunks of ``chunk_size`` characters."""
+
+    def __init__(
+        self, file: Union[IO[str], IO[bytes]], chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> None:
+        chunk = self._file.read(size)
+        if isinstance(chunk, bytes):
+            chunk = self._decode(chunk, final=not chunk)
+        self._eof = not chunk
+        # consumed text is dropped, so the buffer holds about one entry at a time
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+
+    def _peek(self) -> str:
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer) or self._eof:
+                return buffer[pos : pos + 1]
+            self._fill(self._chunk_size)
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            msg = f"Expected {char!r} at {self._pos}"
+            raise json.JSONDecodeError(msg, self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # grow geometrically, so that a large value is not re-parsed too often
+            self._fill(max(self._chunk_size, len(self._buffer)))
+
+    def is_mapping(self) -> bool:
+        return self._peek() == "{"
+
+    def mapping(self) -> Iterator[str]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() == "}":
+                self._pos += 1
+                return
+            self._expect(",")
+
+
+class YAMLReader:
+    """Composes and constructs YAML nodes one at a time (requires PyYAML)."""
+
+    def __init__(self, stream: Union[str, bytes, IO[str], IO[bytes]]) -> None:
+        import yaml
+
+        self._events = yaml
+        self._loader = yaml.SafeLoader(stream)
+        self._loader.get_event()  # stream start
+        self._loader.get_event()  # document start
+
+    def value(self) -> Any:
+        loader = self._loader
+        node = loader.compose_node(None, None)
+        value = loader.construct_object(node, deep=True)
+        loader.constructed_objects = {}
+        loader.recursive_objects = {}
+        return value
+
+    def is_mapping(self) -> bool:
+        return self._loader.check_event(self._events.MappingStartEvent)
+
+    def mapping(self) -> Iterator[str]:
+        loader = self._loader
+        loader.get_event()  # mapping start
+        while not loader.check_event(self._events.MappingEndEvent):
+            yield self.value()
+        loader.get_event()
+
+
+def _entries(reader: Reader, value_type: Any, loc: Loc) -> dict[str, Any]:
+    adapter = type_adapter(value_type)
+    entries = {}
+    key = ""
+    try:
+        for key in reader.mapping():
+            entries[key] = adapter.validate_python(reader.value())
+    except ValidationError as e:
+        raise relocate(e, (*loc, key)) from None
+    return entries
+
+
+def _version_model(version: Any) -> Optional[type[BaseModel]]:
+    for cls in (v2.AsyncAPI, v3.AsyncAPI):
+        if version in get_args(cls.model_fields["asyncapi"].annotation):
+            return cls
+    return None
+
+
+def _validate(cls: Optional[type[BaseModel]], data: dict[str, Any], loc: Loc) -> Any:
+    if cls is None:
+        from . import AsyncAPI
+
+        # unknown versions are reported the way the discriminated root model does
+        return AsyncAPI.model_validate(data).root
+    try:
+        return cls.model_validate(data)
+    except ValidationError as e:
+        raise relocate(e, loc) from None
+
+
+def _model(reader: Reader, cls: Optional[type[BaseModel]], loc: Loc = ()) -> Any:
+    shell: dict[str, Any] = {}
+    entries: dict[str, Any] = {}
+    names = {} if cls is None else {alias: name for name, alias in model_keys(cls)}
+    for key in reader.mapping():
+        name = names.get(key)
+        if cls is not None and name is not None and reader.is_mapping():
+            field = cls.model_fields[name]
+            value_type = mapping_value_type(field.annotation)
+            if value_type is not None:
+                entries[name] = _entries(reader, value_type, (*loc, key))
+                if field.is_required():
+                    shell[key] = {}
+                continue
+            if name == "components":
+                entries[name] = _model(
+                    reader, model_type(field.annotation), (*loc, key)
+                )
+                continue
+        shell[key] = value = reader.value()
+        if cls is None and key == "asyncapi":
+            cls = _version_model(value)
+            if cls is not None:
+                names = {alias: name for name, alias in model_keys(cls)}
+    return _validate(cls, shell, loc).model_copy(update=entries)
+
+
+@contextmanager
+def _open(source: Source, mode: str) -> Iterator[Any]:
+    if isinstance(source, (str, os.PathLike)):
+        with Path(source).open(mode) as f:
+            yield f
+    else:
+        yield source
+
+
+def load_json(source: Source, chunk_size: int = CHUNK_SIZE) -> Any:
+    """Validate the v2 or v3 document in the JSON file (or path) ``source``."""
+    with _open(source, "rb") as f:
+        return _model(JSONReader(f, chunk_size), None)
+
+
+def load_yaml(source: Source) -> Any:
+    """Validate the v2 or v3 document in the YAML file (or path) ``source``."""
+    with _open(source, "rb") as f:
+        return _model(YAMLReader(f), None)
+
+
+def _streamed(model: BaseModel, name: str, value: Any) -> Optional[Any]:
+    """Value type of the entries of the field ``name`` if it is streamed."""
+    if not isinstance(value, dict):
+        return None
+    return mapping_value_type(type(model).model_fields[name].annotation)
+
+
+def _fields(
+    model: BaseModel, exclude_unset: bool
+) -> Iterator[tuple[str, str, Any, Any]]:
+    fields_set = model.model_fields_set
+    for name, alias in model_keys(type(model)):
+        if exclude_unset and name not in fields_set:
+            continue
+        value = getattr(model, name)
+        yield name, alias, value, _streamed(model, name, value)
+
+
+def _json_fields(
+    model: BaseModel, by_alias: bool, exclude_unset: bool, **kwargs: Any
+) -> bytes:
+    # the fields as pydantic serializes them, without the enclosing braces
+    dumped = model.model_dump_json(
+        by_alias=by_alias, exclude_unset=exclude_unset, **kwargs
+    )
+    return dumped[1:-1].encode()
+
+
+def _iter_json(
+    model: BaseModel, by_alias: bool, exclude_unset: bool
+) -> Iterator[bytes]:
+    separator = b"{"
+    for name, alias, value, value_type in _fields(model, exclude_unset):
+        key = to_json(alias if by_alias else name)
+        if value_type is not None:
+            adapter = type_adapter(value_type)
+            yield separator + key + b":"
+            entry_separator = b"{"
+            for entry_key, entry in value.items():
+                yield entry_separator + to_json(entry_key) + b":"
+                yield adapter.dump_json(
+                    entry, by_alias=by_alias, exclude_unset=exclude_unset
+                )
+                entry_separator = b","
+            yield b"{}" if entry_separator == b"{" else b"}"
+        elif name == "components" and isinstance(value, BaseModel):
+            yield separator + key + b":"
+            yield from _iter_json(value, by_alias, exclude_unset)
+        else:
+            yield separator + _json_fields(
+                model, by_alias, exclude_unset, include={name}
+            )
+        separator = b","
+    if model.__pydantic_extra__:
+        exclude = set(type(model).model_fields)
+        yield separator + _json_fields(model, by_alias, exclude_unset, exclude=exclude)
+        separator = b","
+    yield b"{}" if separator == b"{" else b"}"
+
+
+def iter_json(
+    document: BaseModel, *, by_alias: bool = True, exclude_unset: bool = True
+) -> Iterator[bytes]:
+    """Serialize ``document`` to JSON in chunks of at most one map entry.
+
+    The joined chunks equal ``document.model_dump_json(...)`` with the same options.
+    """
+    return _iter_json(document, by_alias, exclude_unset)
+
+
+def _yaml(data: Any) -> str:
+    import yaml
+
+    return yaml.safe_dump(data, sort_keys=False, allow_unicode=True)
+
+
+def _yaml_key(key: str) -> str:
+    # "key: {}" of an empty map, continued by the indented entries
+    return _yaml({key: {}})[: -len(" {}\n")] + "\n"
+
+
+def _yaml_fields(
+    model: BaseModel, by_alias: bool, exclude_unset: bool, **kwargs: Any
+) -> str:
+    return _yaml(
+        model.model_dump(
+            mode="json", by_alias=by_alias, exclude_unset=exclude_unset, **kwargs
+        )
+    )
+
+
+def _iter_yaml(model: BaseModel, by_alias: bool, exclude_unset: bool) -> Iterator[str]:
+    for name, alias, value, value_type in _fields(model, exclude_unset):
+        key = alias if by_alias else name
+        if value_type is not None and value:
+            adapter = type_adapter(value_type)
+            yield _yaml_key(key)
+            for entry_key, entry in value.items():
+                data = adapter.dump_python(
+                    entry, mode="json", by_alias=by_alias, exclude_unset=exclude_unset
+                )
+                yield textwrap.indent(_yaml({entry_key: data}), "  ")
+        elif name == "components" and isinstance(value, BaseModel):
+            yield _yaml_key(key)
+            for chunk in _iter_yaml(value, by_alias, exclude_unset):
+                yield textwrap.indent(chunk, "  ")
+        else:
+            yield _yaml_fields(model, by_alias, exclude_unset, include={name})
+    if model.__pydantic_extra__:
+        exclude = set(type(model).model_fields)
+        yield _yaml_fields(model, by_alias, exclude_unset, exclude=exclude)
+
+
+def iter_yaml(
+    document: BaseModel, *, by_alias: bool = True, exclude_unset: bool = True
+) -> Iterator[str]:
+    """Serialize ``document`` to YAML in chunks of at most one map entry."""
+    return _iter_yaml(document, by_alias, exclude_unset)
+
+
+def _write(chunks: Iterable[Any], target: Target, mode: str) -> None:
+    with _open(target, mode) as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def dump_json(
+    document: BaseModel,
+    target: Target,
+    *,
+    by_alias: bool = True,
+    exclude_unset: bool = True,
+) -> None:
+    """Write ``document`` as JSON to the binary file (or path) ``target``."""
+    chunks = iter_json(document, by_alias=by_alias, exclude_unset=exclude_unset)
+    _write(chunks, target, "wb")
+
+
+def dump_yaml(
+    document: BaseModel,
+    target: Target,
+    *,
+    by_alias: bool = True,
+    exclude_unset: bool = True,
+) -> None:
+    """Write ``document`` as YAML to the text file (or path) ``target``."""
+    chunks = iter_yaml(document, by_alias=by_alias, exclude_unset=exclude_unset)
+    _write(chunks, target, "w")
@@ -0,0 +1,132 @@
+"""Effective messages and operations, with their traits applied.
+
+Traits are merged like JSON Merge Patches, in the order they are listed. In v2 the
+merged traits patch the message or operation, in v3 its own fields take precedence
+over those of its traits. Merging copies only the models and dicts it changes:
+every value that no trait touches is shared with the original node.
+"""
+
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from . import v3
+from .resolver import Resolver
+from .utils import IdentityCache, field_targets
+
+M = TypeVar("M", bound=BaseModel)
+
+_mergers: IdentityCache[BaseModel, "TraitMerger"] = IdentityCache()
+
+
+def _copy(node: M, update: dict[str, Any]) -> M:
+    return node.model_copy(update=update) if update else node
+
+
+def _patches(base: BaseModel, patch: BaseModel) -> bool:
+    fields = type(base).model_fields
+    return all(
+        name in fields or name in (patch.model_extra or {})
+        for name in patch.model_fields_set
+    )
+
+
+def merge(base: Any, patch: Any) -> Any:
+    """JSON Merge Patch of ``patch`` onto ``base``, where models are objects.
+
+    Only the fields set on a model patch it, and unchanged values are shared.
+    """
+    if isinstance(base, BaseModel) and isinstance(patch, BaseModel):
+        if type(base) is not type(patch) and not _patches(base, patch):
+            return patch
+        update = {}
+        for name in patch.model_fields_set:
+            value = getattr(patch, name)
+            if name in base.model_fields_set:
+                value = merge(getattr(base, name), value)
+            update[name] = value
+        return _copy(base, update)
+    if isinstance(base, dict) and isinstance(patch, dict):
+        merged = dict(base)
+        for key, value in patch.items():
+            merged[key] = merge(base[key], value) if key in base else value
+        return merged
+    return patch
+
+
+def apply(node: M, traits: BaseModel, node_wins: bool) -> M:
+    """``node`` with the merged ``traits`` applied and its ``traits`` removed."""
+    update = {}
+    for name in traits.model_fields_set:
+        value = getattr(traits, name)
+        if name in node.model_fields_set:
+            own = getattr(node, name)
+            value = merge(value, own) if node_wins else merge(own, value)
+        update[name] = value
+    update["traits"] = None
+    effective = node.model_copy(update=update)
+    effective.model_fields_set.discard("traits")
+    return effective
+
+
+class TraitMerger:
+    """Effective messages and operations of a document, memoized per node.
+
+    The merge of a list of traits is memoized as well, so that traits shared by
+    many messages or operations are merged once.
+    """
+
+    def __init__(self, document: BaseModel) -> None:
+        self._resolver = Resolver.for_document(document)
+        self._node_wins = isinstance(document, v3.AsyncAPI)
+        self._effective: IdentityCache[BaseModel, BaseModel] = IdentityCache()
+        self._merged: dict[tuple[int, ...], tuple[list[Any], BaseModel]] = {}
+
+    @classmethod
+    def for_document(cls, document: BaseModel) -> "TraitMerger":
+        merger = _mergers.get(document)
+        if merger is None:
+            merger = _mergers[document] = cls(document)
+        return merger
+
+    def merged_traits(self, node: BaseModel) -> Optional[BaseModel]:
+        """The traits of ``node`` (resolved) merged into one, if it has any."""
+        traits = getattr(node, "traits", None)
+        if not traits:
+            return None
+        targets = field_targets(type(node), "traits")
+        resolved = [self._resolver.deref(trait, targets) for trait in traits]
+        # keyed by the resolved traits, so that the nodes referring to the same
+        # traits share their merge
+        key = tuple(map(id, resolved))
+        cached = self._merged.get(key)
+        if cached is not None:
+            return cached[1]
+        merged = resolved[0]
+        for trait in resolved[1:]:
+            merged = merge(merged, trait)
+        # the list keeps the traits alive, so that their ids are not reused
+        self._merged[key] = (resolved, merged)
+        return merged
+
+    def effective(self, node: M) -> M:
+        """``node`` (a message or operation, or a reference to one) with its traits
+        applied; ``node`` itself if it has none."""
+        node = self._resolver.deref(node)
+        effective = self._effective.get(node)
+        if effective is None:
+            traits = self.merged_traits(node)
+            if traits is None:
+                return node
+            effective = self._effective[node] = apply(node, traits, self._node_wins)
+        return effective  # type: ignore[return-value]
+
+
+def effective_message(document: BaseModel, message: M) -> M:
+    """``message`` of ``document`` with its traits applied."""
+    return TraitMerger.for_document(document).effective(message)
+
+
+def effective_operation(document: BaseModel, operation: M) -> M:
+    """``operation`` of ``document`` with its traits applied."""
+    return TraitMerger.for_document(document).effective(operation)
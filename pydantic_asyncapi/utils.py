@@ -0,0 +1,225 @@
+"""Helpers shared by the document tooling built on top of the models."""
+
+import weakref
+from collections.abc import Iterator
+from functools import cache
+from typing import Annotated, Any, Generic, Optional, TypeVar, Union, get_args
+from urllib.parse import unquote
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from .base import Reference
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+REF_KEY = "$ref"
+
+Children = Iterator[tuple[str, Any, Optional[type[BaseModel]], Optional[str]]]
+
+
+def escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def normalize_pointer(ref: str) -> str:
+    """Return ``ref`` as a local JSON pointer in the form used by ``walk``."""
+    if not ref.startswith("#"):
+        msg = f"Only local references are supported, got {ref!r}"
+        raise ValueError(msg)
+    return unquote(ref).rstrip("/") or "#"
+
+
+def split_pointer(pointer: str) -> list[str]:
+    return [unescape(token) for token in normalize_pointer(pointer).split("/")[1:]]
+
+
+@cache
+def model_keys(cls: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """Pairs of attribute name and serialized key for every field of ``cls``."""
+    return tuple(
+        (name, field.serialization_alias or field.alias or name)
+        for name, field in cls.model_fields.items()
+    )
+
+
+def model_types(annotation: Any) -> tuple[type[BaseModel], ...]:
+    """Models (other than ``Reference``) that may appear anywhere in ``annotation``."""
+    found: list[type[BaseModel]] = []
+    stack = [annotation]
+    while stack:
+        tp = stack.pop()
+        if isinstance(tp, type) and issubclass(tp, BaseModel):
+            if tp is not Reference and tp not in found:
+                found.append(tp)
+            continue
+        args = get_args(tp)
+        if getattr(tp, "__origin__", None) is Annotated:
+            args = args[:1]
+        stack.extend(reversed(args))
+    return tuple(found)
+
+
+def model_type(annotation: Any) -> type[BaseModel]:
+    """The model of a (possibly optional) model annotation."""
+    for arg in (annotation, *get_args(annotation)):
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg
+    msg = f"{annotation} is not a model type"
+    raise TypeError(msg)
+
+
+def mapping_value_type(annotation: Any) -> Any:
+    """Value type of a (possibly optional or annotated) ``dict`` annotation."""
+    while True:
+        origin = getattr(annotation, "__origin__", None)
+        if origin is dict:
+            return get_args(annotation)[1]
+        if origin is Annotated:
+            annotation = get_args(annotation)[0]
+        elif origin is Union and type(None) in get_args(annotation):
+            members = [a for a in get_args(annotation) if a is not type(None)]
+            if len(members) != 1:
+                return None
+            annotation = members[0]
+        else:
+            return None
+
+
+def relocate(
+    error: ValidationError,
+    loc: tuple[Union[str, int], ...],
+) -> ValidationError:
+    """Prefix the locations of ``error`` with the location of the validated entry."""
+    if not loc:
+        return error
+    line_errors: list[Any] = [
+        {
+            "type": err["type"],
+            "loc": (*loc, *err["loc"]),
+            "input": err["input"],
+            **({"ctx": err["ctx"]} if "ctx" in err else {}),
+        }
+        for err in error.errors()
+    ]
+    return ValidationError.from_exception_data(error.title, line_errors)
+
+
+@cache
+def type_adapter(tp: Any) -> TypeAdapter[Any]:
+    """Cached ``TypeAdapter`` for an arbitrary (hashable) type."""
+    return TypeAdapter(tp)
+
+
+@cache
+def field_targets(cls: type[BaseModel], name: str) -> tuple[type[BaseModel], ...]:
+    """Models that the value, items or map values of field ``name`` may hold."""
+    return model_types(cls.model_fields[name].annotation)
+
+
+@cache
+def ref_field(cls: type[BaseModel]) -> Optional[str]:
+    """Name of the field of ``cls`` serialized as ``$ref``, if any."""
+    for name, key in model_keys(cls):
+        if key == REF_KEY:
+            return name
+    return None
+
+
+def reference_of(node: Any) -> Optional[str]:
+    """Return the ``$ref`` of ``node`` if it refers to another part of a document."""
+    if isinstance(node, Reference):
+        return node.ref
+    if isinstance(node, BaseModel):
+        name = ref_field(type(node))
+        value = node.__dict__.get(name) if name is not None else None
+        return value if isinstance(value, str) else None
+    if isinstance(node, dict):
+        value = node.get(REF_KEY)
+        return value if isinstance(value, str) else None
+    return None
+
+
+def iter_children(
+    node: Any,
+    owner: Optional[type[BaseModel]] = None,
+    field: Optional[str] = None,
+) -> Children:
+    """Yield ``(key, child, owner, field)`` for the direct children of ``node``.
+
+    ``owner`` and ``field`` identify the model field a child was declared in. Items
+    of a dict or list inherit the field of the container they are stored in, and
+    are ``None`` for extension (``x-*``) data.
+    """
+    if isinstance(node, BaseModel):
+        cls = type(node)
+        values = node.__dict__
+        for name, key in model_keys(cls):
+            value = values.get(name)
+            if value is not None:
+                yield escape(key), value, cls, name
+        if node.__pydantic_extra__:
+            for key, value in node.__pydantic_extra__.items():
+                yield escape(key), value, None, None
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            yield escape(str(key)), value, owner, field
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            yield str(i), value, owner, field
+
+
+def walk(root: Any, pointer: str = "#") -> Children:
+    """Iterate over every model and container of a document in pre-order.
+
+    Yields ``(pointer, node, owner, field)`` tuples. The walk is iterative, so deeply
+    nested schemas cannot exhaust the interpreter stack.
+    """
+    stack: list[tuple[str, Any, Optional[type[BaseModel]], Optional[str]]] = [
+        (pointer, root, None, None),
+    ]
+    while stack:
+        item = stack.pop()
+        yield item
+        path, node, owner, field = item
+        children = [
+            (f"{path}/{key}", child, child_owner, child_field)
+            for key, child, child_owner, child_field in iter_children(
+                node, owner, field
+            )
+            if isinstance(child, (BaseModel, dict, list))
+        ]
+        stack.extend(reversed(children))
+
+
+class IdentityCache(Generic[K, V]):
+    """Mapping keyed by object identity.
+
+    Entries are dropped as soon as the key object is garbage collected, which makes
+    it suitable for memoizing data derived from (unhashable) model instances.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[int, V] = {}
+
+    def __contains__(self, obj: object) -> bool:
+        return id(obj) in self._data
+
+    def __getitem__(self, obj: K) -> V:
+        return self._data[id(obj)]
+
+    def __setitem__(self, obj: K, value: V) -> None:
+        key = id(obj)
+        if key not in self._data:
+            weakref.finalize(obj, self._data.pop, key, None)
+        self._data[key] = value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, obj: K, default: Union[V, None] = None) -> Union[V, None]:
+        return self._data.get(id(obj), default)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.batch import (
+    OK,
+    avalidate_batch,
+    find_message,
+    validate_batch,
+)
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.fixture
+def document_v3():
+    return v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml"))
+
+
+@pytest.fixture
+def document_v2():
+    return v2.AsyncAPI.model_validate(yaml_data("v2/simple.yaml"))
+
+
+def test_validate_batch_v3(document_v3):
+    results = validate_batch(
+        document_v3,
+        [
+            ("userSignedup", "UserSignedUp", b'{"displayName": "a"}'),
+            ("userSignedup", "UserSignedUp", b'{"displayName": 1}'),
+            ("userSignedup", "UserSignedUp", b"{"),
+            ("userSignedup", "Unknown", b"{}"),
+            ("unknown", "UserSignedUp", b"{}"),
+            ("userSignedup", "UserSignedUp", '{"email": "a@b.c"}'),
+            ("userSignedup", "UserSignedUp", b"[" * 100000 + b"]" * 100000),
+        ],
+    )
+    assert [result.ok for result in results] == [
+        True,
+        False,
+        False,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert isinstance(results[-1].error, RecursionError)
+    assert results[0] is OK
+    assert results[1].error.path == ("displayName",)
+    assert isinstance(results[2].error, ValueError)
+    assert "Unknown message" in str(results[3].error)
+    assert "Unknown channel" in str(results[4].error)
+
+
+@pytest.mark.parametrize("message_id", ["UserSignedUp", "subscribe"])
+def test_validate_batch_v2(document_v2, message_id):
+    results = validate_batch(
+        document_v2,
+        [
+            ("user/signedup", message_id, b'{"displayName": "a"}'),
+            ("user/signedup", message_id, b'{"displayName": 1}'),
+            ("user/signedup", "publish", b"{}"),
+        ],
+    )
+    assert [result.ok for result in results] == [True, False, False]
+
+
+def test_find_message_v2_one_of():
+    data = yaml_data("v2/simple.yaml")
+    data["channels"]["user/signedup"]["subscribe"]["message"] = {
+        "oneOf": [
+            {"$ref": "#/components/messages/UserSignedUp"},
+            {"messageId": "deleted", "payload": {"type": "string"}},
+        ],
+    }
+    # a reference to a oneOf message
+    data["channels"]["copy"] = {
+        "subscribe": {
+            "message": {"$ref": "#/channels/user~1signedup/subscribe/message"}
+        }
+    }
+    document = v2.AsyncAPI.model_validate(data)
+    for channel in ("user/signedup", "copy"):
+        assert find_message(document, channel, "deleted").messageId == "deleted"
+        assert find_message(document, channel, "UserSignedUp").payload
+        with pytest.raises(LookupError):
+            find_message(document, channel, "subscribe")
+    results = validate_batch(document, [("copy", "deleted", b'"x"')])
+    assert results == [OK]
+
+
+def test_avalidate_batch(document_v3):
+    async def items():
+        for payload in (b'{"displayName": "a"}', b'{"displayName": 1}'):
+            yield "userSignedup", "UserSignedUp", payload
+
+    results = asyncio.run(avalidate_batch(document_v3, items()))
+    assert [result.ok for result in results] == [True, False]
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.generator import generate
+from benchmarks.runner import compare, run
+from pydantic_asyncapi import AsyncAPI
+
+
+@pytest.mark.parametrize("version", ["2.6.0", "3.0.0", "3.1.0"])
+def test_generated_documents_round_trip(version):
+    data = generate(version, channels=10, messages=4, depth=3, refs=2)
+    model = AsyncAPI.model_validate(data)
+    assert model.root.asyncapi == version
+    assert len(model.root.channels) == 10
+    assert model.model_dump(by_alias=True, exclude_unset=True) == data
+
+
+def test_run_and_compare():
+    results = run(channels=2, messages=2, depth=1, refs=1, repeat=1, pattern="v3.")
+    names = {case["name"] for case in results["cases"]}
+    assert "v3.model_validate_json" in names
+    assert "root-v3.model_dump" in names
+    assert all(case["peak_memory"] > 0 for case in results["cases"])
+    assert json.loads(json.dumps(results)) == results
+
+    slower = {
+        "cases": [
+            {**case, "seconds": case["seconds"] * 2} for case in results["cases"]
+        ],
+    }
+    assert set(compare(results, slower, 1.5)) == names
+    assert compare(slower, results, 1.5) == {}
+
+
+def test_main(tmp_path):
+    output = tmp_path / "results.json"
+    argv = ["--channels", "2", "--messages", "1", "--depth", "1", "--repeat", "1"]
+    assert main([*argv, "--output", str(output), "-k", "v2.model_dump"]) == 0
+    results = json.loads(output.read_text())
+    assert results["parameters"]["channels"] == 2
+
+    def previous(seconds):
+        path = tmp_path / f"previous-{seconds}.json"
+        cases = [{**case, "seconds": seconds} for case in results["cases"]]
+        path.write_text(json.dumps({**results, "cases": cases}))
+        return ["--compare", str(path), "--threshold", "2"]
+
+    argv = [*argv, "--output", str(output), "-k", "v2.model_dump"]
+    # far slower and far faster previous timings than any run
+    assert main([*argv, *previous(3600.0)]) == 0
+    assert main([*argv, *previous(1e-12)]) == 1
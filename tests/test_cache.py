@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from pydantic_asyncapi import v3
+from pydantic_asyncapi.cache import DEFAULT_NAMESPACE, DocumentCache, validate_json
+from tests.test_asyncapi import BASE_DIR, yaml_data
+
+
+@pytest.fixture
+def source():
+    return json.dumps(yaml_data("v3/simple.yaml")).encode()
+
+
+def test_load(tmp_path, source):
+    cache = DocumentCache(tmp_path)
+    calls = []
+
+    def loader(data):
+        calls.append(data)
+        return validate_json(data)
+
+    document = cache.load(source, loader)
+    assert isinstance(document, v3.AsyncAPI)
+    cached = DocumentCache(tmp_path).load(source, loader)
+    assert cached == document
+    assert cached is not document
+    assert len(calls) == 1
+    assert len(cache) == 1
+    cache.load(source.replace(b"Account", b"User"), loader)
+    assert len(calls) == 2
+    assert len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_load_path(tmp_path):
+    cache = DocumentCache(tmp_path)
+    path = BASE_DIR / "fixtures/v2/simple.yaml"
+
+    def loader(data):
+        return v3.AsyncAPI.model_validate(yaml.safe_load(data))
+
+    with pytest.raises(ValidationError):
+        cache.load_path(path, loader)
+    document = cache.load_path(BASE_DIR / "fixtures/v3/simple.yaml", loader)
+    assert cache.load_path(BASE_DIR / "fixtures/v3/simple.yaml", loader) == document
+
+
+def test_stale_and_corrupt_entries(tmp_path, source, monkeypatch):
+    cache = DocumentCache(tmp_path)
+    cache.load(source)
+    key = cache.key(source)
+    cache.path(key).write_bytes(b"not a pickle")
+    assert cache.get(key) is None
+    assert not cache.path(key).exists()
+
+    cache.load(source)
+    monkeypatch.setattr("pydantic_asyncapi.cache.fingerprint", lambda: "other")
+    upgraded = DocumentCache(tmp_path)
+    assert len(upgraded) == 0
+    assert upgraded.key(source) != key
+
+
+def test_size_cap(tmp_path, source):
+    cache = DocumentCache(tmp_path)
+    sources = [source.replace(b"Account", name) for name in (b"A", b"B", b"C")]
+    for i, data in enumerate(sources):
+        cache.load(data)
+        os.utime(cache.path(cache.key(data)), (i, i))
+    size = cache.path(cache.key(sources[0])).stat().st_size
+    cache.max_size = size * 2
+    cache.evict()
+    assert cache.get(cache.key(sources[0])) is None
+    assert cache.get(cache.key(sources[2])) is not None
+
+
+def test_loaders_are_namespaced(tmp_path, source):
+    cache = DocumentCache(tmp_path)
+    cache.load(source)
+    calls = []
+
+    def loader(data):
+        calls.append(data)
+        return validate_json(data)
+
+    # not the document of the default loader
+    cache.load(source, loader)
+    cache.load(source, loader)
+    assert calls == [source]
+    assert len(cache) == 2
+    with pytest.raises(ValueError, match="pass a namespace"):
+        cache.load(source, lambda data: validate_json(data + b" "))
+    cache.load(source, loader, namespace="json")
+    assert len(calls) == 2
+    assert len(cache) == 3
+    assert cache.key(source) != cache.key(source, "json")
+    assert cache.key(source) == cache.key(source, DEFAULT_NAMESPACE)
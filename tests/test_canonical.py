@@ -0,0 +1,70 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+from pydantic_asyncapi import AsyncAPI, v2, v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.canonical import canonical_json, content_hash
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    ("model", "path"),
+    [(v2.AsyncAPI, "v2/simple.yaml"), (v3.AsyncAPI, "v3/backend.yaml")],
+)
+def test_matches_dump(model, path):
+    document = model.model_validate(yaml_data(path))
+    data = document.model_dump(mode="json", by_alias=True, exclude_unset=True)
+    encoded = canonical_json(document)
+    assert json.loads(encoded) == data
+    assert encoded == json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    root = AsyncAPI.model_validate(yaml_data(path))
+    assert canonical_json(root) == encoded
+
+
+def test_key_order():
+    data = yaml_data("v3/simple.yaml")
+    reordered = deepcopy(data)
+    reordered["channels"] = dict(reversed(reordered["channels"].items()))
+    first = v3.AsyncAPI.model_validate(data)
+    second = v3.AsyncAPI.model_validate(dict(reversed(reordered.items())))
+    assert canonical_json(first) == canonical_json(second)
+    assert content_hash(first) == content_hash(second)
+
+
+def test_numbers():
+    integral = Schema.model_validate({"minimum": 1, "const": {"scale": [2]}})
+    floating = Schema.model_validate({"minimum": 1.0, "const": {"scale": [2.0]}})
+    assert canonical_json(integral) == canonical_json(floating)
+    assert canonical_json(integral) == b'{"const":{"scale":[2]},"minimum":1}'
+    assert canonical_json(Schema(maximum=-0.0)) == b'{"maximum":0}'
+    assert canonical_json(Schema(maximum=0.1)) == b'{"maximum":0.1}'
+    assert canonical_json(Schema(maximum=1e300)) == b'{"maximum":1e+300}'
+    with pytest.raises(ValueError, match="no JSON representation"):
+        canonical_json(Schema(maximum=float("nan")))
+
+
+def test_aliases_and_unset_fields():
+    schema = Schema.model_validate(
+        {"$ref": "#/components/schemas/User", "description": "Zoë"}
+    )
+    assert canonical_json(schema) == (
+        '{"$ref":"#/components/schemas/User","description":"Zoë"}'.encode()
+    )
+    assert canonical_json(Schema()) == b"{}"
+    assert canonical_json(Schema(title=None)) == b'{"title":null}'
+
+
+def test_content_hash():
+    document = v3.AsyncAPI.model_validate(yaml_data("v3/backend.yaml"))
+    digest = content_hash(document)
+    assert len(digest) == 64
+    assert content_hash(document) is digest
+    copy = v3.AsyncAPI.model_validate(yaml_data("v3/backend.yaml"))
+    assert content_hash(copy) == digest
+    changed = document.model_copy(update={"id": "urn:changed"})
+    assert content_hash(changed) != digest
+    # subtrees are hashed on their own
+    channel = next(iter(document.channels.values()))
+    assert content_hash(channel) not in {digest, content_hash(changed)}
@@ -0,0 +1,67 @@
+import copy
+import pickle
+
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.base import Reference, Schema
+from pydantic_asyncapi.compact import (
+    EMPTY,
+    CompactReference,
+    CompactSchema,
+    compact,
+    thaw,
+)
+from pydantic_asyncapi.payload import message_validator
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    ("model", "path"),
+    [(v2.AsyncAPI, "v2/simple.yaml"), (v3.AsyncAPI, "v3/simple.yaml")],
+)
+def test_round_trip(model, path):
+    data = yaml_data(path)
+    document = model.model_validate(data)
+    expected = document.model_dump(by_alias=True, exclude_unset=True)
+    full = document.model_dump_json()
+    compacted = compact(model.model_validate(data))
+    assert compacted.model_dump(by_alias=True, exclude_unset=True) == expected
+    assert compacted.model_dump_json() == full
+    assert compacted == document
+
+
+def test_compact_nodes():
+    document = compact(v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml")))
+    payload = document.components.messages["UserSignedUp"].payload
+    reference = document.channels["userSignedup"].messages["UserSignedUp"]
+    assert isinstance(payload, CompactSchema)
+    assert isinstance(reference, CompactReference)
+    assert payload.definitions is EMPTY
+    email = payload.properties["email"]
+    with pytest.raises(TypeError):
+        payload.title = "x"
+    with pytest.raises(TypeError):
+        email.definitions["x"] = Schema()
+    validator = message_validator(document.components.messages["UserSignedUp"])
+    assert validator.is_valid({"email": "a@b.c"})
+
+
+def test_shared_fields_set():
+    properties = {"a": {"type": "string"}, "b": {"type": "integer"}}
+    schema = compact(Schema.model_validate({"properties": properties}))
+    a, b = schema.properties["a"], schema.properties["b"]
+    assert a.model_fields_set is b.model_fields_set
+
+
+def test_thaw():
+    schema = compact(Schema.model_validate({"type": "string", "$ref": "#/a"}))
+    copied = schema.model_copy(update={"title": "x"})
+    assert type(copied) is Schema
+    assert copied.model_fields_set == {"type", "field_ref", "title"}
+    assert schema.model_fields_set == {"type", "field_ref"}
+    copied.definitions["x"] = Schema()
+    assert type(copy.deepcopy(schema)) is Schema
+    assert thaw(schema) == schema
+    reference = compact(Reference(ref="#/a"))
+    assert pickle.loads(pickle.dumps(reference)) == reference  # noqa: S301
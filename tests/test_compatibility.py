@@ -0,0 +1,217 @@
+from copy import deepcopy
+
+import pytest
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.compatibility import (
+    BACKWARD,
+    FORWARD,
+    FULL,
+    CompatibilityChecker,
+    accepts_anything,
+    check_compatibility,
+)
+
+
+def _schema(data):
+    return Schema.model_validate(data)
+
+
+def _compatible(old, new, mode=BACKWARD):
+    return check_compatibility(_schema(old), _schema(new), mode) is None
+
+
+USER = {
+    "type": "object",
+    "required": ["id"],
+    "properties": {"id": {"type": "string"}, "age": {"type": "integer"}},
+}
+
+
+def test_modes():
+    assert _compatible(USER, deepcopy(USER), FULL)
+    optional = deepcopy(USER)
+    optional["properties"]["name"] = {"type": "string"}
+    # old payloads of an open object may carry a name of any type
+    assert _compatible(USER, optional, FORWARD)
+    assert not _compatible(USER, optional, BACKWARD)
+    closed = deepcopy(USER)
+    closed["additionalProperties"] = False
+    closed_optional = deepcopy(optional)
+    closed_optional["additionalProperties"] = False
+    assert _compatible(closed, closed_optional, BACKWARD)
+    assert not _compatible(closed, closed_optional, FORWARD)
+    # a new required property breaks old producers, not old consumers
+    required = deepcopy(optional)
+    required["required"].append("name")
+    assert not _compatible(USER, required, BACKWARD)
+    assert _compatible(USER, required, FORWARD)
+    assert not _compatible(USER, required, FULL)
+    error = check_compatibility(_schema(USER), _schema(required))
+    assert error == (("required",), "'name' is required")
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError, match="Invalid compatibility mode"):
+        check_compatibility(_schema(USER), _schema(USER), "sideways")
+
+
+def test_types():
+    assert _compatible({"type": "string"}, {"type": ["string", "null"]})
+    assert not _compatible({"type": "string"}, {"type": ["string", "null"]}, FORWARD)
+    assert _compatible({"type": "integer"}, {"type": "number"})
+    assert not _compatible({"type": "number"}, {"type": "integer"})
+    assert _compatible({"type": "string"}, {})
+    assert not _compatible({}, {"type": "string"})
+    assert accepts_anything(_schema({"description": "anything"}))
+
+
+def test_enums():
+    old = {"type": "string", "enum": ["a", "b"]}
+    wider = {"type": "string", "enum": ["a", "b", "c"]}
+    assert _compatible(old, wider)
+    assert not _compatible(old, wider, FORWARD)
+    assert _compatible(old, {"type": "string"})
+    assert not _compatible({"type": "string"}, old)
+    assert _compatible({"const": "a"}, old)
+    error = check_compatibility(_schema(wider), _schema(old))
+    assert error is not None
+    assert error[1].startswith("'c' is not accepted")
+
+
+def test_numeric_bounds():
+    old = {"type": "integer", "minimum": 0, "maximum": 10}
+    assert _compatible(old, {"type": "integer", "minimum": -1})
+    assert not _compatible(old, {"type": "integer", "minimum": 1})
+    assert not _compatible(old, {"type": "integer", "exclusiveMinimum": 0})
+    assert _compatible({"type": "number", "exclusiveMaximum": 10}, {"maximum": 10})
+    assert not _compatible({"type": "number", "maximum": 10}, {"exclusiveMaximum": 10})
+    assert _compatible({"type": "integer", "multipleOf": 4}, {"multipleOf": 2})
+    assert not _compatible({"type": "integer", "multipleOf": 2}, {"multipleOf": 4})
+    # exactly, however large or small the numbers
+    assert not _compatible({"multipleOf": 1500000000.5}, {"multipleOf": 1})
+    assert not _compatible({"multipleOf": 1e-10}, {"multipleOf": 0.1})
+    assert _compatible({"multipleOf": 0.3}, {"multipleOf": 0.1})
+    assert not _compatible({"const": 10000000000.5}, {"multipleOf": 1})
+
+
+def test_additional_properties():
+    closed = deepcopy(USER)
+    closed["additionalProperties"] = False
+    assert _compatible(closed, USER)
+    # an open object may carry any property that the closed one rejects
+    assert not _compatible(USER, closed)
+    wider = deepcopy(closed)
+    wider["properties"]["name"] = {"type": "string"}
+    assert _compatible(closed, wider)
+    assert not _compatible(wider, closed)
+    typed = deepcopy(USER)
+    typed["additionalProperties"] = {"type": "string"}
+    assert _compatible(typed, USER)
+    assert not _compatible(USER, typed)
+
+
+def test_combinators():
+    string, number = {"type": "string"}, {"type": "number"}
+    either = {"anyOf": [string, number]}
+    assert _compatible(string, either)
+    assert _compatible(either, {"type": ["string", "number"]})
+    assert not _compatible(either, string)
+    assert _compatible({"allOf": [USER, {"required": ["age"]}]}, USER)
+    assert not _compatible(USER, {"allOf": [USER, {"required": ["age"]}]})
+    assert _compatible({"oneOf": [string, number]}, either)
+    assert _compatible(string, {"oneOf": [string, number]})
+    # overlapping branches: a string could match both
+    assert not _compatible(string, {"oneOf": [string, {"maxLength": 3}]})
+
+
+def test_discriminated_one_of():
+    def event(kind):
+        return {
+            "type": "object",
+            "required": ["kind"],
+            "properties": {"kind": {"const": kind}, "id": {"type": "string"}},
+        }
+
+    old = {"oneOf": [event("created"), event("deleted")]}
+    new = deepcopy(old)
+    new["oneOf"].append(event("updated"))
+    assert _compatible(old, new)
+    assert not _compatible(old, new, FORWARD)
+    assert _compatible(event("created"), old)
+
+
+def test_recursive_references():
+    def document(value_type):
+        data = generate("3.0.0", channels=1, messages=1, depth=1)
+        data["components"]["schemas"]["Tree"] = {
+            "type": "object",
+            "properties": {
+                "value": {"type": value_type},
+                "children": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/Tree"},
+                },
+            },
+        }
+        return v3.AsyncAPI.model_validate(data)
+
+    old, new = document("integer"), document("number")
+    ref = _schema({"$ref": "#/components/schemas/Tree"})
+    checker = CompatibilityChecker()
+    assert checker.is_compatible(ref, ref, BACKWARD, old, new)
+    error = checker.check(ref, ref, FORWARD, old, new)
+    assert error == (("properties", "value", "type"), "number is not accepted")
+    with pytest.raises(ValueError, match="without its document"):
+        checker.check(ref, ref)
+
+
+def test_memoization():
+    data = generate("3.0.0", channels=30, messages=30, depth=3)
+    old = v3.AsyncAPI.model_validate(data)
+    for schema in data["components"]["schemas"].values():
+        schema.get("properties", {})["added"] = {"type": "string"}
+    new = v3.AsyncAPI.model_validate(data)
+    pairs = [
+        (old.components.messages[name].payload, message.payload)
+        for name, message in new.components.messages.items()
+    ]
+    checker = CompatibilityChecker()
+    for a, b in pairs:
+        assert checker.is_compatible(a, b, FORWARD, old, new)
+    results = len(checker)
+    # the schemas referenced by every message are compared once for all of them
+    separate = 0
+    for a, b in pairs:
+        single = CompatibilityChecker()
+        assert single.is_compatible(a, b, FORWARD, old, new)
+        separate += len(single)
+    assert 0 < results < separate / 10
+    for a, b in pairs:
+        assert checker.is_compatible(a, b, FORWARD, old, new)
+    assert len(checker) == results
+
+
+def test_pattern_properties():
+    prefixed = {
+        "type": "object",
+        "patternProperties": {"^x": {}},
+        "additionalProperties": False,
+    }
+    closed = {"type": "object", "additionalProperties": False}
+    # {"xa": 1} is valid against the old schema only
+    assert not _compatible(prefixed, closed)
+    assert _compatible(closed, prefixed)
+    assert not _compatible(
+        prefixed, {"patternProperties": {"^x-": {"type": "integer"}}}
+    )
+    typed = {
+        "type": "object",
+        "patternProperties": {"^x": {"type": "integer"}},
+        "additionalProperties": False,
+    }
+    assert _compatible(typed, prefixed)
+    assert not _compatible(prefixed, typed)
+    assert _compatible(typed, {"patternProperties": {"^x": {"type": "number"}}})
@@ -0,0 +1,86 @@
+import pytest
+from pydantic import AnyUrl
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import AsyncAPI, v2, v3
+from pydantic_asyncapi.base import Reference, Schema
+from pydantic_asyncapi.bindings.amqp import ExchangeBinding, QueueBinding
+from pydantic_asyncapi.construct import construct
+from tests.test_asyncapi import yaml_data
+
+
+def assert_constructs(data):
+    validated = AsyncAPI.model_validate(data).root
+    dumped = validated.model_dump(by_alias=True, exclude_unset=True)
+    constructed = construct(dumped)
+    assert type(constructed) is type(validated)
+    assert constructed == validated
+    assert constructed.model_dump_json() == validated.model_dump_json()
+    assert constructed.model_dump(by_alias=True, exclude_unset=True) == dumped
+    return constructed
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_construct(filename):
+    assert_constructs(yaml_data(filename))
+
+
+@pytest.mark.parametrize("version", ["2.6.0", "3.0.0"])
+def test_construct_generated(version):
+    assert_constructs(generate(version, channels=5, messages=3, depth=3))
+
+
+def test_unions_and_aliases():
+    data = yaml_data("v2/simple.yaml")
+    data["servers"] = {
+        "production": {"url": "amqp://broker", "protocol": "amqp", "variables": {}},
+    }
+    data["channels"]["user/signedup"]["bindings"] = {
+        "amqp": {
+            "is": "queue",
+            "queue": {
+                "name": "q",
+                "durable": True,
+                "exclusive": False,
+                "autoDelete": False,
+            },
+        },
+    }
+    data["channels"]["user/deleted"] = {
+        "bindings": {"amqp": {"is": "exchange", "exchange": {"type": "topic"}}},
+        "publish": {
+            "message": {
+                "oneOf": [
+                    {"$ref": "#/components/messages/UserSignedUp"},
+                    {"payload": {"$ref": "#/components/schemas/User"}},
+                ],
+            },
+        },
+    }
+    data["components"]["schemas"] = {
+        "User": {"if": {"required": ["a"]}, "not": {"type": "null"}, "$id": "u"},
+    }
+    document = assert_constructs(data)
+    assert isinstance(document.servers["production"].url, AnyUrl)
+    channels = document.channels
+    assert isinstance(channels["user/signedup"].bindings.amqp, QueueBinding)
+    assert isinstance(channels["user/deleted"].bindings.amqp, ExchangeBinding)
+    one_of = channels["user/deleted"].publish.message
+    assert isinstance(one_of, v2.OneOf)
+    assert isinstance(one_of.oneOf[0], Reference)
+    user = document.components.schemas["User"]
+    assert user.field_id == "u"
+    assert isinstance(user.if_, Schema)
+    assert user.not_.type == "null"
+
+
+def test_construct_model():
+    reference = construct({"$ref": "#/a"}, Reference)
+    assert reference == Reference(ref="#/a")
+    message = construct({"payload": {"$ref": "#/a"}, "x-extra": 1}, v3.Message)
+    assert message.model_extra == {"x-extra": 1}
+    with pytest.raises(ValueError, match="Unsupported"):
+        construct({"asyncapi": "1.0.0"})
@@ -0,0 +1,102 @@
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.correlation import compile_location, correlation_extractor
+from tests.test_asyncapi import yaml_data
+
+
+def test_header():
+    extract = compile_location("$message.header#/correlationId")
+    assert extract.source == "header"
+    assert extract.path == ("correlationId",)
+    assert extract({"correlationId": "abc"}, {}) == "abc"
+    assert extract([("other", b"1"), ("correlationId", b"2")], {}) == b"2"
+    assert extract({}, {"correlationId": "abc"}) is None
+    assert extract(None, {}, "default") == "default"
+
+
+def test_payload():
+    extract = compile_location("$message.payload#/meta/ids/1/a~1b~0c")
+    assert extract.path == ("meta", "ids", "1", "a/b~c")
+    assert extract(None, {"meta": {"ids": [0, {"a/b~c": 5}]}}) == 5
+    assert extract(None, {"meta": {"ids": {"1": {"a/b~c": 6}}}}) == 6
+    assert extract(None, {"meta": {"ids": [0]}}) is None
+    assert extract(None, {"meta": {"ids": "01"}}) is None
+    assert extract(None, None) is None
+
+
+def test_nested_header_and_whole_source():
+    extract = compile_location("$message.header#/trace/id")
+    assert extract({"trace": {"id": 1}}, None) == 1
+    assert extract({"trace": 1}, None) is None
+    headers = {"a": 1}
+    assert compile_location("$message.header#")(headers, None) is headers
+    assert compile_location("$message.payload#")(None, [1]) == [1]
+
+
+def test_many():
+    messages = [({"id": i}, {"meta": {"id": -i}}) for i in range(3)] + [({}, {})]
+    assert compile_location("$message.header#/id").many(messages) == [0, 1, 2, None]
+    assert compile_location("$message.payload#/meta/id").many(messages, 9) == [
+        0,
+        -1,
+        -2,
+        9,
+    ]
+
+
+def test_compiled_once():
+    location = "$message.payload#/id"
+    assert compile_location(location) is compile_location(location)
+    assert repr(compile_location(location)) == f"Extractor({location!r})"
+
+
+@pytest.mark.parametrize(
+    "location",
+    ["$message.body#/id", "$message.header/id", "$message.header#/a~2", "header#/id"],
+)
+def test_invalid_location(location):
+    with pytest.raises(ValueError, match="Invalid correlation ID location"):
+        compile_location(location)
+
+
+@pytest.mark.parametrize(
+    ("model", "filename"),
+    [(v2.AsyncAPI, "v2/simple.yaml"), (v3.AsyncAPI, "v3/simple.yaml")],
+)
+def test_correlation_extractor(model, filename):
+    data = yaml_data(filename)
+    data.setdefault("components", {})["correlationIds"] = {
+        "default": {"location": "$message.header#/correlationId"},
+    }
+    data["components"].setdefault("messages", {})["Inline"] = {
+        "payload": {"type": "object"},
+        "correlationId": {"location": "$message.payload#/id"},
+    }
+    data["components"]["messages"]["Referenced"] = {
+        "payload": {"type": "object"},
+        "correlationId": {"$ref": "#/components/correlationIds/default"},
+    }
+    document = model.model_validate(data)
+    messages = document.components.messages
+    extract = correlation_extractor(messages["Inline"])
+    assert extract(None, {"id": 1}) == 1
+    extract = correlation_extractor(messages["Referenced"], document)
+    assert extract.location == "$message.header#/correlationId"
+    with pytest.raises(ValueError, match="requires a document"):
+        correlation_extractor(messages["Referenced"])
+    assert correlation_extractor(model.model_validate(yaml_data(filename))) is None
+
+
+def test_correlation_extractor_of_channel_message():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["messages"]["UserSignedUp"]["correlationId"] = {
+        "location": "$message.header#/correlationId",
+    }
+    document = v3.AsyncAPI.model_validate(data)
+    reference = document.channels["userSignedup"].messages["UserSignedUp"]
+    assert isinstance(reference, v3.Reference)
+    extract = correlation_extractor(reference, document)
+    assert extract({"correlationId": "abc"}, {}) == "abc"
+    with pytest.raises(ValueError, match="requires a document"):
+        correlation_extractor(reference)
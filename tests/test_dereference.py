@@ -0,0 +1,146 @@
+import pytest
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.dereference import (
+    Cycle,
+    CycleDict,
+    cycle_type,
+    dereference,
+    expanded_size,
+    materialize,
+)
+from pydantic_asyncapi.limits import LimitExceededError
+from tests.test_asyncapi import yaml_data
+
+
+def _count(data):
+    """Number of nodes of JSON data."""
+    count, stack = 0, [data]
+    while stack:
+        value = stack.pop()
+        count += 1
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return count
+
+
+def _recursive():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = {
+        "Node": {
+            "type": "object",
+            "properties": {
+                "next": {"$ref": "#/components/schemas/Node"},
+                "value": {"type": "string"},
+            },
+        },
+    }
+    message = data["components"]["messages"]["UserSignedUp"]
+    message["payload"] = {"$ref": "#/components/schemas/Node"}
+    return v3.AsyncAPI.model_validate(data)
+
+
+def test_targets_are_shared():
+    document = v3.AsyncAPI.model_validate(
+        generate("3.0.0", channels=4, messages=3, depth=1)
+    )
+    view = dereference(document)
+    messages = view.components.messages
+    assert view.channels["channel0"].messages["Message0"] is messages["Message0"]
+    assert view.channels["channel3"].messages["Message0"] is messages["Message0"]
+    operation = view.operations["operation1"]
+    assert operation.channel is view.channels["channel1"]
+    assert operation.messages[0] is messages["Message1"]
+    assert messages["Message2"].payload is view.components.schemas["Schema2"]
+    schema = view.components.schemas["Schema2"]
+    assert schema.properties["ref1"] is view.components.schemas["Schema0"]
+    # the document is left as it is, nodes without references are shared
+    assert document.operations["operation1"].channel.ref == "#/channels/channel1"
+    assert view.info is document.info
+    assert view.model_fields_set == document.model_fields_set
+
+
+def test_cycles_are_kept():
+    document = _recursive()
+    view = dereference(document)
+    node = view.components.schemas["Node"]
+    message = view.channels["userSignedup"].messages["UserSignedUp"]
+    assert message.payload is node
+    cycle = node.properties["next"]
+    assert isinstance(cycle, Cycle)
+    assert isinstance(cycle, Schema)
+    assert type(cycle) is cycle_type(Schema)
+    assert cycle.field_ref == "#/components/schemas/Node"
+    assert materialize(node) == {
+        "type": "object",
+        "properties": {
+            "next": {"$ref": "#/components/schemas/Node"},
+            "value": {"type": "string"},
+        },
+    }
+
+
+def test_raw_and_external_references():
+    data = yaml_data("v2/simple.yaml")
+    message = data["components"]["messages"]["UserSignedUp"]
+    message["payload"] = {"properties": {"self": {"$ref": "#/components/messages"}}}
+    message["x-remote"] = {"$ref": "other.yaml#/Remote"}
+    view = dereference(v2.AsyncAPI.model_validate(data))
+    message = view.components.messages["UserSignedUp"]
+    assert isinstance(message.payload["properties"]["self"], CycleDict)
+    assert message.model_extra == {"x-remote": {"$ref": "other.yaml#/Remote"}}
+
+
+def test_materialize():
+    document = v3.AsyncAPI.model_validate(yaml_data("v3/backend.yaml"))
+    dumped = document.model_dump(mode="json", by_alias=True, exclude_unset=True)
+    assert materialize(document) == dumped
+
+    view = dereference(_recursive())
+    data = materialize(view)
+    payload = data["channels"]["userSignedup"]["messages"]["UserSignedUp"]["payload"]
+    assert payload == data["components"]["schemas"]["Node"]
+    channel = data["operations"]["sendUserSignedup"]["channel"]
+    assert channel == data["channels"]["userSignedup"]
+
+
+def test_expanded_size():
+    document = v3.AsyncAPI.model_validate(
+        generate("3.0.0", channels=20, messages=30, depth=1, refs=2)
+    )
+    view = dereference(document)
+    # every schema expands the two previous ones
+    size = expanded_size(view)
+    assert size > 10**5 * expanded_size(document)
+    with pytest.raises(LimitExceededError, match="max_expanded_nodes"):
+        materialize(view, max_nodes=100_000)
+    small = dereference(_recursive())
+    size = expanded_size(small)
+    assert size == _count(materialize(small))
+    assert materialize(small, max_nodes=size) == materialize(small)
+    with pytest.raises(LimitExceededError):
+        materialize(small, max_nodes=size - 1)
+
+
+def test_deeply_nested():
+    schema = {"$ref": "#/components/schemas/Leaf"}
+    for _ in range(200):
+        schema = {"type": "object", "properties": {"child": schema}}
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = {"Deep": schema, "Leaf": {"type": "string"}}
+    document = v3.AsyncAPI.model_validate(data)
+    view = dereference(document)
+    node = view.components.schemas["Deep"]
+    for _ in range(200):
+        node = node.properties["child"]
+    assert node is view.components.schemas["Leaf"]
+    data = materialize(view)
+    assert expanded_size(view) == _count(data)
+    node = data["components"]["schemas"]["Deep"]
+    for _ in range(200):
+        node = node["properties"]["child"]
+    assert node == {"type": "string"}
@@ -0,0 +1,106 @@
+import gc
+from copy import deepcopy
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.diff import ADDED, CHANGED, REMOVED, MerkleTree, _trees, diff
+from tests.test_asyncapi import yaml_data
+
+
+def _documents(change):
+    data = generate("3.0.0", channels=10, messages=5, depth=2)
+    changed = deepcopy(data)
+    change(changed)
+    return v3.AsyncAPI.model_validate(data), v3.AsyncAPI.model_validate(changed)
+
+
+def test_identical():
+    old, new = _documents(lambda _: None)
+    assert old is not new
+    assert diff(old, new) == []
+    tree = MerkleTree.for_document(old)
+    assert tree is MerkleTree.for_document(old)
+    assert tree.hash(old) == MerkleTree.for_document(new).hash(new)
+    assert diff(old, old) == []
+
+
+def test_changes():
+    def change(data):
+        data["channels"]["channel5"]["address"] = "moved"
+        del data["channels"]["channel7"]
+        data["channels"]["added"] = {"address": "added"}
+        data["operations"]["operation2"]["messages"].append(
+            {"$ref": "#/channels/channel2/messages/Message3"}
+        )
+        field = data["components"]["schemas"]["Schema3"]["properties"]["field0"]
+        field["type"] = "string"
+        data["channels"]["channel1"]["messages"]["Message1"] = {
+            "payload": {"type": "string"}
+        }
+
+    old, new = _documents(change)
+    changes = {(c.kind, c.pointer) for c in diff(old, new)}
+    assert changes == {
+        (CHANGED, "#/channels/channel5/address"),
+        (REMOVED, "#/channels/channel7"),
+        (ADDED, "#/channels/added"),
+        (ADDED, "#/operations/operation2/messages/1"),
+        (CHANGED, "#/components/schemas/Schema3/properties/field0/type"),
+        # a reference replaced by a message
+        (CHANGED, "#/channels/channel1/messages/Message1"),
+    }
+    change = next(c for c in diff(old, new) if c.kind == REMOVED)
+    assert change.old is old.channels["channel7"]
+    assert change.new is None
+
+
+def test_key_order_and_escaping():
+    data = yaml_data("v2/simple.yaml")
+    reordered = deepcopy(data)
+    schema = reordered["components"]["messages"]["UserSignedUp"]["payload"]
+    schema["properties"] = dict(reversed(schema["properties"].items()))
+    old = v2.AsyncAPI.model_validate(data)
+    assert diff(old, v2.AsyncAPI.model_validate(reordered)) == []
+
+    reordered["channels"]["user/signedup"]["description"] = "signups"
+    changes = diff(old, v2.AsyncAPI.model_validate(reordered))
+    assert [(c.kind, c.pointer) for c in changes] == [
+        (ADDED, "#/channels/user~1signedup/description"),
+    ]
+
+
+def test_values_of_different_types():
+    data = yaml_data("v3/simple.yaml")
+    changed = deepcopy(data)
+    changed["info"]["x-flag"] = 1
+    data["info"]["x-flag"] = True
+    old, new = v3.AsyncAPI.model_validate(data), v3.AsyncAPI.model_validate(changed)
+    assert [(c.kind, c.pointer, c.old, c.new) for c in diff(old, new)] == [
+        (CHANGED, "#/info/x-flag", True, 1),
+    ]
+
+
+def _nested(depth, leaf):
+    schema = {"type": leaf}
+    for _ in range(depth):
+        schema = {"type": "object", "properties": {"child": schema}}
+    data = yaml_data("v3/simple.yaml")
+    data["components"] = {"schemas": {"Deep": schema}}
+    return v3.AsyncAPI.model_validate(data)
+
+
+def test_deeply_nested():
+    old, new = _nested(150, "string"), _nested(150, "integer")
+    pointer = "#/components/schemas/Deep" + "/properties/child" * 150 + "/type"
+    assert [(c.kind, c.pointer) for c in diff(old, new)] == [(CHANGED, pointer)]
+
+
+def test_trees_are_released():
+    old, new = _nested(1, "string"), _nested(1, "integer")
+    diff(old, new)
+    assert old in _trees
+    assert new in _trees
+    count = len(_trees)
+    del old, new
+    gc.collect()
+    assert len(_trees) == count - 2
@@ -0,0 +1,49 @@
+from pydantic_asyncapi import v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.interning import interning
+from tests.test_asyncapi import yaml_data
+
+UUID = {"type": "string", "format": "uuid"}
+
+
+def test_identical_subtrees_are_shared():
+    data = {"properties": {"a": UUID, "b": dict(UUID), "c": {"type": "string"}}}
+    with interning() as pool:
+        schema = Schema.model_validate(data)
+    properties = schema.properties
+    assert properties["a"] is properties["b"]
+    assert properties["a"] is not properties["c"]
+    assert len(pool) == 3
+    assert schema.model_dump(by_alias=True, exclude_unset=True) == data
+
+
+def test_disabled_by_default():
+    schema = Schema.model_validate({"properties": {"a": UUID, "b": UUID}})
+    assert schema.properties["a"] is not schema.properties["b"]
+
+
+def test_distinct_values_are_kept_apart():
+    with interning():
+        schemas = [
+            Schema.model_validate(data)
+            for data in (
+                {"const": 1},
+                {"const": True},
+                {"const": 1.5},
+                {},
+                {"readOnly": False},
+            )
+        ]
+    assert len({id(schema) for schema in schemas}) == len(schemas)
+
+
+def test_shared_pool():
+    data = yaml_data("v3/simple.yaml")
+    pool: dict = {}
+    with interning(pool):
+        first = v3.AsyncAPI.model_validate(data)
+    with interning(pool):
+        second = v3.AsyncAPI.model_validate(data)
+    payload = first.components.messages["UserSignedUp"].payload
+    assert payload is second.components.messages["UserSignedUp"].payload
+    assert first == second
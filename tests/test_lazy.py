@@ -0,0 +1,69 @@
+import pytest
+from pydantic import ValidationError
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.lazy import LazyMapping, LazyModel, lazy_validate
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_materialize(filename):
+    cls = v2.AsyncAPI if filename.startswith("v2") else v3.AsyncAPI
+    data = yaml_data(filename)
+    lazy = lazy_validate(data)
+    assert isinstance(lazy, LazyModel)
+    model = lazy.materialize()
+    assert model == cls.model_validate(data)
+    assert model.model_dump(by_alias=True, exclude_unset=True) == data
+
+
+def test_entries_are_validated_on_access():
+    data = yaml_data("v3/simple.yaml")
+    data["channels"]["broken"] = {"address": 1}
+    lazy = lazy_validate(data)
+    assert isinstance(lazy.info, v3.Info)
+    assert isinstance(lazy.channels, LazyMapping)
+    assert set(lazy.channels) == {"userSignedup", "broken"}
+    assert not lazy.channels.is_validated("userSignedup")
+    assert len(lazy.channels) == 2
+    assert repr(lazy.channels) == "LazyMapping(0/2 validated)"
+
+    channel = lazy.channels["userSignedup"]
+    assert isinstance(channel, v3.Channel)
+    assert lazy.channels.is_validated("userSignedup")
+    assert lazy.channels["userSignedup"] is channel
+
+    messages = lazy.components.messages
+    assert isinstance(messages["UserSignedUp"], v3.Message)
+
+    with pytest.raises(ValidationError) as exc_info:
+        lazy.channels["broken"]
+    loc = exc_info.value.errors()[0]["loc"]
+    assert loc[:2] == ("channels", "broken")
+    assert loc[-1] == "address"
+
+
+def test_missing_lazy_fields():
+    lazy = lazy_validate({"asyncapi": "3.0.0", "info": {"title": "t", "version": "1"}})
+    assert lazy.channels is None
+    assert lazy.components is None
+    model = lazy.materialize()
+    assert model.model_fields_set == {"asyncapi", "info"}
+
+
+def test_shell_errors():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["messageBindings"] = {"amqp": 1}
+    with pytest.raises(ValidationError) as exc_info:
+        lazy_validate(data)
+    assert exc_info.value.errors()[0]["loc"][:3] == (
+        "components",
+        "messageBindings",
+        "amqp",
+    )
+
+    with pytest.raises(ValidationError):
+        lazy_validate({"asyncapi": "1.0.0", "info": {"title": "t", "version": "1"}})
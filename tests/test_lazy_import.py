@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+from typing import Annotated, Any
+
+import pytest
+from pydantic import TypeAdapter
+
+import pydantic_asyncapi
+from pydantic_asyncapi.base import Reference, TypeOrRef
+from pydantic_asyncapi.bindings.kafka import KafkaServerBinding
+from pydantic_asyncapi.bindings.lazy import LazyBinding
+from tests.test_asyncapi import BASE_DIR
+
+SCRIPT = """
+import json, sys
+import yaml
+from pydantic_asyncapi.v3 import AsyncAPI
+
+def loaded():
+    return sorted(m.rsplit(".", 1)[-1] for m in sys.modules if ".bindings." in m)
+
+before = loaded()
+with open(sys.argv[1]) as f:
+    data = yaml.safe_load(f)
+model = AsyncAPI.model_validate(data)
+print(json.dumps({
+    "before": before,
+    "after": loaded(),
+    "v2": "pydantic_asyncapi.v2" in sys.modules,
+    "round_trip": model.model_dump(by_alias=True, exclude_unset=True) == data,
+}))
+"""
+
+
+def test_lazy_mode():
+    env = {**os.environ, "PYDANTIC_ASYNCAPI_LAZY": "1"}
+    fixture = str(BASE_DIR / "fixtures" / "v3" / "backend.yaml")
+    output = subprocess.check_output(  # noqa: S603
+        [sys.executable, "-c", SCRIPT, fixture],
+        env=env,
+        cwd=BASE_DIR.parent,
+    )
+    result = json.loads(output)
+    assert result == {
+        "before": ["lazy"],
+        "after": ["lazy", "mqtt"],
+        "v2": False,
+        "round_trip": True,
+    }
+
+
+ATTRIBUTES = """
+import sys
+import pydantic_asyncapi
+
+assert ("pydantic_asyncapi.v3" in sys.modules) is (sys.argv[1] == "eager")
+assert pydantic_asyncapi.v3.AsyncAPI.__name__ == "AsyncAPI"
+assert pydantic_asyncapi.v2.AsyncAPI is not pydantic_asyncapi.v3.AsyncAPI
+assert pydantic_asyncapi.AsyncAPI.__name__.startswith("RootModel")
+"""
+
+
+@pytest.mark.parametrize(("mode", "lazy"), [("eager", ""), ("lazy", "1")])
+def test_package_attributes(mode, lazy):
+    env = {**os.environ, "PYDANTIC_ASYNCAPI_LAZY": lazy}
+    subprocess.check_call(  # noqa: S603
+        [sys.executable, "-c", ATTRIBUTES, mode],
+        env=env,
+        cwd=BASE_DIR.parent,
+    )
+
+
+def test_lazy_binding():
+    lazy = Annotated[Any, LazyBinding("kafka", "KafkaServerBinding")]
+    adapter = TypeAdapter(TypeOrRef[lazy])
+    binding = adapter.validate_python({"schemaRegistryUrl": "http://registry"})
+    assert isinstance(binding, KafkaServerBinding)
+    assert adapter.dump_python(binding, exclude_unset=True) == {
+        "schemaRegistryUrl": "http://registry",
+    }
+    reference = adapter.validate_python({"$ref": "#/components/serverBindings/kafka"})
+    assert isinstance(reference, Reference)
+    assert "schemaRegistryUrl" in json.dumps(adapter.json_schema())
+
+
+def test_lazy_module_attributes():
+    from pydantic_asyncapi.bindings import lazy
+
+    assert lazy.AMQPChannelBinding.__metadata__ == (
+        LazyBinding("amqp", "AMQPChannelBinding"),
+    )
+    with pytest.raises(AttributeError):
+        lazy.UnknownBinding  # noqa: B018
+    with pytest.raises(AttributeError):
+        pydantic_asyncapi.Unknown  # noqa: B018
+    assert pydantic_asyncapi.__version__
@@ -0,0 +1,131 @@
+import pytest
+import yaml
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import AsyncAPI, limits
+from pydantic_asyncapi.limits import (
+    LimitExceededError,
+    Limits,
+    check_limits,
+    validate,
+)
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_within_limits(filename):
+    data = yaml_data(filename)
+    assert validate(data) == AsyncAPI.model_validate(data).root
+
+
+def test_generated_within_limits():
+    check_limits(generate("3.0.0", channels=50, messages=10, depth=3))
+
+
+def deep_schema(depth):
+    schema = node = {"type": "object"}
+    for _ in range(depth):
+        node["not"] = {"type": "object"}
+        node = node["not"]
+    return schema
+
+
+def test_max_depth():
+    data = yaml_data("v3/simple.yaml")
+    data["components"].setdefault("schemas", {})["Deep"] = deep_schema(100)
+    with pytest.raises(LimitExceededError) as e:
+        validate(data)
+    assert e.value.limit == "max_depth"
+    assert e.value.maximum == 64
+    assert e.value.pointer.startswith("#/components/schemas/Deep/not/not/")
+    check_limits(data, Limits(max_depth=None))
+
+
+def test_max_nodes():
+    data = yaml_data("v3/simple.yaml")
+    with pytest.raises(LimitExceededError, match="max_nodes of 10 exceeded"):
+        check_limits(data, Limits(max_nodes=10))
+
+
+def test_yaml_aliases_count_every_time():
+    source = "a: &a [x, x, x, x, x, x, x, x, x, x]\n"
+    for i in range(1, 9):
+        previous, name = chr(ord("a") + i - 1), chr(ord("a") + i)
+        source += f"{name}: &{name} [{', '.join([f'*{previous}'] * 10)}]\n"
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(yaml.safe_load(source))
+    assert e.value.limit == "max_nodes"
+
+
+def test_max_string_length():
+    data = yaml_data("v3/simple.yaml")
+    data["info"]["description"] = "x" * 101
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(data, Limits(max_string_length=100))
+    assert e.value.pointer == "#/info/description"
+
+    data = yaml_data("v3/simple.yaml")
+    data["channels"]["x" * 101] = {}
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(data, Limits(max_string_length=100))
+    assert e.value.pointer == f"#/channels/{'x' * 101}"
+
+
+def test_max_collection_size():
+    data = yaml_data("v3/simple.yaml")
+    data["info"]["tags"] = [{"name": str(i)} for i in range(11)]
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(data, Limits(max_collection_size=10))
+    assert e.value.limit == "max_collection_size"
+    assert e.value.pointer == "#/info/tags"
+
+
+def test_max_expanded_nodes():
+    schemas = {"Level0": {"type": "string"}}
+    for i in range(1, 30):
+        ref = {"$ref": f"#/components/schemas/Level{i - 1}"}
+        schemas[f"Level{i}"] = {"allOf": [ref] * 10}
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = schemas
+    check_limits(data)
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(data, Limits(max_expanded_nodes=100_000))
+    assert e.value.limit == "max_expanded_nodes"
+    assert e.value.pointer == "#/components/schemas/Level5"
+
+
+def test_expansion_of_cycles_and_missing_targets():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = {
+        "A": {"properties": {"b": {"$ref": "#/components/schemas/B"}}},
+        "B": {"items": {"$ref": "#/components/schemas/A"}},
+        "C": {"$ref": "#/components/schemas/Missing"},
+    }
+    check_limits(data, Limits(max_expanded_nodes=1000))
+
+
+def test_expansion_of_ref_spellings(monkeypatch):
+    data = yaml_data("v3/simple.yaml")
+    big = {"properties": {f"p{i}": {"type": "string"} for i in range(100)}}
+    spellings = ["", "/", "//", "%2F"]
+    data["components"]["schemas"] = {
+        "Big": big,
+        **{
+            f"Ref{i}": {"$ref": f"#/components/schemas/Big{spellings[i % 4]}"}
+            for i in range(100)
+        },
+    }
+    walked = []
+    local = limits._local  # noqa: SLF001
+    monkeypatch.setattr(
+        limits, "_local", lambda node: walked.append(node) or local(node)
+    )
+    check_limits(data, Limits(max_expanded_nodes=100_000))
+    # the target is walked once for all the spellings of its pointer
+    assert sum(node is big for node in walked) == 1
+    with pytest.raises(LimitExceededError) as e:
+        check_limits(data, Limits(max_expanded_nodes=10_000))
+    assert e.value.pointer == "#"
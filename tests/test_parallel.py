@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import AsyncAPI
+from pydantic_asyncapi.parallel import parallel_validate, validate_entries
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.fixture(scope="module")
+def threads():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+@pytest.fixture(scope="module")
+def processes():
+    with ProcessPoolExecutor(2) as executor:
+        yield executor
+
+
+def assert_validates(data, executor, chunk_size=2):
+    expected = AsyncAPI.model_validate(data).root
+    document = parallel_validate(data, executor, chunk_size=chunk_size)
+    assert type(document) is type(expected)
+    assert document == expected
+    assert document.model_fields_set == expected.model_fields_set
+    assert document.model_dump_json(
+        by_alias=True, exclude_unset=True
+    ) == expected.model_dump_json(by_alias=True, exclude_unset=True)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_parallel_validate(filename, threads):
+    assert_validates(yaml_data(filename), threads)
+
+
+@pytest.mark.parametrize("version", ["2.6.0", "3.0.0"])
+def test_parallel_validate_processes(version, processes):
+    data = generate(version, channels=20, messages=10, depth=3)
+    assert_validates(data, processes, chunk_size=3)
+
+
+def test_default_executor():
+    assert_validates(yaml_data("v3/backend.yaml"), None)
+
+
+def test_error_location(threads):
+    data = generate("3.0.0", channels=3, messages=2, depth=2)
+    data["components"]["schemas"]["Schema1"] = {"type": 1}
+    with pytest.raises(ValidationError) as e:
+        parallel_validate(data, threads, chunk_size=1)
+    assert e.value.errors()[0]["loc"][:3] == ("components", "schemas", "Schema1")
+
+
+def test_invalid_shell(threads):
+    data = yaml_data("v3/simple.yaml")
+    del data["info"]
+    with pytest.raises(ValidationError):
+        parallel_validate(data, threads)
+
+
+def test_unsupported_version(threads):
+    data = yaml_data("v3/simple.yaml")
+    data["asyncapi"] = "4.0.0"
+    with pytest.raises(ValidationError):
+        parallel_validate(data, threads)
+    with pytest.raises(ValueError, match="Unsupported"):
+        validate_entries("4.0.0", ("channels",), ("channels",), {})
+
+
+def test_newer_minor_version(threads):
+    # rejected, as by AsyncAPI.model_validate
+    data = yaml_data("v3/simple.yaml")
+    data["asyncapi"] = "3.2.0"
+    with pytest.raises(ValidationError):
+        AsyncAPI.model_validate(data)
+    with pytest.raises(ValidationError):
+        parallel_validate(data, threads)
+    with pytest.raises(ValueError, match="Unsupported"):
+        validate_entries("3.2.0", ("channels",), ("channels",), {})
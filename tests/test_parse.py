@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from pydantic_asyncapi import AsyncAPI, v2, v3
+from pydantic_asyncapi.parse import exact_model, model_for_version, parse, sniff_version
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_parse(filename, tmp_path):
+    data = yaml_data(filename)
+    expected = AsyncAPI.model_validate(data).root
+    text = json.dumps(data)
+    path = tmp_path / "asyncapi.json"
+    path.write_text(text)
+    for source in (text, text.encode(), path):
+        parsed = parse(source)
+        assert type(parsed) is type(expected)
+        assert parsed == expected
+
+
+def test_sniff_version():
+    assert sniff_version(b'{"info": {}, "asyncapi" : "3.0.0"}') == "3.0.0"
+    assert sniff_version('{"asyncapi":"2.6.0"}') == "2.6.0"
+    assert sniff_version(b'{"info": {}}') is None
+
+
+def test_model_for_version():
+    assert model_for_version("2.6.0") is v2.AsyncAPI
+    assert model_for_version("3.1.0") is v3.AsyncAPI
+    assert model_for_version("4.0.0") is None
+    assert model_for_version("latest") is None
+    assert model_for_version("3.0.0-x") is None
+    newer = model_for_version("3.2.0")
+    assert issubclass(newer, v3.AsyncAPI)
+    # a single model for all the newer versions of a major version
+    assert model_for_version("3.2.0") is newer
+    assert model_for_version("3.99.1") is newer
+    # the versions accepted by the root model
+    assert exact_model("3.1.0") is v3.AsyncAPI
+    assert exact_model("3.2.0") is None
+
+
+def test_parse_newer_minor_version():
+    data = yaml_data("v3/simple.yaml")
+    data["asyncapi"] = "3.2.0"
+    document = parse(json.dumps(data))
+    assert isinstance(document, v3.AsyncAPI)
+    assert document.asyncapi == "3.2.0"
+    assert document.model_dump(by_alias=True, exclude_unset=True) == data
+
+
+@pytest.mark.parametrize("version", ["4.0.0", None])
+def test_parse_unsupported_version(version):
+    data = yaml_data("v3/simple.yaml")
+    data["asyncapi"] = version
+    with pytest.raises(ValidationError):
+        parse(json.dumps(data))
+
+
+def test_parse_nested_version_key():
+    data = yaml_data("v3/simple.yaml")
+    data["info"]["x-origin"] = {"asyncapi": "2.6.0"}
+    data = {"info": data.pop("info"), **data}
+    text = json.dumps(data)
+    assert sniff_version(text) == "2.6.0"
+    document = parse(text)
+    assert document == AsyncAPI.model_validate_json(text).root
+    assert isinstance(document, v3.AsyncAPI)
+    data["asyncapi"] = "3.2.0"
+    assert parse(json.dumps(data)).asyncapi == "3.2.0"
+    with pytest.raises(ValidationError):
+        parse(text.replace('"asyncapi": "3.0.0"', '"asyncapi": "9.0.0"'))
@@ -0,0 +1,204 @@
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.payload import (
+    PayloadValidationError,
+    compile_schema,
+    message_validator,
+    payload_schema,
+)
+from pydantic_asyncapi.resolver import Resolver
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    ("schema", "valid", "invalid"),
+    [
+        ({"type": "integer"}, [1, 2.0], [True, 1.5, "1"]),
+        ({"type": ["string", "null"]}, ["a", None], [1, []]),
+        ({"enum": ["a", "b"]}, ["a"], ["c", 1]),
+        ({"const": 1}, [1, 1.0], [2, True]),
+        ({"const": {"a": 1}}, [{"a": 1.0}], [{"a": True}, {"a": 1, "b": 1}]),
+        ({"const": [0]}, [[0], [0.0]], [[False], 0]),
+        ({"enum": ["1", "true"]}, ["1"], [1, True, ["1"]]),
+        ({"minimum": 1, "exclusiveMaximum": 3}, [1, 2.5, "x"], [0, 3]),
+        ({"maximum": 1, "exclusiveMinimum": -1}, [1, 0], [2, -1]),
+        ({"multipleOf": 0.1}, [0.3, 2], [0.25, 1e-10]),
+        (
+            {"multipleOf": 1},
+            [3, 2.0, 10**400],
+            [1500000000.5, 10000000000.5, float("inf")],
+        ),
+        ({"multipleOf": 0.01}, [1e308, 10**400], [0.005]),
+        ({"multipleOf": 3}, [3 * 10**400], [10**400 + 1]),
+        ({"multipleOf": 1e-320}, [1, 2.5], []),
+        (
+            {"minLength": 1, "maxLength": 2, "pattern": "^a"},
+            ["a", "ab"],
+            ["", "b", "abc"],
+        ),
+        ({"items": {"type": "string"}, "minItems": 1}, [["a"]], [[], [1]]),
+        ({"items": [{"type": "string"}], "maxItems": 2}, [["a", 1]], [[1], [1, 2, 3]]),
+        (
+            {"items": [{"type": "string"}], "additionalItems": {"type": "integer"}},
+            [["a", 1, 2]],
+            [["a", "b"]],
+        ),
+        ({"uniqueItems": True, "contains": {"const": 1}}, [[1, 2]], [[1, 1], [2]]),
+        (
+            {"uniqueItems": True},
+            [[1, True], [[1], [True]], [{"a": 1}, {"b": 1}]],
+            [[1, 1.0], [{"a": 1, "b": [2]}, {"b": [2.0], "a": 1}]],
+        ),
+        (
+            {
+                "required": ["a"],
+                "properties": {"a": {"type": "string"}},
+                "additionalProperties": False,
+                "minProperties": 1,
+                "maxProperties": 1,
+            },
+            [{"a": "x"}],
+            [{}, {"a": 1}, {"a": "x", "b": 1}],
+        ),
+        (
+            {
+                "patternProperties": {"^x-": {"type": "integer"}},
+                "additionalProperties": {"type": "string"},
+                "propertyNames": {"maxLength": 3},
+            },
+            [{"x-a": 1, "b": "c"}],
+            [{"x-a": "1"}, {"b": 1}, {"long": "x"}],
+        ),
+        (
+            {"dependencies": {"a": ["b"], "c": {"required": ["d"]}}},
+            [{"a": 1, "b": 2}, {"c": 1, "d": 2}, {}],
+            [{"a": 1}, {"c": 1}],
+        ),
+        (
+            {"allOf": [{"type": "integer"}, {"minimum": 0}]},
+            [1],
+            [-1, "a"],
+        ),
+        ({"anyOf": [{"type": "integer"}, {"type": "string"}]}, [1, "a"], [None]),
+        ({"oneOf": [{"type": "integer"}, {"minimum": 0}]}, [-1, 0.5], [1]),
+        ({"not": {"type": "string"}}, [1], ["a"]),
+        (
+            {
+                "if": {"properties": {"kind": {"const": "a"}}},
+                "then": {"required": ["a"]},
+                "else": {"required": ["b"]},
+            },
+            [{"kind": "a", "a": 1}, {"kind": "x", "b": 1}],
+            [{"kind": "a", "b": 1}, {"kind": "x", "a": 1}],
+        ),
+    ],
+)
+def test_keywords(schema, valid, invalid):
+    validator = compile_schema(Schema.model_validate(schema))
+    for value in valid:
+        assert validator(value) is value
+        assert validator.error(value) is None
+    for value in invalid:
+        assert not validator.is_valid(value), value
+        with pytest.raises(PayloadValidationError):
+            validator(value)
+
+
+def test_error_path():
+    schema = Schema.model_validate(
+        {
+            "properties": {
+                "items": {"items": {"properties": {"a/b": {"type": "string"}}}}
+            }
+        },
+    )
+    error = compile_schema(schema).error({"items": [{}, {"a/b": 1}]})
+    assert error.path == ("items", 1, "a/b")
+    assert str(error) == "/items/1/a~1b: expected string"
+
+
+def test_references_and_recursion():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = {
+        "Node": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "integer"},
+                "children": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/Node"},
+                },
+            },
+        },
+    }
+    document = v3.AsyncAPI.model_validate(data)
+    schema = Schema.model_validate({"$ref": "#/components/schemas/Node"})
+    with pytest.raises(ValueError, match="resolver"):
+        compile_schema(schema)
+    validator = compile_schema(schema, Resolver(document))
+    assert validator.is_valid({"value": 1, "children": [{"value": 2, "children": []}]})
+    error = validator.error({"value": 1, "children": [{"children": [{"value": "x"}]}]})
+    assert error.path == ("children", 0, "children", 0, "value")
+
+
+def test_message_validator_v3():
+    document = v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml"))
+    message = document.components.messages["UserSignedUp"]
+    validator = message_validator(message, document)
+    assert message_validator(message) is validator
+    assert validator.validate_json(b'{"displayName": "x", "email": "a@b.c"}')
+    with pytest.raises(PayloadValidationError):
+        validator.validate_json(b'{"email": 1}')
+
+
+def test_message_validator_reference():
+    document = v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml"))
+    reference = document.channels["userSignedup"].messages["UserSignedUp"]
+    assert isinstance(reference, v3.Reference)
+    with pytest.raises(ValueError, match="requires its document"):
+        message_validator(reference)
+    validator = message_validator(reference, document)
+    assert validator is message_validator(document.components.messages["UserSignedUp"])
+    assert validator.is_valid({"displayName": "x", "email": "a@b.c"})
+    assert not validator.is_valid(42)
+    assert not validator.is_valid({"displayName": 1})
+    assert payload_schema(reference, Resolver(document)).type == "object"
+
+
+def test_message_validator_v2():
+    document = v2.AsyncAPI.model_validate(yaml_data("v2/simple.yaml"))
+    channel = document.channels["user/signedup"]
+    resolver = Resolver(document)
+    message = resolver.resolve(channel.subscribe.message)
+    validator = message_validator(message, document)
+    assert validator.is_valid({"displayName": "x"})
+    assert not validator.is_valid({"displayName": 1})
+
+
+def test_payload_schema_formats():
+    schema = {"type": "string"}
+    multi_format = v3.Message.model_validate(
+        {
+            "payload": {
+                "schemaFormat": "application/schema+json;version=draft-07",
+                "schema": schema,
+            },
+        },
+    )
+    assert payload_schema(multi_format).type == "string"
+    avro = v3.Message.model_validate(
+        {
+            "payload": {
+                "schemaFormat": "application/vnd.apache.avro;version=1.9.0",
+                "schema": schema,
+            },
+        },
+    )
+    with pytest.raises(ValueError, match="Unsupported"):
+        payload_schema(avro)
+    reference = v2.Message.model_validate({"payload": {"$ref": "#/x"}})
+    with pytest.raises(ValueError, match="resolver"):
+        payload_schema(reference)
+    assert payload_schema(v2.Message.model_validate({"payload": None})) == Schema()
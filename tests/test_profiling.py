@@ -0,0 +1,102 @@
+import gc
+import json
+import tracemalloc
+
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import AsyncAPI, v3
+from pydantic_asyncapi.base import validation_hook
+from pydantic_asyncapi.profiling import profile, profiling
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_profile(filename):
+    data = yaml_data(filename)
+    result = profile(data)
+    assert result.document == AsyncAPI.model_validate(data).root
+    assert result.pointers["#"].count == 1
+    assert result.models["AsyncAPI"].count == 1
+    assert result.models["Info"].count == 1
+    assert "#/info" in result.pointers
+    assert gc.isenabled()
+
+
+def test_pointers_and_stacks():
+    data = generate("3.0.0", channels=3, messages=2, depth=2)
+    result = profile(data)
+    assert "#/channels/channel0" in result.pointers
+    assert "#/components/schemas/Schema0" in result.pointers
+    assert result.models["Channel"].count == 3
+    # subtrees are timed within the document, and own times add up to its time
+    root = result.pointers["#"].time
+    tolerance = 1e-6
+    assert all(stats.time <= root + tolerance for stats in result.pointers.values())
+    assert result.top(1)[0][0] == "#"
+    own = sum(stats.time for stats in result.models.values())
+    assert abs(own - root) <= root * 0.01 + tolerance
+    assert ("AsyncAPI", "channels", "channel0 (Channel)") in result.stacks
+    lines = list(result.folded())
+    assert lines
+    for line in lines:
+        frames, weight = line.rsplit(" ", 1)
+        assert frames.startswith("AsyncAPI")
+        assert int(weight) >= 1
+
+
+def test_memory():
+    data = generate("2.6.0", channels=3, messages=2, depth=2)
+    result = profile(data, memory=True)
+    assert result.pointers["#"].allocated > 0
+    assert not tracemalloc.is_tracing()
+    assert list(result.folded("allocated"))
+    report = result.report(5, key="allocated")
+    assert report.splitlines()[0].split() == [
+        "count",
+        "time",
+        "(ms)",
+        "allocated",
+        "model",
+    ]
+    assert report.splitlines()[-5].endswith("  #")
+
+
+@pytest.mark.parametrize("version", ["4.0.0", "3.2.0"])
+def test_unsupported_version(version):
+    data = yaml_data("v3/simple.yaml")
+    data["asyncapi"] = version
+    with pytest.raises(ValidationError):
+        profile(data)
+
+
+def test_profiling_context():
+    data = generate("3.0.0", channels=3, messages=2, depth=2)
+    with profiling() as result:
+        document = v3.AsyncAPI.model_validate(data)
+        assert validation_hook.get() is not None
+    assert validation_hook.get() is None
+    assert gc.isenabled()
+    assert result.document is document
+    assert result.models["Channel"].count == 3
+    assert "#/channels/channel0" in result.pointers
+    with profiling() as parsed:
+        v3.AsyncAPI.model_validate_json(json.dumps(data))
+    assert parsed.models["Channel"].count == 3
+    assert ("AsyncAPI", "channels", "channel0 (Channel)") in parsed.stacks
+
+
+def test_deeply_nested():
+    schema = {"type": "string"}
+    for _ in range(100):
+        schema = {"type": "object", "properties": {"child": schema}}
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["schemas"] = {"Deep": schema}
+    result = profile(data)
+    deepest = "#/components/schemas/Deep" + "/properties/child" * 100
+    assert result.pointers[deepest].count == 1
+    assert result.models["Schema"].count >= 101
@@ -0,0 +1,67 @@
+from benchmarks.generator import generate
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.pruning import prune, reachable
+
+USED = [
+    "#/components/messages/Message0",
+    "#/components/messages/Message1",
+    "#/components/messages/Message2",
+    "#/components/schemas/Schema0",
+    "#/components/schemas/Schema1",
+    "#/components/schemas/Schema2",
+]
+
+
+def test_reachable_v3():
+    document = v3.AsyncAPI.model_validate(
+        generate("3.0.0", channels=2, messages=10, depth=2)
+    )
+    assert sorted(reachable(document)) == USED
+
+
+def test_prune_v2():
+    data = generate("2.6.0", channels=3, messages=10, depth=2)
+    data["components"]["messageTraits"] = {"unused": {"name": "unused"}}
+    document = v2.AsyncAPI.model_validate(data)
+    pruned = prune(document)
+    assert sorted(reachable(pruned)) == USED
+    assert pruned.components.schemas.keys() == {"Schema0", "Schema1", "Schema2"}
+    assert pruned.components.messageTraits is None
+    dumped = pruned.model_dump(by_alias=True, exclude_unset=True)
+    assert "messageTraits" not in dumped["components"]
+    # the original is unchanged, kept entries are shared
+    assert len(document.components.schemas) == 10
+    assert pruned.channels is document.channels
+    schemas = pruned.components.schemas
+    assert schemas["Schema2"] is document.components.schemas["Schema2"]
+
+
+def test_schema_and_payload_references():
+    data = generate("3.0.0", channels=1, messages=1, depth=1)
+    schemas = data["components"]["schemas"]
+    schemas["Schema0"]["properties"]["extra"] = {"$ref": "#/components/schemas/Inner"}
+    schemas["Inner"] = {"items": {"$ref": "#/components/schemas/Leaf/properties/a"}}
+    schemas["Leaf"] = {"properties": {"a": {"type": "string"}}}
+    schemas["Dead"] = {"$ref": "#/components/schemas/Leaf"}
+    data["components"]["messages"]["Raw"] = {"payload": {"$ref": "#/components/x"}}
+    document = v3.AsyncAPI.model_validate(data)
+    assert prune(document).components.schemas.keys() == {"Schema0", "Inner", "Leaf"}
+
+
+def test_whole_map_references():
+    data = generate("3.0.0", channels=1, messages=3, depth=1)
+    data["channels"]["channel0"]["x-all"] = {"$ref": "#/components/schemas"}
+    document = v3.AsyncAPI.model_validate(data)
+    pruned = prune(document)
+    assert len(pruned.components.schemas) == 3
+    assert pruned.components.messages.keys() == {"Message0", "Message1"}
+
+
+def test_nothing_to_prune():
+    document = v3.AsyncAPI.model_validate(
+        generate("3.0.0", channels=3, messages=3, depth=1)
+    )
+    assert prune(document) is document
+    document = document.model_copy(update={"components": None})
+    assert prune(document) is document
+    assert reachable(document) == set()
@@ -0,0 +1,123 @@
+from benchmarks.generator import generate
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.references import ReferenceIndex, ancestors, component_pointer
+
+
+def _index(version="3.0.0", **kwargs):
+    data = generate(version, **{"channels": 4, "messages": 10, "depth": 1, **kwargs})
+    model = v2.AsyncAPI if version.startswith("2.") else v3.AsyncAPI
+    document = model.model_validate(data)
+    return document, ReferenceIndex(document)
+
+
+def test_ancestors_and_component_pointer():
+    assert list(ancestors("#/components/schemas/A/properties")) == [
+        "#/components/schemas/A",
+        "#/components/schemas",
+        "#/components",
+    ]
+    assert list(ancestors("#")) == []
+    assert component_pointer("schemas", "a/b") == "#/components/schemas/a~1b"
+
+
+def test_referrers():
+    _, index = _index()
+    assert index.referrers(component_pointer("schemas", "Schema1")) == {
+        "#/components/messages/Message1/payload",
+        "#/components/schemas/Schema2/properties/ref0",
+        "#/components/schemas/Schema3/properties/ref1",
+    }
+    assert index.target("#/components/messages/Message1/payload") == (
+        "#/components/schemas/Schema1"
+    )
+    assert "#/operations/operation0/channel" in index
+    assert index.referrers("#/components/schemas/Unused") == set()
+
+
+def test_dependents_v3():
+    _, index = _index()
+    dependents = index.dependents("#/components/schemas/Schema8")
+    assert dependents == {
+        "#/components/messages/Message8/payload",
+        "#/components/messages/Message9/payload",
+        "#/components/schemas/Schema9/properties/ref0",
+    }
+    assert index.dependents("#/components/schemas/Schema8") is dependents
+    # operations use their channel's messages, which refer to the components
+    assert index.users("#/components/schemas/Schema3") == {
+        "#/channels/channel2",
+        "#/channels/channel3",
+        "#/operations/operation2",
+        "#/operations/operation3",
+    }
+    # through the reference to the whole channel
+    assert index.users("#/components/messages/Message4") == {
+        "#/channels/channel3",
+        "#/operations/operation3",
+    }
+
+
+def test_users_v2():
+    _, index = _index("2.6.0", channels=3)
+    assert index.users("#/components/schemas/Schema1") == {
+        "#/channels/service1~1{entityId}~1event1",
+        "#/channels/service2~1{entityId}~1event2",
+    }
+
+
+def test_within_and_containing_nodes():
+    data = generate("3.0.0", channels=1, messages=1, depth=1)
+    schemas = data["components"]["schemas"]
+    schemas["Inner"] = {"properties": {"a": {"type": "string"}}}
+    schemas["Outer"] = {"items": {"$ref": "#/components/schemas/Inner/properties/a"}}
+    schemas["All"] = {"items": {"$ref": "#/components/schemas"}}
+    schemas["Remote"] = {"$ref": "other.yaml#/Inner"}
+    index = ReferenceIndex(v3.AsyncAPI.model_validate(data))
+    assert index.referrers("#/components/schemas/Inner") == {
+        "#/components/schemas/Outer/items",
+    }
+    assert index.dependents("#/components/schemas/Inner") == {
+        "#/components/schemas/Outer/items",
+        "#/components/schemas/All/items",
+    }
+    assert "#/components/schemas/Remote" not in index
+
+
+def test_incremental_updates():
+    document, index = _index()
+    pointer = "#/components/schemas/Schema8"
+    assert index.users(pointer) == set()
+    size = len(index)
+
+    message = v3.Reference(ref=component_pointer("messages", "Message9"))
+    channel = document.channels["channel0"].model_copy(
+        update={"messages": {"Message9": message}}
+    )
+    index.replace("#/channels/channel0", channel)
+    users = {"#/channels/channel0", "#/operations/operation0"}
+    assert index.users(pointer) == users
+    assert len(index) == size - 1
+
+    index.remove("#/components/messages/Message9")
+    assert index.users(pointer) == set()
+    index.add(
+        "#/components/messages/Message9",
+        document.components.messages["Message9"],
+    )
+    assert index.users(pointer) == users
+
+
+def test_remove_subtree():
+    _, index = _index(messages=12)
+    size = len(index)
+    index.remove("#/components/messages/Message1")
+    assert "#/components/messages/Message1/payload" not in index
+    # siblings sharing the prefix are kept
+    assert "#/components/messages/Message10/payload" in index
+    assert len(index) == size - 1
+    index.remove("#/components/messages/Unknown")
+    assert len(index) == size - 1
+    index.remove("#/channels")
+    assert not any(site.startswith("#/channels/") for site in index._sites)  # noqa: SLF001
+    index.remove("#")
+    assert len(index) == 0
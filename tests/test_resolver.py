@@ -0,0 +1,105 @@
+import gc
+
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.base import Schema
+from pydantic_asyncapi.resolver import (
+    CircularReferenceError,
+    ResolutionError,
+    Resolver,
+    resolve,
+)
+from tests.test_asyncapi import yaml_data
+
+
+@pytest.fixture
+def document():
+    return v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml"))
+
+
+def test_resolve_channel_message(document):
+    resolver = Resolver(document)
+    ref = document.channels["userSignedup"].messages["UserSignedUp"]
+    message = resolver.resolve(ref)
+    assert isinstance(message, v3.Message)
+    assert message is document.components.messages["UserSignedUp"]
+    assert resolver.targets(ref) == (v3.Message,)
+
+
+def test_resolve_follows_chains(document):
+    resolver = Resolver(document)
+    operation = document.operations["sendUserSignedup"]
+    assert resolver.resolve(operation.channel) is document.channels["userSignedup"]
+    message = resolver.resolve(operation.messages[0], v3.Message)
+    assert message is document.components.messages["UserSignedUp"]
+
+
+def test_resolve_is_memoized(document):
+    resolver = Resolver.for_document(document)
+    assert Resolver.for_document(document) is resolver
+    ref = "#/components/messages/UserSignedUp/payload/properties/email"
+    first = resolve(document, ref, Schema)
+    assert first.format == "email"
+    assert resolver.resolve(ref, Schema) is first
+
+
+def test_resolver_does_not_keep_document_alive():
+    document = v3.AsyncAPI.model_validate(yaml_data("v3/simple.yaml"))
+    resolver = Resolver.for_document(document)
+    del document
+    gc.collect()
+    with pytest.raises(ResolutionError):
+        resolver.get("#")
+
+
+def test_resolve_raw_data_to_target_type():
+    document = v2.AsyncAPI.model_validate(yaml_data("v2/simple.yaml"))
+    resolver = Resolver(document)
+    payload = resolver.resolve("#/components/messages/UserSignedUp/payload", Schema)
+    assert isinstance(payload, Schema)
+    assert set(payload.properties) == {"displayName", "email"}
+    message = resolver.resolve(document.channels["user/signedup"].subscribe.message)
+    assert isinstance(message, v2.Message)
+
+
+def test_escaped_pointers():
+    document = v2.AsyncAPI.model_validate(yaml_data("v2/simple.yaml"))
+    resolver = Resolver(document)
+    assert "#/channels/user~1signedup/subscribe" in resolver
+    assert isinstance(resolver.get("#/channels/user~1signedup"), v2.ChannelItem)
+
+
+def test_circular_reference():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["messages"]["Loop"] = {"$ref": "#/components/messages/Other"}
+    data["components"]["messages"]["Other"] = {"$ref": "#/components/messages/Loop"}
+    document = v3.AsyncAPI.model_validate(data)
+    with pytest.raises(CircularReferenceError) as exc_info:
+        Resolver(document).resolve("#/components/messages/Loop")
+    assert exc_info.value.chain == [
+        "#/components/messages/Loop",
+        "#/components/messages/Other",
+        "#/components/messages/Loop",
+    ]
+
+
+@pytest.mark.parametrize(
+    "ref",
+    [
+        "#/components/messages/Missing",
+        "../common/messages.yaml#/commentLiked",
+        "#/info",
+    ],
+)
+def test_unresolvable(document, ref):
+    with pytest.raises(ResolutionError):
+        Resolver(document).resolve(ref, v3.Message)
+
+
+def test_deref(document):
+    resolver = Resolver(document)
+    channel = document.channels["userSignedup"]
+    assert resolver.deref(channel) is channel
+    with pytest.raises(TypeError):
+        resolver.resolve(channel)
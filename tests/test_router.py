@@ -0,0 +1,114 @@
+import pytest
+
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.router import Router, route
+from tests.test_asyncapi import yaml_data
+
+
+def document_v3(channels, servers=None):
+    data = yaml_data("v3/simple.yaml")
+    data["channels"] = channels
+    data["operations"] = {}
+    data["components"]["parameters"] = {"Kind": {"enum": ["paid", "sent"]}}
+    if servers is not None:
+        data["servers"] = servers
+    return v3.AsyncAPI.model_validate(data)
+
+
+@pytest.fixture
+def router():
+    return Router(
+        document_v3(
+            {
+                "signedUp": {
+                    "address": "user/{userId}/signedup",
+                    "parameters": {"userId": {"description": "Id of the user"}},
+                },
+                "adminSignedUp": {"address": "user/admin/signedup"},
+                "event": {
+                    "address": "{service}/event-{kind}",
+                    "parameters": {
+                        "service": {"enum": ["billing", "shipping"]},
+                        "kind": {"$ref": "#/components/parameters/Kind"},
+                    },
+                },
+                "unaddressed": {"address": None},
+            },
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    ("topic", "channel_id", "parameters"),
+    [
+        ("user/42/signedup", "signedUp", {"userId": "42"}),
+        ("user/admin/signedup", "adminSignedUp", {}),
+        ("billing/event-paid", "event", {"service": "billing", "kind": "paid"}),
+    ],
+)
+def test_match(router, topic, channel_id, parameters):
+    match = router.match(topic)
+    assert match.channel_id == channel_id
+    assert match.parameters == parameters
+    assert match.channel.address is not None
+
+
+@pytest.mark.parametrize(
+    "topic",
+    [
+        "user/42",
+        "user//signedup",
+        "user/42/signedup/x",
+        "other/event-paid",
+        "billing/event-lost",
+    ],
+)
+def test_no_match(router, topic):
+    assert router.match(topic) is None
+
+
+def test_mqtt_wildcards():
+    document = document_v3(
+        {
+            "all": {"address": "sensors/#"},
+            "temperature": {"address": "sensors/+/temperature"},
+        },
+        servers={"broker": {"host": "localhost", "protocol": "mqtt"}},
+    )
+    assert route(document, "sensors/1/temperature").channel_id == "temperature"
+    assert route(document, "sensors/1/humidity").channel_id == "all"
+    assert route(document, "sensors").channel_id == "all"
+    assert route(document, "other") is None
+
+
+def test_wildcards_require_protocol():
+    document = document_v3({"all": {"address": "sensors/#"}})
+    assert route(document, "sensors/1") is None
+    assert route(document, "sensors/#").channel_id == "all"
+
+
+def test_amqp_topic_exchange():
+    exchange = {"amqp": {"is": "exchange", "exchange": {"type": "topic"}}}
+    document = document_v3(
+        {
+            "orders": {"address": "orders.*.created", "bindings": exchange},
+            "audit": {"address": "audit.#.log", "bindings": exchange},
+        },
+    )
+    assert route(document, "orders.eu.created").channel_id == "orders"
+    assert route(document, "orders.eu.x.created") is None
+    assert route(document, "audit.log").channel_id == "audit"
+    assert route(document, "audit.a.b.log").channel_id == "audit"
+
+
+def test_v2_parameter_schema_enum():
+    data = yaml_data("v2/simple.yaml")
+    data["channels"]["{region}/user/signedup"] = {
+        "parameters": {"region": {"schema": {"type": "string", "enum": ["eu"]}}},
+    }
+    document = v2.AsyncAPI.model_validate(data)
+    router = Router.for_document(document)
+    assert Router.for_document(document) is router
+    assert router.match("user/signedup").channel_id == "user/signedup"
+    assert router.match("eu/user/signedup").parameters == {"region": "eu"}
+    assert router.match("us/user/signedup") is None
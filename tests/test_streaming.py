@@ -0,0 +1,142 @@
+import io
+import json
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from benchmarks.generator import generate
+from pydantic_asyncapi import AsyncAPI
+from pydantic_asyncapi.streaming import (
+    JSONReader,
+    dump_json,
+    dump_yaml,
+    iter_json,
+    iter_yaml,
+    load_json,
+    load_yaml,
+)
+from tests.test_asyncapi import BASE_DIR, yaml_data
+
+
+def assert_loads(data):
+    validated = AsyncAPI.model_validate(data).root
+    text = json.dumps(data, indent=2)
+    for chunk_size in (1, 7, 64 * 1024):
+        loaded = load_json(io.BytesIO(text.encode()), chunk_size=chunk_size)
+        assert type(loaded) is type(validated)
+        assert loaded == validated
+        assert loaded.model_fields_set == validated.model_fields_set
+    loaded = load_yaml(io.StringIO(yaml.safe_dump(data, sort_keys=False)))
+    assert loaded == validated
+    assert loaded.model_dump_json() == validated.model_dump_json()
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+def test_load(filename):
+    assert_loads(yaml_data(filename))
+
+
+@pytest.mark.parametrize("version", ["2.6.0", "3.0.0"])
+def test_load_generated(version):
+    assert_loads(generate(version, channels=5, messages=3, depth=3))
+
+
+def test_load_path(tmp_path):
+    path = BASE_DIR / "fixtures/v3/simple.yaml"
+    expected = AsyncAPI.model_validate(yaml_data("v3/simple.yaml")).root
+    assert load_yaml(path) == expected
+    json_path = tmp_path / "simple.json"
+    json_path.write_text(json.dumps(yaml_data("v3/simple.yaml")))
+    assert load_json(json_path) == expected
+    assert load_json(str(json_path)) == expected
+
+
+def test_version_after_maps():
+    data = yaml_data("v3/simple.yaml")
+    reordered = {key: value for key, value in data.items() if key != "asyncapi"}
+    reordered["asyncapi"] = data["asyncapi"]
+    assert (
+        load_json(io.StringIO(json.dumps(reordered)))
+        == AsyncAPI.model_validate(data).root
+    )
+
+
+def test_error_locations():
+    data = yaml_data("v3/simple.yaml")
+    data["channels"]["userSignedup"]["address"] = 1
+    with pytest.raises(ValidationError) as e:
+        load_json(io.StringIO(json.dumps(data)))
+    loc = e.value.errors()[0]["loc"]
+    assert loc[:2] == ("channels", "userSignedup")
+    assert loc[-1] == "address"
+
+    data = yaml_data("v3/simple.yaml")
+    data["info"]["title"] = None
+    with pytest.raises(ValidationError) as e:
+        load_yaml(io.StringIO(yaml.safe_dump(data)))
+    assert e.value.errors()[0]["loc"] == ("info", "title")
+
+
+def test_unsupported_version():
+    with pytest.raises(ValidationError):
+        load_json(io.StringIO('{"asyncapi": "1.0.0", "info": {}}'))
+
+
+def test_json_reader():
+    reader = JSONReader(io.BytesIO('{"a": 12345, "ü": [1, {}], "c": {}}'.encode()), 1)
+    values = {}
+    for key in reader.mapping():
+        values[key] = reader.value()
+    assert values == {"a": 12345, "ü": [1, {}], "c": {}}
+    with pytest.raises(json.JSONDecodeError):
+        list(JSONReader(io.StringIO('{"a" 1}')).mapping())
+
+
+def assert_dumps(data, **options):
+    document = AsyncAPI.model_validate(data).root
+    kwargs = {"by_alias": True, "exclude_unset": True, **options}
+    dumped = b"".join(iter_json(document, **options))
+    assert dumped == document.model_dump_json(**kwargs).encode()
+    dumped_yaml = yaml.safe_load("".join(iter_yaml(document, **options)))
+    assert dumped_yaml == document.model_dump(mode="json", **kwargs)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["v2/simple.yaml", "v3/simple.yaml", "v3/backend.yaml"],
+)
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"exclude_unset": False}, {"by_alias": False}],
+)
+def test_dump(filename, options):
+    assert_dumps(yaml_data(filename), **options)
+
+
+@pytest.mark.parametrize("version", ["2.6.0", "3.0.0"])
+def test_dump_generated(version):
+    assert_dumps(generate(version, channels=5, messages=3, depth=3))
+
+
+def test_dump_empty_maps_and_extensions():
+    data = yaml_data("v3/simple.yaml")
+    data["channels"] = {}
+    data["operations"] = {}
+    data["x-owner"] = {"team": "accounts"}
+    data["components"]["x-internal"] = True
+    assert_dumps(data)
+
+
+def test_dump_round_trip(tmp_path):
+    document = AsyncAPI.model_validate(yaml_data("v3/backend.yaml")).root
+    dump_json(document, tmp_path / "asyncapi.json")
+    assert load_json(tmp_path / "asyncapi.json") == document
+    dump_yaml(document, tmp_path / "asyncapi.yaml")
+    assert load_yaml(tmp_path / "asyncapi.yaml") == document
+    buffer = io.BytesIO()
+    dump_json(document, buffer)
+    assert buffer.getvalue() == b"".join(iter_json(document))
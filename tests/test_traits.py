@@ -0,0 +1,123 @@
+from pydantic_asyncapi import v2, v3
+from pydantic_asyncapi.traits import (
+    TraitMerger,
+    effective_message,
+    effective_operation,
+    merge,
+)
+from tests.test_asyncapi import yaml_data
+
+HEADERS = {"type": "object", "properties": {"a": {"type": "string"}}}
+
+
+def _v3_document():
+    data = yaml_data("v3/simple.yaml")
+    data["components"]["messageTraits"] = {
+        "common": {
+            "headers": HEADERS,
+            "contentType": "application/json",
+            "name": "trait",
+            "x-team": "accounts",
+        }
+    }
+    data["components"]["operationTraits"] = {
+        "tagged": {"tags": [{"name": "users"}], "summary": "trait"}
+    }
+    message = data["components"]["messages"]["UserSignedUp"]
+    message["name"] = "UserSignedUp"
+    message["headers"] = {"type": "object", "properties": {"b": {"type": "string"}}}
+    message["traits"] = [
+        {"$ref": "#/components/messageTraits/common"},
+        {"summary": "inline"},
+    ]
+    data["components"]["messages"]["Plain"] = {"payload": {"type": "string"}}
+    operation = data["operations"]["sendUserSignedup"]
+    operation["summary"] = "own"
+    operation["traits"] = [{"$ref": "#/components/operationTraits/tagged"}]
+    return v3.AsyncAPI.model_validate(data)
+
+
+def _v2_document():
+    data = yaml_data("v2/simple.yaml")
+    data["components"]["messageTraits"] = {
+        "common": {"headers": HEADERS, "name": "trait"}
+    }
+    message = data["components"]["messages"]["UserSignedUp"]
+    message["name"] = "UserSignedUp"
+    message["traits"] = [{"$ref": "#/components/messageTraits/common"}]
+    operation = data["channels"]["user/signedup"]["subscribe"]
+    operation["summary"] = "own"
+    operation["traits"] = [{"summary": "trait", "operationId": "signup"}]
+    return v2.AsyncAPI.model_validate(data)
+
+
+def test_v3_message_wins():
+    document = _v3_document()
+    message = document.components.messages["UserSignedUp"]
+    effective = effective_message(document, message)
+    assert effective.name == "UserSignedUp"
+    assert effective.contentType == "application/json"
+    assert effective.summary == "inline"
+    assert effective.model_extra == {"x-team": "accounts"}
+    assert set(effective.headers.properties) == {"a", "b"}
+    assert effective.traits is None
+    assert "traits" not in effective.model_fields_set
+    assert "traits" not in effective.model_dump(by_alias=True, exclude_unset=True)
+    # values no trait touches are shared, the original is left unchanged
+    assert effective.payload is message.payload
+    assert message.traits is not None
+    assert set(message.headers.properties) == {"b"}
+
+
+def test_v3_operation():
+    document = _v3_document()
+    operation = document.operations["sendUserSignedup"]
+    effective = effective_operation(document, operation)
+    assert effective.summary == "own"
+    assert [tag.name for tag in effective.tags] == ["users"]
+    assert effective.channel is operation.channel
+
+
+def test_v2_traits_win():
+    document = _v2_document()
+    message = document.components.messages["UserSignedUp"]
+    effective = effective_message(document, message)
+    assert effective.name == "trait"
+    assert effective.headers.properties.keys() == {"a"}
+    assert effective.payload is message.payload
+
+    operation = document.channels["user/signedup"].subscribe
+    effective = effective_operation(document, operation)
+    assert effective.summary == "trait"
+    assert effective.operationId == "signup"
+    assert effective.message is operation.message
+
+
+def test_references_and_memoization():
+    document = _v3_document()
+    message = document.components.messages["UserSignedUp"]
+    reference = document.channels["userSignedup"].messages["UserSignedUp"]
+    effective = effective_message(document, message)
+    assert effective_message(document, reference) is effective
+    merger = TraitMerger.for_document(document)
+    assert merger is TraitMerger.for_document(document)
+    assert merger.merged_traits(message) is merger.merged_traits(message)
+
+
+def test_without_traits():
+    document = _v3_document()
+    plain = document.components.messages["Plain"]
+    assert effective_message(document, plain) is plain
+    assert TraitMerger.for_document(document).merged_traits(plain) is None
+
+
+def test_merge():
+    base = {"a": {"b": 1, "c": [1]}, "d": 2}
+    merged = merge(base, {"a": {"b": 3}, "e": 4})
+    assert merged == {"a": {"b": 3, "c": [1]}, "d": 2, "e": 4}
+    assert merged["a"]["c"] is base["a"]["c"]
+    assert base == {"a": {"b": 1, "c": [1]}, "d": 2}
+    assert merge([1], [2]) == [2]
+    schema = v3.Schema(type="object", title="base")
+    assert merge(schema, v3.Schema(title="patch")).type == "object"
+    assert merge(schema, v3.Schema()) is schema